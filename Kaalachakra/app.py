@@ -1,9 +1,23 @@
-import math
-from datetime import datetime, timedelta, timezone
+import cProfile
+import importlib.util
+import io
+import os
+import pstats
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 import pytz
 import streamlit as st
 import streamlit.components.v1 as components
-import swisseph as swe
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+try:
+    from streamlit_autorefresh import st_autorefresh
+except ImportError:   # live mode is unavailable without it
+    st_autorefresh = None
+from kaalachakra.core import (compute_panchang, jd_from_dt, graha_snapshot, grahas_by_name, sun_moon_ephemeris, next_event,
+                              find_muhurtas, search_places, nearest_place, timezone_at, WEEKDAYS, ABODES, TITHIS, NAKSHATRAS, YOGAS, KARANA_60,
+                              PANCHANG_CACHE, SUN, MOON, lunar_month, profile_run, stage, log_sink,
+                              FEED_KINDS, KIND_LABELS, feed_events, feed_lines, years_after)
+from kaalachakra.core.cache import snap
 
 st.set_page_config(page_title="🕉️ Kaalachakra Live — v9.0 (Sankalpa)", page_icon="🕉️", layout="centered")
 
@@ -26,27 +40,6 @@ hr { border:1px solid #f4d03f; box-shadow:0 0 5px #f4d03f; }
 st.markdown("<h1>🕉️ Kaalachakra Live</h1><h3>Drik-style • Sunrise-based • Lahiri Sidereal • Topocentric</h3>", unsafe_allow_html=True)
 
 # ---------- TABLES ----------
-TITHIS = [
-    "Shukla Pratipada","Shukla Dwitiya","Shukla Tritiya","Shukla Chaturthi","Shukla Panchami",
-    "Shukla Shashthi","Shukla Saptami","Shukla Ashtami","Shukla Navami","Shukla Dashami",
-    "Shukla Ekadashi","Shukla Dwadashi","Shukla Trayodashi","Shukla Chaturdashi","Purnima",
-    "Krishna Pratipada","Krishna Dwitiya","Krishna Tritiya","Krishna Chaturthi","Krishna Panchami",
-    "Krishna Shashthi","Krishna Saptami","Krishna Ashtami","Krishna Navami","Krishna Dashami",
-    "Krishna Ekadashi","Krishna Dwadashi","Krishna Trayodashi","Krishna Chaturdashi","Amavasya"
-]
-NAKSHATRAS = [
-    "Ashwini","Bharani","Krittika","Rohini","Mrigashira","Ardra","Punarvasu","Pushya",
-    "Ashlesha","Magha","Purva Phalguni","Uttara Phalguni","Hasta","Chitra","Swati",
-    "Vishakha","Anuradha","Jyeshtha","Mula","Purva Ashadha","Uttara Ashadha",
-    "Shravana","Dhanishtha","Shatabhisha","Purva Bhadrapada","Uttara Bhadrapada","Revati"
-]
-YOGAS = [
-    "Vishkambha","Priti","Ayushman","Saubhagya","Shobhana","Atiganda","Sukarma","Dhriti",
-    "Shoola","Ganda","Vriddhi","Dhruva","Vyaghata","Harshana","Vajra","Siddhi","Vyatipata",
-    "Variyana","Parigha","Shiva","Siddha","Sadhya","Shubha","Shukla","Brahma","Indra","Vaidhriti"
-]
-KARANA_60 = (["Kinstughna"] + ["Bava","Balava","Kaulava","Taitila","Garaja","Vanija","Vishti"]*8 + ["Shakuni","Chatushpada","Naga"])
-
 # Devanagari names for Sankalpa
 VARS_SANSKRIT = ["रविवासरे","सोमवासरे","मङ्गलवासरे","बुधवासरे","गुरुवासरे","शुक्रवासरे","शनिवासरे"]
 TITHIS_SAN = [
@@ -73,20 +66,52 @@ KAR_SAN = {
     "Garaja":"गर","Vanija":"वणिज","Vishti":"भद्रा","Shakuni":"शकुनि","Chatushpada":"चतुष्पद","Naga":"नाग"
 }
 
-STEP_NAK = 360.0/27.0
-EPS = 1e-9
-
 # ---------- SIDEBAR ----------
 st.sidebar.header("🌍 Location & Settings")
-lat = st.sidebar.number_input("Latitude", value=28.6139, format="%.6f")
-lon = st.sidebar.number_input("Longitude", value=77.2090, format="%.6f")
-tz_name = st.sidebar.text_input("Timezone (IANA)", value="Asia/Kolkata")
+st.session_state.setdefault("lat", 28.6139)
+st.session_state.setdefault("lon", 77.2090)
+
+def use_place(p):
+    st.session_state["lat"], st.session_state["lon"] = round(p.lat, 4), round(p.lon, 4)
+
+# offline city search (bundled GeoNames table); picking a city fills lat/lon
+city_query = st.sidebar.text_input("Find a city", value="", placeholder="e.g. Bhubaneswar")
+city_hits = search_places(city_query, 8) if city_query.strip() else ()
+if city_hits:
+    city = st.sidebar.selectbox("Matches", city_hits, format_func=lambda p: f"{p.name}, {p.country} — {p.tz}")
+    st.sidebar.button("📍 Use this place", on_click=use_place, args=(city,))
+elif city_query.strip():
+    st.sidebar.caption("No bundled city starts with that; enter coordinates below.")
+lat = st.sidebar.number_input("Latitude", format="%.6f", key="lat")
+lon = st.sidebar.number_input("Longitude", format="%.6f", key="lon")
+near, near_km = nearest_place(lat, lon)
+if st.sidebar.checkbox("Set timezone manually", value=False):
+    tz_name = st.sidebar.text_input("Timezone (IANA)", value=timezone_at(lat, lon))
+else:
+    tz_name = timezone_at(lat, lon)   # follows lat/lon, so pytz.timezone below never drifts from the map
+    st.sidebar.caption(f"🕰️ {tz_name} · near {near.name}, {near.country} ({near_km:.0f} km)")
 ayan_trim = st.sidebar.slider("Ayanamsa fine trim (°)", -0.05, 0.05, 0.000, 0.001)
+live_mode = st.sidebar.checkbox("Live mode (refresh at the next change)", value=False)
 show_debug = st.sidebar.checkbox("Show debug panel", value=False)
+profilers = ["off", "cProfile"] + (["pyinstrument"] if importlib.util.find_spec("pyinstrument") else [])
+cpu_profiler = st.sidebar.selectbox("Profile this rerun", profilers) if show_debug else "off"
 
 tz = pytz.timezone(tz_name)
 now_local = datetime.now(tz)
 
+# ---------- INSTRUMENTATION ----------
+# Per-rerun stage timings + ephemeris call counts; KAALACHAKRA_METRICS=1 also logs them as JSON.
+RUN = profile_run("rerun", sink=log_sink if os.environ.get("KAALACHAKRA_METRICS") else None)
+RUN.start()
+CPU_PROF = None
+if cpu_profiler == "cProfile":
+    CPU_PROF = cProfile.Profile()
+    CPU_PROF.enable()
+elif cpu_profiler == "pyinstrument":
+    from pyinstrument import Profiler
+    CPU_PROF = Profiler()
+    CPU_PROF.start()
+
 # ---------- CLOCK ----------
 components.html(f"""
 <div style="text-align:center; margin-top:10px;">
@@ -107,106 +132,16 @@ st.markdown("<hr style='margin:8px 0;'>", unsafe_allow_html=True)
 st.markdown(f"### 🕒 {now_local.strftime('%A, %d %B %Y | %I:%M %p')} — {tz_name}")
 
 # ---------- HELPERS ----------
-def jd_to_local_dt(jd_ut):
-    if jd_ut is None or (isinstance(jd_ut,float) and math.isnan(jd_ut)): return None
-    y,m,d,ut = swe.revjul(jd_ut, swe.GREG_CAL)
-    return (datetime(y,m,d,tzinfo=timezone.utc)+timedelta(hours=ut)).astimezone(tz)
+LIVE_SLACK_MS = 2000   # rerun just after an event, never on its edge
 def fmt(dt): return dt.strftime("%I:%M %p") if dt else "—"
 
-def rise_set_one(jd0_ut, body, mode, lon, lat):
-    try:
-        ret, jdlist = swe.rise_trans(jd0_ut, body, mode|swe.BIT_DISC_CENTER, (lon,lat,0.0), 1013.25, 15.0)
-        if ret >= 0:
-            return jdlist[0] if isinstance(jdlist,(list,tuple)) else jdlist
-    except Exception:
-        pass
-    return None
-
-def sun_moon_rise_set(local_date, lon, lat):
-    swe.set_topo(lon, lat, 0.0)
-    local_mid = local_date.replace(hour=0,minute=0,second=0,microsecond=0)
-    utc_mid = local_mid.astimezone(pytz.utc)
-    jd0 = swe.julday(utc_mid.year, utc_mid.month, utc_mid.day, 0.0)
-    sr = rise_set_one(jd0, swe.SUN, swe.CALC_RISE, lon, lat) or rise_set_one(jd0+1, swe.SUN, swe.CALC_RISE, lon, lat)
-    ss = rise_set_one(jd0, swe.SUN, swe.CALC_SET, lon, lat) or rise_set_one(jd0+1, swe.SUN, swe.CALC_SET, lon, lat)
-    mr = rise_set_one(jd0, swe.MOON, swe.CALC_RISE, lon, lat) or rise_set_one(jd0+1, swe.MOON, swe.CALC_RISE, lon, lat)
-    ms = rise_set_one(jd0, swe.MOON, swe.CALC_SET, lon, lat) or rise_set_one(jd0+1, swe.MOON, swe.CALC_SET, lon, lat)
-    sr_local = jd_to_local_dt(sr)
-    # Anti-lag: if the returned sunrise is yesterday, jump to today's sunrise
-    if sr_local and sr_local.date() < now_local.date():
-        sr += 1.0
-        sr_local = sr_local + timedelta(days=1)
-    return sr_local, jd_to_local_dt(ss), jd_to_local_dt(mr), jd_to_local_dt(ms), sr
-
-def sidereal_longs(jd_ut, lon, lat, trim=0.0):
-    swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
-    swe.set_topo(lon, lat, 0.0)
-    flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL | getattr(swe,"FLG_TOPOCTR",0)
-    s,_ = swe.calc_ut(jd_ut, swe.SUN,  flags)
-    m,_ = swe.calc_ut(jd_ut, swe.MOON, flags)
-    return (s[0]+trim)%360.0, (m[0]+trim)%360.0
-
-def clamp_idx(val, max_exclusive):
-    i = int(math.floor(min(max(val - EPS, 0.0), max_exclusive - EPS)))
-    return max(0, min(i, max_exclusive-1))
-
-def tithi_index(s,m): return clamp_idx(((m - s) % 360.0) / 12.0, 30)
-def nak_index(m):     return clamp_idx((m % 360.0) / STEP_NAK, 27)
-def yoga_index(s,m):  return clamp_idx(((s + m) % 360.0) / STEP_NAK, 27)
-def karana_name(s,m): return ["Kinstughna"] + ["Bava","Balava","Kaulava","Taitila","Garaja","Vanija","Vishti"]*8 + ["Shakuni","Chatushpada","Naga"][int(((m - s) % 360.0) // 6.0) : int(((m - s) % 360.0) // 6.0)+1] if False else KARANA_60[int(((m - s) % 360.0) // 6.0)]
-
-def next_change(jd_start, lon, lat, kind, cur_idx, trim=0.0, max_hours=48):
-    def idx_at(jd):
-        s,m = sidereal_longs(jd, lon, lat, trim)
-        if kind=="tithi": return tithi_index(s,m)
-        if kind=="nak":   return nak_index(m)
-        if kind=="yoga":  return yoga_index(s,m)
-        return None
-    step = 0.25/24.0
-    lo = jd_start
-    cur = cur_idx
-    for _ in range(int(max_hours/0.25)):
-        hi = lo + step
-        nxt = idx_at(hi)
-        if nxt != cur:
-            for __ in range(30):
-                mid = (lo + hi)/2.0
-                if idx_at(mid) == cur: lo = mid
-                else: hi = mid
-            return hi
-        lo, cur = hi, nxt
-    return None
-
-def compute_panchang(local_date, lon, lat, trim=0.0):
-    sr_local, ss_local, mr_local, ms_local, sr_jd = sun_moon_rise_set(local_date, lon, lat)
-    if not sr_jd:
-        fb = local_date.replace(hour=6, minute=0, second=0, microsecond=0).astimezone(pytz.utc)
-        sr_jd = swe.julday(fb.year, fb.month, fb.day, fb.hour + fb.minute/60.0)
-    jd_eval = sr_jd + 15/1440.0
-    jd_pre  = sr_jd - 2/24.0
-    s_now, m_now = sidereal_longs(jd_eval, lon, lat, trim)
-    s_pre, m_pre = sidereal_longs(jd_pre,  lon, lat, trim)
-    ti = tithi_index(s_now, m_now)
-    ni = nak_index(m_now)
-    yi = yoga_index(s_now, m_now)
-    tithi = TITHIS[ti]; paksha = "Shukla" if ti < 15 else "Krishna"
-    nak = NAKSHATRAS[ni]; yoga = YOGAS[yi]
-    karana = KARANA_60[int(((m_now - s_now) % 360.0) // 6.0)]
-    te = next_change(jd_eval, lon, lat, "tithi", ti, trim)
-    ne = next_change(jd_eval, lon, lat, "nak",   ni, trim)
-    ye = next_change(jd_eval, lon, lat, "yoga",  yi, trim)
-    return {
-        "sunrise": sr_local, "sunset": ss_local, "moonrise": mr_local, "moonset": ms_local,
-        "sun_long": s_now, "moon_long": m_now, "elong": (m_now - s_now) % 360.0,
-        "tithi": tithi, "paksha": paksha, "nakshatra": nak, "yoga": yoga, "karana": karana,
-        "tithi_ends": jd_to_local_dt(te), "nak_ends": jd_to_local_dt(ne), "yoga_ends": jd_to_local_dt(ye),
-        "ti_idx":ti, "nak_idx":ni, "yoga_idx":yi
-    }
-
 # ---------- RUN CORE ----------
 P = None
 try:
-    P = compute_panchang(now_local, lon, lat, ayan_trim)
+    # shared across sessions; valid for the whole local date
+    with stage("panchang"):
+        P = PANCHANG_CACHE.get(now_local, lon, lat, tz_name, ayan_trim,
+                               lambda lo, la: compute_panchang(now_local, lo, la, ayan_trim, tz))
 
     st.markdown("<div class='card'><h3>🌅 Rise / Set</h3>" +
                 f"<b>Sunrise:</b> {fmt(P['sunrise'])} &nbsp;&nbsp; <b>Sunset:</b> {fmt(P['sunset'])}<br/>" +
@@ -217,11 +152,88 @@ try:
                 f"🌗 <b>Paksha:</b> {P['paksha']}<br/>" +
                 f"✨ <b>Nakshatra:</b> {P['nakshatra']} <span class='small'>(ends {fmt(P['nak_ends'])})</span><br/>" +
                 f"🪶 <b>Yoga:</b> {P['yoga']} <span class='small'>(ends {fmt(P['yoga_ends'])})</span><br/>" +
-                f"🌼 <b>Karana:</b> {P['karana']}</div>", unsafe_allow_html=True)
+                f"🌼 <b>Karana:</b> {P['karana']} <span class='small'>(ends {fmt(P['karana_ends'])})</span></div>", unsafe_allow_html=True)
 
 except Exception as e:
     st.error(f"🚫 Calculation Error: {e}")
 
+# ---------- LIVE MODE ----------
+# The next limb end / sunrise / midnight is already known from P, so the page
+# reruns once at that moment instead of on a fixed tick; between events only
+# the browser-side countdown moves.
+if live_mode and P:
+    event_at, event_label = next_event(P, now_local)
+    wait_ms = int((event_at - datetime.now(tz)).total_seconds() * 1000) + LIVE_SLACK_MS
+    if st_autorefresh is None:
+        st.sidebar.warning("Live mode needs streamlit-autorefresh (pip install streamlit-autorefresh).")
+    else:
+        st_autorefresh(interval=max(wait_ms, LIVE_SLACK_MS), key="live_refresh")
+    components.html(f"""
+<div style="text-align:center;color:#f7dc6f;font-family:'Courier New',monospace;">
+  ⏳ {event_label} at {event_at.strftime('%I:%M %p')} — <span id="left"></span>
+</div>
+<script>
+const target={int(event_at.timestamp() * 1000)};
+function tick(){{
+  const s=Math.max(0,Math.floor((target-Date.now())/1000));
+  const h=Math.floor(s/3600), m=Math.floor(s%3600/60), r=s%60;
+  document.getElementById('left').textContent=`in ${{h}}h ${{String(m).padStart(2,'0')}}m ${{String(r).padStart(2,'0')}}s`;
+}}
+setInterval(tick,1000); tick();
+</script>
+""", height=30)
+
+# ====================== MUHURTA FINDER ======================
+with st.expander("🔎 Muhurta finder — exact windows over the coming days"):
+    with st.form("muhurta_form"):
+        c1, c2 = st.columns(2)
+        with c1:
+            q_tithi = st.multiselect("Tithi", TITHIS)
+            q_paksha = st.selectbox("Paksha", ["Any", "Shukla", "Krishna"])
+            q_nak = st.multiselect("Nakshatra", NAKSHATRAS)
+            q_weekday = st.multiselect("Weekday", list(WEEKDAYS))
+        with c2:
+            q_yoga = st.multiselect("Yoga", YOGAS)
+            q_karana = st.multiselect("Karana", list(dict.fromkeys(KARANA_60)))
+            q_vaas = st.multiselect("Shiva Vaas", list(dict.fromkeys(a for a, _ in ABODES)))
+            q_days = st.selectbox("Search span", [30, 90, 180, 365], index=1, format_func=lambda d: f"{d} days")
+        q_min = st.number_input("Shortest window (minutes)", 0, 1440, 0, 15)
+        q_go = st.form_submit_button("Search", use_container_width=True)
+    if q_go:
+        q_start = now_local.replace(second=0, microsecond=0)
+        windows = find_muhurtas(q_start, tz.normalize(q_start + timedelta(days=q_days)), lon, lat,
+                                tithi=q_tithi or None, paksha=None if q_paksha == "Any" else q_paksha,
+                                nakshatra=q_nak or None, yoga=q_yoga or None, karana=q_karana or None,
+                                weekday=q_weekday or None, shiva_vaas=q_vaas or None,
+                                min_minutes=q_min, trim=ayan_trim)
+        st.caption(f"{len(windows)} windows in the next {q_days} days ({tz_name})")
+        st.dataframe([{"From": w.start.strftime("%a %d %b %Y %I:%M %p"), "To": w.end.strftime("%a %d %b %Y %I:%M %p"),
+                       "Hours": round(w.minutes / 60, 2)} for w in windows], use_container_width=True, hide_index=True)
+
+# ====================== CALENDAR FEED ======================
+# The file is built by the same generator pipeline service.py streams; here it
+# is joined for download_button, which needs the whole payload.
+with st.expander("📅 Calendar feed — .ics / CSV over several years"):
+    with st.form("feed_form"):
+        c1, c2 = st.columns(2)
+        with c1:
+            f_start = st.date_input("From", value=date(now_local.year, 1, 1),
+                                    min_value=date(1800, 1, 1), max_value=date(2299, 12, 31))
+            f_years = st.number_input("Years", 1, 20, 1)
+        with c2:
+            f_kinds = st.multiselect("Events", list(FEED_KINDS), default=list(FEED_KINDS), format_func=KIND_LABELS.get)
+            f_fmt = st.radio("Format", ["ics", "csv"], horizontal=True,
+                             format_func=lambda f: {"ics": "iCalendar (.ics)", "csv": "CSV"}[f])
+        f_go = st.form_submit_button("Build feed", use_container_width=True)
+    if f_go and f_kinds:
+        f_days = (years_after(f_start, f_years) - f_start).days
+        with profile_run("feed") as f_prof:
+            f_data = "".join(feed_lines(feed_events(f_start, f_days, lon, lat, tz_name, ayan_trim, f_kinds),
+                                        f_fmt, tz_name, lon, lat)).encode("utf-8")
+        st.caption(f"{f_days} days ({tz_name}), {len(f_data) / 1e6:.1f} MB, built in {f_prof.stages['total'][0] / 1000:.1f} s")
+        st.download_button(f"⬇️ Download feed (.{f_fmt})", data=f_data, file_name=f"kaalachakra-{f_start.isoformat()}.{f_fmt}",
+                           mime="text/calendar" if f_fmt == "ics" else "text/csv", on_click="ignore")
+
 # ====================== SANKALPA MODULE ======================
 def devanagari_digits(s):
     dmap = str.maketrans("0123456789", "०१२३४५६७८९")
@@ -269,115 +281,231 @@ def sankalpa_html(sank_text, p, name):
     body = f"<h1>🪔 संकल्पपत्रम्</h1><div class='box'><pre>{sank_text}</pre><div class='meta'>{meta}</div></div>"
     return ("<html><head><meta charset='UTF-8'>" + style + "</head><body>" + body + "</body></html>").encode("utf-8")
 
+# Each Sankalpa form is a st.fragment around a st.form: typing sends nothing to
+# the server, and a submit reruns only its fragment against the panchang this
+# page already computed (P), never the clock, ephemeris or cache lookups above.
+def fragment_rerun():
+    """True while Streamlit reruns only fragments; their bodies also run inside every full rerun."""
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+@contextmanager
+def fragment_timer(name):
+    """profile_run for one fragment-only rerun; its total lands in session_state["fragment_ms"][name].
+
+    A full-page rerun passes straight through: RUN already times the page.
+    """
+    if not fragment_rerun():
+        yield
+        return
+    with profile_run(name, sink=log_sink if os.environ.get("KAALACHAKRA_METRICS") else None) as prof:
+        yield
+    st.session_state.setdefault("fragment_ms", {})[name] = prof.stages["total"][0]
+
 st.markdown("<hr>", unsafe_allow_html=True)
 st.markdown("<h3 style='text-align:center'>🪔 Generate Sankalpa</h3>", unsafe_allow_html=True)
 
-with st.expander("Open Sankalpa Form"):
-    col1, col2 = st.columns(2)
-    with col1:
-        name = st.text_input("Name (e.g., Amlan Mishra)", value="")
-        gotra = st.text_input("Gotra (e.g., भारद्वाज)", value="")
-        place = st.text_input("Place/City (Devanagari or English)", value="नॊएडा / Noida")
-    with col2:
-        purpose = st.text_area("Why are you taking the Sankalpa? (Devanagari or English)",
-                               height=80, value="समस्त दुःख–कष्ट–विघ्न–नाशनार्थे")
-        offering = st.text_area("What will you offer / do? (Devanagari or English)",
-                                height=80, value="११ पाठाः, नैवेद्यम् च समर्पयामि")
-
-    # ✅ Streamlit Cloud compatible (no st.datetime_input)
-    date_sel = st.date_input("Sankalpa Date", value=now_local.date())
-    time_sel = st.time_input("Sankalpa Time", value=now_local.time().replace(microsecond=0))
-    when_dt = tz.localize(datetime.combine(date_sel, time_sel))
-
-    gen = st.button("✨ Generate", use_container_width=True)
-
-if gen and P:
-    text = build_sankalpa(P, name.strip() or "—", gotra.strip() or "—",
-                          place.strip() or "—", purpose.strip() or "—",
-                          offering.strip() or "—", when_dt)
-    st.success("✅ Sankalpa generated below. Review and download.")
-    st.markdown(f"<div class='out'>{text}</div>", unsafe_allow_html=True)
-
-    html_bytes = sankalpa_html(text, P, name or "sankalpa")
-    st.download_button("⬇️ Download Sankalpa (HTML → Print to PDF)",
-                       data=html_bytes, file_name="sankalpa.html", mime="text/html")
+@st.fragment
+def sankalpa_form(P, tz, now_local):
+    with fragment_timer("sankalpa_form"):
+        with st.expander("Open Sankalpa Form"):
+            with st.form("sankalpa_form"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    name = st.text_input("Name (e.g., Amlan Mishra)", value="")
+                    gotra = st.text_input("Gotra (e.g., भारद्वाज)", value="")
+                    place = st.text_input("Place/City (Devanagari or English)", value="नॊएडा / Noida")
+                with col2:
+                    purpose = st.text_area("Why are you taking the Sankalpa? (Devanagari or English)",
+                                           height=80, value="समस्त दुःख–कष्ट–विघ्न–नाशनार्थे")
+                    offering = st.text_area("What will you offer / do? (Devanagari or English)",
+                                            height=80, value="११ पाठाः, नैवेद्यम् च समर्पयामि")
+
+                # ✅ Streamlit Cloud compatible (no st.datetime_input)
+                date_sel = st.date_input("Sankalpa Date", value=now_local.date())
+                time_sel = st.time_input("Sankalpa Time", value=now_local.time().replace(microsecond=0))
+
+                gen = st.form_submit_button("✨ Generate", use_container_width=True)
+
+        if gen and P:
+            when_dt = tz.localize(datetime.combine(date_sel, time_sel))
+            with stage("sankalpa_render"):
+                text = build_sankalpa(P, name.strip() or "—", gotra.strip() or "—",
+                                      place.strip() or "—", purpose.strip() or "—",
+                                      offering.strip() or "—", when_dt)
+            st.success("✅ Sankalpa generated below. Review and download.")
+            st.markdown(f"<div class='out'>{text}</div>", unsafe_allow_html=True)
+
+            with stage("html_encode"):
+                html_bytes = sankalpa_html(text, P, name or "sankalpa")
+            st.download_button("⬇️ Download Sankalpa (HTML → Print to PDF)",
+                               data=html_bytes, file_name="sankalpa.html", mime="text/html", on_click="ignore")
+
+sankalpa_form(P, tz, now_local)
 
-# ---------- DEBUG ----------
-if show_debug and P:
-    st.markdown("<hr><h3>🧪 Debug</h3>", unsafe_allow_html=True)
-    st.caption(f"☀️ Sun λ = {P['sun_long']:.6f}°  |  🌙 Moon λ = {P['moon_long']:.6f}°  |  Δ = {P['elong']:.6f}°  |  trim = {ayan_trim:+.3f}°")
 # ====================== GRAND SANKALPA MODULE (v10.1 — ID-Proof Edition) ======================
 from utils.sankalpa_engine import generate_sankalpa
+from utils.sankalpa_batch import batch_sankalpas, read_participants, sankalpa_occasion, write_batch
 
 st.markdown("<hr>", unsafe_allow_html=True)
 st.markdown("<h3 style='text-align:center;'>📜 Grand Traditional Sankalpa</h3>", unsafe_allow_html=True)
 
-with st.expander("Open Grand Sankalpa Form (Full Sanskrit Style)", expanded=False):
-    c1, c2 = st.columns(2)
-    with c1:
-        name_full = st.text_input("Full Name (IAST or English)", "Amlan Mishra", key="grand_name")
-        gotra_full = st.text_input("Gotra (IAST or Sanskrit)", "Bhāradvāja", key="grand_gotra")
-        gender = st.selectbox("Gender", ["Male", "Female"], key="grand_gender")
-    with c2:
-        country = st.text_input("Country", "Bhāratavarṣe", key="grand_country")
-        state = st.text_input("State/Region", "Odisha", key="grand_state")
-        city = st.text_input("City/Place", "Bhubaneswar", key="grand_city")
-
-    purpose2 = st.text_area("Purpose — Why are you taking the Sankalpa?",
-                            "to remove all obstacles and ensure divine protection", key="grand_purpose")
-    offering2 = st.text_area("Offering — What will you do or offer?",
-                             "21 recitations of Kālabhairavāṣṭakam and 11 Siddha Kunjikā Stotram", key="grand_offering")
-
-    date_sel2 = st.date_input("Sankalpa Date (Traditional)", value=now_local.date(), key="grand_date")
-    time_sel2 = st.time_input("Sankalpa Time (Traditional)", value=now_local.time().replace(microsecond=0), key="grand_time")
-    when_dt2 = tz.localize(datetime.combine(date_sel2, time_sel2))
-
-    gen2 = st.button("🔥 Generate Grand Sankalpa", use_container_width=True, key="grand_generate_btn")
-
-if gen2 and P:
-    try:
-        jd_eval = swe.julday(when_dt2.year, when_dt2.month, when_dt2.day,
-                             when_dt2.hour + when_dt2.minute / 60.0)
-        flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
-        sun, _ = swe.calc_ut(jd_eval, swe.SUN, flags)
-        moon, _ = swe.calc_ut(jd_eval, swe.MOON, flags)
-        jup, _ = swe.calc_ut(jd_eval, swe.JUPITER, flags)
-
-        text2 = generate_sankalpa(
-            country=country,
-            state=state,
-            city=city,
-            paksha_iast=P["paksha"],
-            tithi_iast=P["tithi"],
-            weekday_dt=when_dt2,
-            nakshatra_iast=P["nakshatra"],
-            yoga_iast=P["yoga"],
-            karana_iast=P["karana"],
-            lunar_month_iast="Kartika",  # TODO: dynamic later
-            sun_lon_sidereal=sun[0],
-            moon_lon_sidereal=moon[0],
-            jupiter_lon_sidereal=jup[0],
-            name_iast=name_full,
-            gotra_iast=gotra_full,
-            purpose_free=purpose2,
-            offering_free=offering2,
-            gender=gender,
-            when_dt=when_dt2
-        )
-
-        st.success("✅ Grand Sankalpa generated below.")
-        st.markdown(f"<div class='out'>{text2}</div>", unsafe_allow_html=True)
-
-        html_bytes2 = text2.encode("utf-8")
-        st.download_button(
-            "⬇️ Download Grand Sankalpa (UTF-8 Text)",
-            data=html_bytes2,
-            file_name="grand_sankalpa.txt",
-            mime="text/plain",
-            key="grand_download_btn"
-        )
-
-    except Exception as e:
-        st.error(f"🚫 Error generating Grand Sankalpa: {e}")
+GRAND_DEFAULTS = {"grand_country": "Bhāratavarṣe", "grand_state": "Odisha", "grand_city": "Bhubaneswar"}
+
+def grand_occasion_inputs(tz, now_local):
+    """Place and when_dt of the Grand form as last submitted (defaults before the first submit)."""
+    ss = st.session_state
+    place = [ss.get(k, v) for k, v in GRAND_DEFAULTS.items()]
+    when_dt = tz.localize(datetime.combine(ss.get("grand_date", now_local.date()),
+                                           ss.get("grand_time", now_local.time().replace(microsecond=0))))
+    return place, when_dt
+
+@st.fragment
+def grand_sankalpa_form(P, tz, now_local, lon, lat, trim):
+    with fragment_timer("grand_sankalpa"):
+        with st.expander("Open Grand Sankalpa Form (Full Sanskrit Style)", expanded=False):
+            with st.form("grand_form"):
+                c1, c2 = st.columns(2)
+                with c1:
+                    name_full = st.text_input("Full Name (IAST or English)", "Amlan Mishra", key="grand_name")
+                    gotra_full = st.text_input("Gotra (IAST or Sanskrit)", "Bhāradvāja", key="grand_gotra")
+                    gender = st.selectbox("Gender", ["Male", "Female"], key="grand_gender")
+                with c2:
+                    country = st.text_input("Country", GRAND_DEFAULTS["grand_country"], key="grand_country")
+                    state = st.text_input("State/Region", GRAND_DEFAULTS["grand_state"], key="grand_state")
+                    city = st.text_input("City/Place", GRAND_DEFAULTS["grand_city"], key="grand_city")
+
+                purpose2 = st.text_area("Purpose — Why are you taking the Sankalpa?",
+                                        "to remove all obstacles and ensure divine protection", key="grand_purpose")
+                offering2 = st.text_area("Offering — What will you do or offer?",
+                                         "21 recitations of Kālabhairavāṣṭakam and 11 Siddha Kunjikā Stotram", key="grand_offering")
+
+                date_sel2 = st.date_input("Sankalpa Date (Traditional)", value=now_local.date(), key="grand_date")
+                time_sel2 = st.time_input("Sankalpa Time (Traditional)", value=now_local.time().replace(microsecond=0), key="grand_time")
+
+                gen2 = st.form_submit_button("🔥 Generate Grand Sankalpa", use_container_width=True)
+
+        if gen2 and P:
+            try:
+                when_dt2 = tz.localize(datetime.combine(date_sel2, time_sel2))
+                jd_eval = jd_from_dt(when_dt2)
+                with stage("graha_longitudes"):
+                    g = grahas_by_name(graha_snapshot(when_dt2, lon, lat, trim))
+                    masa = lunar_month(jd_eval, trim)
+
+                with stage("sankalpa_render"):
+                    text2 = generate_sankalpa(
+                        country=country,
+                        state=state,
+                        city=city,
+                        paksha_iast=P["paksha"],
+                        tithi_iast=P["tithi"],
+                        weekday_dt=when_dt2,
+                        nakshatra_iast=P["nakshatra"],
+                        yoga_iast=P["yoga"],
+                        karana_iast=P["karana"],
+                        lunar_month_iast=masa.name,
+                        adhika_masa=masa.adhika,
+                        sun_lon_sidereal=g["Surya"].longitude,
+                        moon_lon_sidereal=g["Chandra"].longitude,
+                        jupiter_lon_sidereal=g["Guru"].longitude,
+                        graha_rashis={name: p.rashi for name, p in g.items()},
+                        name_iast=name_full,
+                        gotra_iast=gotra_full,
+                        purpose_free=purpose2,
+                        offering_free=offering2,
+                        gender=gender,
+                        when_dt=when_dt2
+                    )
+
+                st.success("✅ Grand Sankalpa generated below.")
+                st.markdown(f"<div class='out'>{text2}</div>", unsafe_allow_html=True)
+
+                with stage("html_encode"):
+                    html_bytes2 = text2.encode("utf-8")
+                st.download_button(
+                    "⬇️ Download Grand Sankalpa (UTF-8 Text)",
+                    data=html_bytes2,
+                    file_name="grand_sankalpa.txt",
+                    mime="text/plain",
+                    key="grand_download_btn",
+                    on_click="ignore"
+                )
+
+            except Exception as e:
+                st.error(f"🚫 Error generating Grand Sankalpa: {e}")
+
+grand_sankalpa_form(P, tz, now_local, lon, lat, ayan_trim)
+
+# ---------- Batch Grand Sankalpa (temple events: one occasion, many participants) ----------
+@st.fragment
+def batch_sankalpa_form(tz, now_local, lon, lat, trim):
+    with fragment_timer("batch_sankalpa"):
+        with st.expander("📋 Batch Grand Sankalpa (CSV of participants)", expanded=False):
+            st.caption("CSV columns: name, gotra, gender, purpose, offering. "
+                       "Place, date and time come from the Grand Sankalpa form above, as last submitted.")
+            batch_csv = st.file_uploader("Participants CSV", type="csv", key="batch_csv")
+            gen3 = st.button("📦 Generate ZIP", use_container_width=True, key="batch_generate_btn", disabled=batch_csv is None)
+
+        if gen3 and batch_csv is not None:
+            try:
+                (country, state, city), when_dt2 = grand_occasion_inputs(tz, now_local)
+                with stage("graha_longitudes"):
+                    occasion = sankalpa_occasion(when_dt2, lon, lat, country=country, state=state, city=city, trim=trim)
+                with stage("sankalpa_render"):
+                    zip_buf = io.BytesIO()
+                    rows = read_participants(io.TextIOWrapper(batch_csv, encoding="utf-8-sig", newline=""))
+                    written, errors = write_batch(batch_sankalpas(rows, occasion), zip_buf)
+                st.success(f"✅ {written} sankalpas generated, {len(errors)} rows skipped.")
+                if errors:
+                    st.table([{"row": r.row, "name": r.name, "error": r.error} for r in errors[:50]])
+                st.download_button("⬇️ Download Sankalpas (ZIP)", data=zip_buf.getvalue(),
+                                   file_name="sankalpas.zip", mime="application/zip", key="batch_download_btn",
+                                   on_click="ignore")
+            except Exception as e:
+                st.error(f"🚫 Error generating batch: {e}")
+
+batch_sankalpa_form(tz, now_local, lon, lat, ayan_trim)
+# ---------- INSTRUMENTATION (finish) ----------
+cs = PANCHANG_CACHE.stats()
+eph = sun_moon_ephemeris(snap(lon), snap(lat))   # the fits the panchang cache computed with
+RUN.profile.gauges.update(panchang_cache_hit_rate=cs["hit_rate"], ephemeris_cache=eph.cache_info())
+RUN.stop()
+if cpu_profiler == "cProfile":
+    CPU_PROF.disable()
+    buf = io.StringIO()
+    pstats.Stats(CPU_PROF, stream=buf).sort_stats("cumulative").print_stats(60)
+    st.session_state["cpu_profile"] = ("rerun_cprofile.txt", buf.getvalue(), "text/plain")
+elif cpu_profiler == "pyinstrument":
+    CPU_PROF.stop()
+    st.session_state["cpu_profile"] = ("rerun_pyinstrument.html", CPU_PROF.output_html(), "text/html")
+
+# ---------- DEBUG ----------
+if show_debug and P:
+    st.markdown("<hr><h3>🧪 Debug</h3>", unsafe_allow_html=True)
+    st.caption(f"☀️ Sun λ = {P['sun_long']:.6f}°  |  🌙 Moon λ = {P['moon_long']:.6f}°  |  Δ = {P['elong']:.6f}°  |  trim = {ayan_trim:+.3f}°")
+    err = eph.check(P["jd_eval"], days=1.0, n=25)
+    info = eph.cache_info()
+    st.caption(f"📈 Chebyshev cache: {info['segments']}/{info['max_segments']} segments  |  hits {info['hits']} / misses {info['misses']}  |  "
+               f"max fit error ☀️ {err[SUN]:.4f}″ 🌙 {err[MOON]:.4f}″")
+    st.dataframe([{"graha": g.name, "λ (°)": round(g.longitude, 4), "rāśi": f"{g.rashi} {g.degree:05.2f}°",
+                   "°/day": round(g.speed, 4), "℞": "℞" if g.retrograde else ""}
+                  for g in graha_snapshot(now_local, lon, lat, ayan_trim)], hide_index=True, use_container_width=True)
+    st.caption(f"🗃️ Panchang cache: {cs['entries']} entries  |  hits {cs['hits']} / misses {cs['misses']} ({cs['hit_rate']:.0%})  |  "
+               f"expired {cs['expired']}  |  evicted {cs['evictions']}")
+    if cs["store"]:
+        ss = cs["store"]
+        st.caption(f"💾 Panchang store {ss['path']}{' (read-only)' if ss['readonly'] else ''}: "
+                   f"hits {ss['hits']} / misses {ss['misses']}  |  writes {ss['writes']}")
+    prof = RUN.profile.as_dict()
+    st.caption(f"⏱️ This rerun: {prof['stages']['total']['ms']:.1f} ms  |  calc_ut × {prof['calls']['calc_ut']}  |  "
+               f"rise_trans × {prof['calls']['rise_trans']}  (stage times are inclusive)")
+    st.table([{"stage": k, "ms": f"{v['ms']:.2f}", "calls": v["n"]} for k, v in prof["stages"].items()])
+    if st.session_state.get("fragment_ms"):
+        st.caption("🧩 Last form reruns (fragment only): " +
+                   "  |  ".join(f"{k} {v:.1f} ms" for k, v in st.session_state["fragment_ms"].items()))
+    if st.session_state.get("cpu_profile"):
+        name, data, mime = st.session_state["cpu_profile"]
+        st.download_button("⬇️ Download rerun profile", data=data, file_name=name, mime=mime)
 # ---------- FOOTER ----------
 st.markdown("<div class='footer'>🕯️ <span>ॐ नमः शिवाय</span> — v9.0 Sankalpa • Swiss Ephemeris • Drik-style</div>", unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Kaalachakra — Drik-style panchang on Swiss Ephemeris, usable without Streamlit."""
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Headless panchang core: pure functions, explicit time zones, no import-time side effects.
+
+Submodules (and swisseph/numpy behind them) load on first use of a name, so
+`import kaalachakra.core` stays cheap for batch workers and CLIs.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "_lazy": ("SUN", "MOON", "MERCURY", "VENUS", "MARS", "JUPITER", "SATURN", "MEAN_NODE", "TRUE_NODE"),
+    "tables": ("TITHIS", "NAKSHATRAS", "YOGAS", "KARANA_60", "STEP_NAK", "LUNAR_MONTHS", "RASHIS"),
+    "panchang": ("jd_to_local_dt", "jd_from_dt", "tz_name_of", "sun_moon_rise_set", "sidereal_longs",
+                 "sidereal_longs_speed", "tithi_index", "nak_index", "yoga_index", "karana_index", "next_change",
+                 "Transition", "limb_transitions", "compute_panchang", "panchang_base", "clear_panchang_bases"),
+    "context": ("EphemerisContext",),
+    "ephemeris": ("ChebyshevEphemeris", "SpanEphemeris", "shared_ephemeris", "sun_moon_ephemeris",
+                  "clear_shared_ephemeris"),
+    "riseset": ("rise_set_table", "rise_set_day", "clear_rise_set_tables", "RISE_SET_EVENTS",
+                "OCCURS", "SKIPPED", "ALWAYS_UP", "ALWAYS_DOWN"),
+    "lunar": ("LunarMonth", "LunarIndex", "lunar_index", "lunar_month", "ayana", "solar_sign"),
+    "calendar": ("panchang_calendar", "to_dataframe", "write_csv", "write_parquet"),
+    "batch": ("Location", "batch_calendars"),
+    "cache": ("PanchangCache", "PANCHANG_CACHE", "next_event"),
+    "store": ("PanchangStore", "open_store", "precompute"),
+    "places": ("Place", "PlaceIndex", "place_index", "nearest_place", "search_places", "timezone_at",
+               "location_timezone"),
+    "muhurta": ("MuhurtaWindow", "find_muhurtas", "WEEKDAYS", "clear_muhurta_evaluators"),
+    "grahas": ("NAVAGRAHAS", "GrahaPosition", "graha_snapshot", "grahas_by_name", "graha_columns",
+               "clear_graha_snapshots"),
+    "feed": ("FeedEvent", "FEED_KINDS", "KIND_LABELS", "feed_events", "ics_lines", "csv_rows", "csv_lines",
+             "feed_lines", "years_after"),
+    "shiva_vaas": ("shiva_vaas", "shiva_vaas_for_index", "shiva_vaas_at", "shiva_vaas_windows",
+                   "shiva_vaas_calendar", "ABODES"),
+    "instrument": ("count_calls", "Profile", "profile_run", "stage", "timed", "log_sink"),
+}
+_WHERE = {name: mod for mod, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_WHERE)
+
+def __getattr__(name):
+    if name not in _WHERE:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_WHERE[name]}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return __all__
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/_lazy.py
+
+import importlib
+
+from .instrument import COUNTED, tick
+
+class LazyModule:
+    """Stand-in that imports the real module on first attribute access.
+
+    Attributes are cached on the proxy after the first lookup; names in
+    `counted` are wrapped so instrument.count_calls() can see them.
+    """
+
+    def __init__(self, name, counted=()):
+        self._name = name
+        self._counted = counted
+        self._mod = None
+
+    def __getattr__(self, attr):
+        if self._mod is None:
+            self._mod = importlib.import_module(self._name)
+        value = getattr(self._mod, attr)
+        if attr in self._counted:
+            value = _counting(attr, value)
+        setattr(self, attr, value)
+        return value
+
+def _counting(name, fn):
+    def wrapper(*args, **kwargs):
+        tick(name)
+        return fn(*args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+swe = LazyModule("swisseph", COUNTED)
+
+# Swiss Ephemeris body ids (fixed by the C library), usable without importing it.
+SUN, MOON, MERCURY, VENUS, MARS, JUPITER, SATURN = 0, 1, 2, 3, 4, 5, 6
+MEAN_NODE, TRUE_NODE = 10, 11
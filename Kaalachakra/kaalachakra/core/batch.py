@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/batch.py
+
+import argparse
+import csv
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from datetime import date, timedelta
+
+Location = namedtuple("Location", "name lat lon tz_name")
+
+# ---------- Worker side ----------
+# Each worker is its own process with its own Swiss Ephemeris state; topo and
+# sidereal mode are set per call by core.context, only the data path is global.
+def _init_worker(ephe_path=None):
+    if ephe_path:
+        import swisseph as swe
+        swe.set_ephe_path(ephe_path)
+
+def _calendar_job(loc, start, days, trim, grahas):
+    from .calendar import panchang_calendar
+    return loc, start, panchang_calendar(start, days, loc.lon, loc.lat, loc.tz_name, trim, grahas)
+
+# ---------- Driver ----------
+def as_location(item, i=0):
+    """Accept Location, (lat, lon, tz_name) or (name, lat, lon, tz_name)."""
+    if isinstance(item, Location):
+        return item
+    if len(item) == 3:
+        return Location(f"loc{i}", float(item[0]), float(item[1]), item[2])
+    return Location(item[0], float(item[1]), float(item[2]), item[3])
+
+def batch_calendars(locations, start, days, trim=0.0, workers=None, chunk_days=366, ephe_path=None, grahas=None):
+    """Yield (Location, chunk_start, calendar) for every location and date chunk, as they finish.
+
+    Each location's range is cut into chunks of `chunk_days`, so a few long
+    ranges still spread across all workers. At most 2 x workers jobs are in
+    flight, which keeps memory flat however many locations are queued.
+    grahas ("mean"/"true") adds the nine-graha columns to every calendar.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = ((as_location(loc, i), start + timedelta(days=off), min(chunk_days, days - off))
+            for i, loc in enumerate(locations) for off in range(0, days, chunk_days))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ephe_path,)) as pool:
+        pending = set()
+        for loc, chunk_start, n in jobs:
+            pending.add(pool.submit(_calendar_job, loc, chunk_start, n, trim, grahas))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+        for fut in as_completed(pending):
+            yield fut.result()
+
+def read_locations(path):
+    """Locations from a CSV with name, lat, lon, tz columns."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [Location(r["name"], float(r["lat"]), float(r["lon"]), r["tz"]) for r in csv.DictReader(f)]
+
+# ---------- CLI ----------
+def main(argv=None):
+    from .calendar import write_csv
+    ap = argparse.ArgumentParser(description="Panchang calendars for many locations, one CSV per location and chunk.")
+    ap.add_argument("locations", help="CSV with name, lat, lon, tz columns")
+    ap.add_argument("--start", type=date.fromisoformat, default=date.today())
+    ap.add_argument("--days", type=int, default=1)
+    ap.add_argument("--trim", type=float, default=0.0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--chunk-days", type=int, default=366)
+    ap.add_argument("--ephe-path", default=None)
+    ap.add_argument("--grahas", choices=("mean", "true"), help="add nine-graha rashi columns, Rahu/Ketu from this node")
+    ap.add_argument("--out", default="panchang_out")
+    args = ap.parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    for loc, chunk_start, cal in batch_calendars(read_locations(args.locations), args.start, args.days, args.trim,
+                                                 args.workers, args.chunk_days, args.ephe_path, args.grahas):
+        path = os.path.join(args.out, f"{loc.name}_{chunk_start.isoformat()}.csv")
+        write_csv(cal, loc.tz_name, path)
+        print(path)
+
+if __name__ == "__main__":
+    main()
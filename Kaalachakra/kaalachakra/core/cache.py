@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/cache.py
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# ---------- Process-wide panchang cache ----------
+GRID_DEG = 0.01         # ~1 km cells; sunrise moves by a few seconds at most inside one
+MAX_ENTRIES = 512
+FROM_ENV = "env"        # store=FROM_ENV: open core.store.open_store() ($KAALACHAKRA_STORE) on first miss
+
+def snap(x, grid=GRID_DEG):
+    return round(round(x / grid) * grid, 6)
+
+def end_of_day(now):
+    """Local midnight that ends the date of the aware datetime `now` (pytz or zoneinfo)."""
+    d = now.date() + timedelta(days=1)
+    midnight, tz = datetime(d.year, d.month, d.day), now.tzinfo
+    return tz.localize(midnight) if hasattr(tz, "localize") else midnight.replace(tzinfo=tz)
+
+def expiry_of(now):
+    """When a cache entry for the date of `now` goes stale: the end of that local date.
+
+    A sunrise-based panchang is fixed for its whole date (its limb ends are
+    part of it, not a reason to recompute); the live view's next change is
+    next_event().
+    """
+    return end_of_day(now)
+
+EVENT_LABELS = {"tithi": "Tithi", "nak": "Nakshatra", "yoga": "Yoga", "karana": "Karana"}
+
+def next_event(P, now):
+    """(when, label) of the next moment after `now` that changes the live view of P.
+
+    Any limb end from P["transitions"] (karana included), the next sunrise, or
+    local midnight, when the date and with it the cache key roll over.
+    """
+    from .panchang import jd_to_local_dt
+    tz = now.tzinfo
+    cands = [(end_of_day(now), "Midnight")]
+    if P.get("sunrise"):
+        cands += [(t, "Sunrise") for t in (P["sunrise"], P["sunrise"] + timedelta(days=1))]
+    for ev in P.get("transitions", ()):
+        t = jd_to_local_dt(ev.jd, tz)
+        if t > now:
+            cands.append((t, EVENT_LABELS.get(ev.kind, ev.kind) + " ends"))
+            break   # transitions are sorted by time
+    return min((c for c in cands if c[0] > now), key=lambda c: c[0])
+
+class PanchangCache:
+    """compute_panchang results shared by every session of this process.
+
+    Keyed by (local date, snapped lat/lon, tz, trim); each entry lives until
+    the end of its local date (expiry_of) rather than a fixed TTL. Safe to use
+    from Streamlit's session threads; a miss computes outside the lock, so a
+    slow entry never blocks hits.
+    With a PanchangStore behind it, a miss is first looked up on disk and
+    fresh results are written back, so restarts and replicas share the work.
+    """
+
+    def __init__(self, grid=GRID_DEG, max_entries=MAX_ENTRIES, store=None):
+        self.grid = grid
+        self.max_entries = max_entries
+        self._store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.expired = self.evictions = 0
+
+    @property
+    def store(self):
+        if self._store == FROM_ENV:
+            with self._lock:
+                if self._store == FROM_ENV:
+                    from .store import open_store
+                    self._store = open_store()
+        return self._store
+
+    def key(self, local_dt, lon, lat, tz_name, trim):
+        return (local_dt.date(), snap(lat, self.grid), snap(lon, self.grid), tz_name, round(trim, 6))
+
+    def get(self, local_dt, lon, lat, tz_name, trim, compute):
+        """Cached panchang for local_dt; on a miss call compute(lon, lat) with the snapped coordinates."""
+        k = self.key(local_dt, lon, lat, tz_name, trim)
+        with self._lock:
+            hit = self._entries.get(k)
+            if hit is not None:
+                if local_dt < hit[1]:
+                    self.hits += 1
+                    self._entries.move_to_end(k)
+                    return hit[0]
+                self.expired += 1
+                del self._entries[k]
+            self.misses += 1
+        store = self.store
+        P = store.get(k[0], k[2], k[1], tz_name, trim) if store else None
+        if P is None:
+            P = compute(k[2], k[1])
+            if store:
+                store.put(k[0], k[2], k[1], tz_name, trim, P)
+        with self._lock:
+            self._entries[k] = (P, expiry_of(local_dt))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return P
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "expired": self.expired, "evictions": self.evictions,
+                    "hit_rate": self.hits / total if total else 0.0,
+                    "store": self._store.stats() if self._store not in (None, FROM_ENV) else None}
+
+PANCHANG_CACHE = PanchangCache(store=FROM_ENV)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/calendar.py
+
+import csv
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytz
+
+from .ephemeris import SpanEphemeris
+from .riseset import rise_set_table
+from .tables import TITHIS, NAKSHATRAS, YOGAS, KARANA_60, STEP_NAK, RASHIS
+
+# ---------- Limb geometry (vectorized) ----------
+# (limb, step in degrees, count); the angle of each limb comes from limb_angles().
+LIMBS = (("tithi", 12.0, 30), ("nak", STEP_NAK, 27), ("yoga", STEP_NAK, 27), ("karana", 6.0, 60))
+EVAL_OFFSET = 15/1440.0   # panchang is read 15 minutes after sunrise, as in compute_panchang
+NODE_DAYS = 0.25          # crossing search grid
+EPS = 1e-9
+
+def limb_angles(s, m, ds=None, dm=None):
+    """{limb: angle} (and {limb: rate} when speeds are given) for arrays of Sun/Moon longitudes."""
+    ang = {"tithi": (m - s) % 360.0, "nak": m % 360.0, "yoga": (s + m) % 360.0}
+    ang["karana"] = ang["tithi"]
+    if ds is None:
+        return ang
+    rate = {"tithi": dm - ds, "nak": dm, "yoga": ds + dm}
+    rate["karana"] = rate["tithi"]
+    return ang, rate
+
+def limb_index(angle, step, count):
+    return np.clip(np.floor(angle / step - EPS), 0, count - 1).astype(np.int16)
+
+def limb_crossings(eph, jd_start, jd_end, trim=0.0, node_days=NODE_DAYS, tol=1e-6, max_iter=8, limbs=None):
+    """{limb: (jd array, new index array)} of every boundary crossing in [jd_start, jd_end].
+
+    The whole range is sampled from `eph` in one array call; crossings are
+    bracketed on that grid and refined together with vectorized Newton steps.
+    `limbs` restricts the scan to some of LIMBS (default: all four).
+    """
+    grid = np.arange(jd_start, jd_end + node_days, node_days)
+    s, m = eph.longs(grid, trim)
+    angles = limb_angles(s, m)
+    out = {}
+    for limb, step, count in LIMBS:
+        if limbs is not None and limb not in limbs:
+            continue
+        u = np.unwrap(angles[limb], period=360.0)
+        k = np.floor(u / step)
+        i = np.nonzero(k[1:] > k[:-1])[0]
+        target = k[i + 1] * step
+        jd = grid[i] + (target - u[i]) / (u[i + 1] - u[i]) * node_days
+        target %= 360.0
+        for _ in range(max_iter):
+            s1, m1 = eph.longs(jd, trim)
+            ang, rate = limb_angles(s1, m1, *eph.speeds(jd))
+            dx = -((ang[limb] - target + 180.0) % 360.0 - 180.0) / rate[limb]
+            jd = jd + dx
+            if not dx.size or np.abs(dx).max() < tol:
+                break
+        out[limb] = (jd, (k[i + 1] % count).astype(np.int16))
+    return out
+
+# ---------- Calendar ----------
+def panchang_calendar(start, days, lon, lat, tz_name, trim=0.0, grahas=None):
+    """Sunrise-based panchang for `days` dates from `start`, as a dict of NumPy columns.
+
+    Columns: date, sunrise (JD, NaN if none), sunrise_status (core.riseset
+    marker), then for each limb its index at
+    sunrise + 15 min and `<limb>_end` (JD of its next boundary). Without a
+    sunrise the day is read at 06:00 local, like compute_panchang.
+    grahas="mean" or "true" adds the nine-graha columns of
+    core.grahas.graha_columns at the same instants, Rahu/Ketu from that node.
+    """
+    rs = rise_set_table(start, days, lon, lat, tz_name, events=("sunrise",))
+    sr = rs["sunrise"]
+    jd_eval = np.where(np.isnan(sr), rs["midnight"] + 0.25, sr) + EVAL_OFFSET
+
+    eph = SpanEphemeris(lon, lat, max_days=days + 8)
+    s, m = eph.longs(jd_eval, trim)
+    angles = limb_angles(s, m)
+    crossings = limb_crossings(eph, jd_eval[0], jd_eval[-1] + 2.0, trim)
+
+    cal = {"date": rs["date"], "sunrise": sr, "sunrise_status": rs["sunrise_status"]}
+    for limb, step, count in LIMBS:
+        cal[limb] = limb_index(angles[limb], step, count)
+        jds = crossings[limb][0]
+        pos = np.searchsorted(jds, jd_eval, side="right")
+        cal[limb + "_end"] = np.append(jds, np.nan)[pos]
+    if grahas:
+        from .grahas import graha_columns
+        cal.update(graha_columns(jd_eval, lon, lat, trim, grahas, near=eph))
+    return cal
+
+# ---------- Export ----------
+NAMES = {"tithi": TITHIS, "nak": NAKSHATRAS, "yoga": YOGAS, "karana": KARANA_60}
+JD_COLUMNS = ("sunrise", "tithi_end", "nak_end", "yoga_end", "karana_end")
+
+def jd_to_local(jd_ut, tz):
+    if np.isnan(jd_ut): return None
+    return (datetime(2000, 1, 1, 12, tzinfo=timezone.utc) + timedelta(days=float(jd_ut) - 2451545.0)).astimezone(tz)
+
+def graha_keys(cal):
+    """Lowercased graha names whose columns panchang_calendar(grahas=...) added to `cal`."""
+    from .grahas import NAVAGRAHAS
+    return [g.lower() for g in NAVAGRAHAS if g.lower() + "_long" in cal]
+
+def calendar_rows(cal, tz_name):
+    """Yield one dict per day with names and local ISO times."""
+    tz = pytz.timezone(tz_name)
+    for i in range(len(cal["date"])):
+        row = {"date": str(cal["date"][i])}
+        for col in JD_COLUMNS:
+            dt = jd_to_local(cal[col][i], tz)
+            row[col] = dt.isoformat(timespec="seconds") if dt else ""
+        for limb, names in NAMES.items():
+            row[limb] = names[cal[limb][i]]
+        for key in graha_keys(cal):
+            row[key] = RASHIS[cal[key + "_rashi"][i]] + (" (R)" if cal[key + "_retro"][i] else "")
+        yield row
+
+def to_dataframe(cal, tz_name):
+    """pandas DataFrame with names and tz-aware local times (needs pandas)."""
+    import pandas as pd
+    df = pd.DataFrame({"date": cal["date"]})
+    for col in JD_COLUMNS:
+        utc = pd.to_datetime((cal[col] - 2440587.5) * 86400.0, unit="s", utc=True)
+        df[col] = utc.tz_convert(tz_name)
+    for limb, names in NAMES.items():
+        df[limb] = np.asarray(names, dtype=object)[cal[limb]]
+        df[limb + "_idx"] = cal[limb]
+    for key in graha_keys(cal):
+        df[key] = np.asarray(RASHIS, dtype=object)[cal[key + "_rashi"]]
+        for col in ("_long", "_speed", "_retro"):
+            df[key + col] = cal[key + col]
+    return df
+
+def write_csv(cal, tz_name, path):
+    fields = ["date", "sunrise", "tithi", "tithi_end", "nak", "nak_end", "yoga", "yoga_end", "karana", "karana_end"]
+    fields += graha_keys(cal)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        w.writerows(calendar_rows(cal, tz_name))
+
+def write_parquet(cal, tz_name, path):
+    """Parquet export via pandas + pyarrow (both ship with Streamlit)."""
+    to_dataframe(cal, tz_name).to_parquet(path, index=False)
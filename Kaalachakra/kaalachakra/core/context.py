@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/context.py
+
+import threading
+
+from ._lazy import swe
+
+# ---------- Swiss Ephemeris state ----------
+# set_sid_mode / set_topo write library state that calc_ut reads later, and
+# rise_trans overwrites the topo point with its own geopos. Depending on how
+# the C library was built that state is process-global (sessions race) or
+# thread-local (a fresh thread starts from the default Fagan/Bradley mode).
+# Each pyswisseph call holds the GIL, so only the gap between "set state" and
+# "calc" can race: _LOCK covers exactly that gap. _APPLIED remembers what the
+# library holds and which thread put it there; a context re-applies its state
+# whenever another thread or context has been in between, which is correct
+# for both builds and costs nothing for a thread that keeps one location.
+_LOCK = threading.Lock()
+_APPLIED = {"owner": None, "sid_mode": None, "topo": None}
+_thread = threading.local()
+
+def _owner():
+    token = getattr(_thread, "token", None)
+    if token is None:
+        token = _thread.token = object()   # unlike get_ident(), never reused by a later thread
+    return token
+
+LAHIRI = 1   # swe.SIDM_LAHIRI
+
+class EphemerisContext:
+    """Location, sidereal mode and flags for Swiss Ephemeris calls, safe across threads.
+
+        ctx = EphemerisContext(lon, lat)
+        s, m = ctx.longs(jd, (SUN, MOON))
+
+    Leave lon/lat as None for geocentric positions. Contexts are cheap, hold
+    no C state of their own and can be shared between threads.
+    """
+
+    __slots__ = ("lon", "lat", "alt", "sid_mode", "extra_flags", "_flags")
+
+    def __init__(self, lon=None, lat=None, alt=0.0, sid_mode=LAHIRI, extra_flags=0):
+        self.lon, self.lat, self.alt = lon, lat, alt
+        self.sid_mode = sid_mode
+        self.extra_flags = extra_flags
+        self._flags = None
+
+    @property
+    def topo(self):
+        return None if self.lon is None else (self.lon, self.lat, self.alt)
+
+    @property
+    def flags(self):
+        if self._flags is None:
+            f = swe.FLG_SWIEPH | self.extra_flags
+            if self.sid_mode is not None:
+                f |= swe.FLG_SIDEREAL
+            if self.lon is not None:
+                f |= getattr(swe, "FLG_TOPOCTR", 0)
+            self._flags = f
+        return self._flags
+
+    def _apply(self):
+        """Push this context's state into the library; caller holds _LOCK."""
+        owner = _owner()
+        if _APPLIED["owner"] is not owner:
+            _APPLIED.update(owner=owner, sid_mode=None, topo=None)
+        if self.sid_mode is not None and _APPLIED["sid_mode"] != self.sid_mode:
+            swe.set_sid_mode(self.sid_mode, 0, 0)
+            _APPLIED["sid_mode"] = self.sid_mode
+        topo = self.topo
+        if topo is not None and _APPLIED["topo"] != topo:
+            swe.set_topo(*topo)
+            _APPLIED["topo"] = topo
+
+    # ----- calc_ut -----
+    def calc_ut(self, jd_ut, body, flags=0):
+        """swe.calc_ut(jd_ut, body, self.flags | flags) under this context's state."""
+        f = self.flags | flags
+        with _LOCK:
+            self._apply()
+            return swe.calc_ut(jd_ut, body, f)
+
+    def longs(self, jd_ut, bodies, trim=0.0):
+        """Longitudes (°) of `bodies` at one instant, read under a single lock."""
+        f = self.flags
+        with _LOCK:
+            self._apply()
+            return [(swe.calc_ut(jd_ut, b, f)[0][0] + trim) % 360.0 for b in bodies]
+
+    def longs_speed(self, jd_ut, bodies, trim=0.0):
+        """(longitude °, speed °/day) per body from FLG_SPEED."""
+        f = self.flags | swe.FLG_SPEED
+        with _LOCK:
+            self._apply()
+            xs = [swe.calc_ut(jd_ut, b, f)[0] for b in bodies]
+        return [((x[0] + trim) % 360.0, x[3]) for x in xs]
+
+    def series(self, jds, body):
+        """Untrimmed longitudes of one body at many instants, read under a single lock."""
+        f = self.flags
+        with _LOCK:
+            self._apply()
+            return [swe.calc_ut(jd, body, f)[0][0] for jd in jds]
+
+    # ----- rise_trans -----
+    def rise_trans(self, jd_ut, body, mode):
+        """First rise/set/transit JD after jd_ut at this location (disc centre), or None."""
+        geopos = self.topo or (0.0, 0.0, 0.0)
+        with _LOCK:
+            _APPLIED["topo"] = None   # rise_trans leaves its geopos behind as the topo point
+            try:
+                ret, tret = swe.rise_trans(jd_ut, body, mode | swe.BIT_DISC_CENTER, geopos, 1013.25, 15.0)
+            except Exception:
+                return None
+        return tret[0] if ret >= 0 else None
+
+    def __repr__(self):
+        where = "geocentric" if self.lon is None else f"lon={self.lon}, lat={self.lat}"
+        return f"EphemerisContext({where}, sid_mode={self.sid_mode})"
+
+def reset_applied():
+    """Forget the cached library state, e.g. after calling swe.set_topo directly."""
+    with _LOCK:
+        _APPLIED.update(owner=None, sid_mode=None, topo=None)
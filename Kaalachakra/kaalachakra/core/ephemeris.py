@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/ephemeris.py
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.polynomial import chebyshev as C
+
+from ._lazy import SUN, MOON
+from .context import EphemerisContext
+from .instrument import timed
+
+# ---------- Chebyshev-fitted sidereal longitudes ----------
+# Per-day fit degree: the topocentric Moon carries ~1° of diurnal parallax and
+# needs 13 to stay under 0.01″; the Sun and the slow planets settle far sooner.
+DEGREE = {SUN: 8, MOON: 13}
+DEFAULT_DEGREE = 8
+
+_NODES = {}
+
+def cheb_nodes(deg):
+    """Ascending Chebyshev nodes on [-1, 1] and the matrix taking values there to coefficients."""
+    if deg not in _NODES:
+        n = deg + 1
+        x = -np.cos(np.pi * (np.arange(n) + 0.5) / n)
+        m = C.chebvander(x, deg).T * (2.0 / n)
+        m[0] *= 0.5
+        _NODES[deg] = (x, m)
+    return _NODES[deg]
+
+class ChebyshevEphemeris:
+    """Sidereal (Lahiri) longitudes of `bodies`, fitted per fixed segment.
+
+    Each segment of `segment_days` is sampled once per body with `swe.calc_ut`
+    at `degree + 1` Chebyshev nodes; every later lookup inside it is a
+    polynomial evaluation (NumPy for arrays, Clenshaw on floats for scalars). Pass lon/lat for topocentric positions. The ayanamsa
+    trim is applied at evaluation time, so one fit serves every trim value.
+    Swiss Ephemeris is reached through an EphemerisContext, so evaluators for
+    different locations can be used from different threads.
+    """
+
+    def __init__(self, bodies=(SUN, MOON), lon=None, lat=None,
+                 degree=None, segment_days=1.0, max_segments=64):
+        self.bodies = tuple(bodies)
+        self.lon, self.lat = lon, lat
+        self.degrees = [degree or DEGREE.get(b, DEFAULT_DEGREE) for b in self.bodies]
+        self.segment_days = segment_days
+        self.max_segments = max_segments
+        self.ctx = EphemerisContext(lon, lat)
+        self._segments = OrderedDict()
+        self._lock = threading.RLock()   # one fit per segment even when sessions share the evaluator
+        self.hits = self.misses = self.calc_calls = 0
+
+    # ----- direct Swiss Ephemeris -----
+    def direct(self, jd_ut):
+        """Untrimmed longitudes straight from swe.calc_ut (the reference)."""
+        self.calc_calls += len(self.bodies)
+        return self.ctx.longs(jd_ut, self.bodies)
+
+    # ----- segments -----
+    def _segment(self, k):
+        with self._lock:
+            seg = self._segments.get(k)
+            if seg is not None:
+                self.hits += 1
+                self._segments.move_to_end(k)
+                return seg
+            self.misses += 1
+            return self._fit(k)
+
+    @timed("ephemeris_fit")
+    def _fit(self, k):
+        a = k * self.segment_days
+        b = a + self.segment_days
+        fits = []
+        for body, deg in zip(self.bodies, self.degrees):
+            x, to_coef = cheb_nodes(deg)
+            self.calc_calls += len(x)
+            y = np.array(self.ctx.series(a + (x + 1.0) * 0.5 * (b - a), body))
+            y[1:] = y[0] + np.cumsum((np.diff(y) + 180.0) % 360.0 - 180.0)  # unwrap
+            coef = to_coef @ y
+            fits.append((coef, C.chebder(coef) * (2.0 / (b - a))))
+        seg = (a, b, fits, [(c.tolist(), d.tolist()) for c, d in fits])
+        self._segments[k] = seg
+        if len(self._segments) > self.max_segments:
+            self._segments.popitem(last=False)
+        return seg
+
+    def _eval_scalar(self, jd, deriv):
+        # Clenshaw on plain floats: a single lookup costs a few µs instead of the array path's ~100
+        a, b, _, lists = self._segment(int(np.floor(jd / self.segment_days)))
+        x2 = 2.0 * (2.0 * (jd - a) / (b - a) - 1.0)
+        out = np.empty(len(self.bodies))
+        for i, pair in enumerate(lists):
+            coef = pair[1 if deriv else 0]
+            b1 = b2 = 0.0
+            for c in coef[:0:-1]:
+                b1, b2 = c + x2 * b1 - b2, b1
+            out[i] = coef[0] + 0.5 * x2 * b1 - b2
+        return out
+
+    def _eval(self, jd_ut, deriv):
+        if np.ndim(jd_ut) == 0:
+            return self._eval_scalar(float(jd_ut), deriv)
+        jd = np.asarray(jd_ut, dtype=float)
+        flat = jd.reshape(-1)
+        out = np.empty((len(self.bodies), flat.size))
+        keys, inv = np.unique(np.floor(flat / self.segment_days).astype(np.int64), return_inverse=True)
+        segs = [self._segment(int(k)) for k in keys]
+        a = np.array([seg[0] for seg in segs])[inv]
+        b = np.array([seg[1] for seg in segs])[inv]
+        x = 2.0 * (flat - a) / (b - a) - 1.0
+        # one Vandermonde product per body covers every segment at once
+        for i in range(len(self.bodies)):
+            coef = np.array([seg[2][i][1 if deriv else 0] for seg in segs])[inv]
+            out[i] = np.einsum("ij,ij->i", C.chebvander(x, coef.shape[1] - 1), coef) if flat.size else 0.0
+        return out.reshape((len(self.bodies),) + jd.shape)
+
+    # ----- public lookups -----
+    def longs(self, jd_ut, trim=0.0):
+        """Sidereal longitudes (°), one row per body; jd_ut may be a scalar or an array."""
+        return (self._eval(jd_ut, False) + trim) % 360.0
+
+    def speeds(self, jd_ut):
+        """Longitude speeds (°/day) from the derivative of the fit."""
+        return self._eval(jd_ut, True)
+
+    def check(self, jd_start, days=1.0, n=97):
+        """Max |fit - swe.calc_ut| per body, in arc-seconds, over n points."""
+        jds = jd_start + np.linspace(0.0, days, n)
+        fit = self.longs(jds)
+        ref = np.array([self.direct(jd) for jd in jds]).T % 360.0
+        err = np.abs((fit - ref + 180.0) % 360.0 - 180.0) * 3600.0
+        return {b: float(e) for b, e in zip(self.bodies, err.max(axis=1))}
+
+    def cache_info(self):
+        return {"segments": len(self._segments), "max_segments": self.max_segments,
+                "hits": self.hits, "misses": self.misses, "calc_calls": self.calc_calls}
+
+# ---------- Long spans ----------
+# (segment days, degree) per body for multi-year scans. Longer, higher-degree
+# segments still follow the topocentric parallax: under 0.002″ for the Sun and
+# 0.015″ for the Moon (limb ends within ~0.05 s), at ~16 calc_ut per day instead of 23.
+SPAN_FITS = {SUN: (8.0, 36), MOON: (2.0, 22)}
+
+class SpanEphemeris:
+    """Topocentric Sun/Moon for long ranges: one ChebyshevEphemeris per body on its SPAN_FITS segments.
+
+    Same longs/speeds interface as ChebyshevEphemeris((SUN, MOON), ...), so
+    limb_crossings takes either. Fits are kept for about `max_days`, so a
+    scan that walks forward holds a bounded number of them.
+    """
+
+    bodies = (SUN, MOON)
+
+    def __init__(self, lon=None, lat=None, max_days=64):
+        self.max_days = max_days
+        self.parts = [ChebyshevEphemeris((b,), lon, lat, degree=SPAN_FITS[b][1], segment_days=SPAN_FITS[b][0],
+                                         max_segments=int(max_days / SPAN_FITS[b][0]) + 4) for b in self.bodies]
+
+    def longs(self, jd_ut, trim=0.0):
+        return np.concatenate([p.longs(jd_ut, trim) for p in self.parts])
+
+    def speeds(self, jd_ut):
+        return np.concatenate([p.speeds(jd_ut) for p in self.parts])
+
+    def check(self, jd_start, days=1.0, n=97):
+        out = {}
+        for p in self.parts:
+            out.update(p.check(jd_start, days, n))
+        return out
+
+    def cache_info(self):
+        infos = [p.cache_info() for p in self.parts]
+        return {k: sum(i[k] for i in infos) for k in infos[0]}
+
+# ---------- Shared evaluators ----------
+_EVALUATORS = OrderedDict()
+_EVALUATORS_LOCK = threading.Lock()
+MAX_EVALUATORS = 32
+
+def shared_ephemeris(bodies=(SUN, MOON), lon=None, lat=None):
+    """Process-wide evaluator for (bodies, location), kept in a bounded LRU.
+
+    Leave lon/lat as None for geocentric positions.
+    """
+    key = (tuple(bodies), None if lon is None else (round(lon, 6), round(lat, 6)))
+    with _EVALUATORS_LOCK:
+        eph = _EVALUATORS.get(key)
+        if eph is None:
+            eph = _EVALUATORS[key] = ChebyshevEphemeris(bodies, lon, lat)
+            if len(_EVALUATORS) > MAX_EVALUATORS:
+                _EVALUATORS.popitem(last=False)
+        else:
+            _EVALUATORS.move_to_end(key)
+    return eph
+
+def clear_shared_ephemeris():
+    with _EVALUATORS_LOCK:
+        _EVALUATORS.clear()
+
+def sun_moon_ephemeris(lon, lat):
+    """Shared topocentric Sun/Moon evaluator for a location."""
+    return shared_ephemeris((SUN, MOON), lon, lat)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/feed.py
+
+import argparse
+import csv
+import heapq
+import io
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+import pytz
+
+from .tables import TITHIS, NAKSHATRAS, YOGAS
+
+# ---------- Events ----------
+# One event per tithi / nakshatra / yoga interval; festivals and Shiva Vaas
+# windows are tithi intervals seen another way (every tithi change moves the
+# abode, see core.shiva_vaas.ABODES). start/end are JD UT.
+FeedEvent = namedtuple("FeedEvent", "kind name start end index")
+
+FEED_KINDS = ("tithi", "nak", "yoga", "festival", "shiva_vaas")
+KIND_LABELS = {"tithi": "Tithi", "nak": "Nakshatra", "yoga": "Yoga", "festival": "Festival", "shiva_vaas": "Shiva Vaas"}
+FESTIVALS = {10: "Shukla Ekadashi", 14: "Purnima", 25: "Krishna Ekadashi", 29: "Amavasya"}   # by tithi index
+LIMB_OF = {"tithi": "tithi", "nak": "nak", "yoga": "yoga", "festival": "tithi", "shiva_vaas": "tithi"}
+CHUNK_DAYS = 32
+MAX_LIMB_DAYS = 1.5    # no tithi, nakshatra or yoga lasts longer (the longest are ~1.15 days)
+OVERLAP_DAYS = 0.5     # each chunk rescans this much of the previous one, so no edge crossing is lost
+NONE = (float("-inf"), None)
+
+def years_after(start, years):
+    """The date `years` calendar years after `start` (29 February falls back to the 28th)."""
+    try:
+        return start.replace(year=start.year + years)
+    except ValueError:
+        return start.replace(year=start.year + years, day=28)
+
+def _midnight_jd(d, tz):
+    from .panchang import jd_from_dt
+    return jd_from_dt(tz.localize(datetime(d.year, d.month, d.day)))
+
+def _limb_events(kinds, limb, start, end, idx):
+    from .shiva_vaas import ABODES
+    if limb == "nak":
+        yield FeedEvent("nak", NAKSHATRAS[idx], start, end, idx)
+    elif limb == "yoga":
+        yield FeedEvent("yoga", YOGAS[idx], start, end, idx)
+    else:
+        if "tithi" in kinds:
+            yield FeedEvent("tithi", TITHIS[idx], start, end, idx)
+        if "festival" in kinds and idx in FESTIVALS:
+            yield FeedEvent("festival", FESTIVALS[idx], start, end, idx)
+        if "shiva_vaas" in kinds:
+            yield FeedEvent("shiva_vaas", ABODES[idx % 7][0], start, end, idx)
+
+def feed_events(start, days, lon, lat, tz_name, trim=0.0, kinds=FEED_KINDS, chunk_days=CHUNK_DAYS):
+    """Yield FeedEvent for `days` local dates from `start`, ordered by start time, as they are computed.
+
+    Every event that overlaps the range is yielded whole, so the first ones
+    may begin before local midnight of `start`. The range is scanned in
+    chunks of `chunk_days` with limb_crossings on a SpanEphemeris that only
+    keeps about one chunk of fits; events wait in a heap just until no
+    earlier one can still turn up. Memory stays flat however long the range.
+    """
+    from .calendar import limb_crossings
+    from .ephemeris import SpanEphemeris
+
+    unknown = set(kinds) - set(FEED_KINDS)
+    if unknown:
+        raise ValueError(f"unknown feed kinds {sorted(unknown)}; choose from {FEED_KINDS}")
+    tz = pytz.timezone(tz_name)
+    jd0, jd1 = _midnight_jd(start, tz), _midnight_jd(start + timedelta(days=days), tz)
+    limbs = sorted({LIMB_OF[k] for k in kinds})
+    eph = SpanEphemeris(lon, lat, max_days=chunk_days + OVERLAP_DAYS + 2.0)
+    prev = {}          # limb -> (jd, index) of its last crossing
+    pending, seq = [], 0
+    a = jd0 - MAX_LIMB_DAYS
+    while limbs and min(prev.get(l, NONE)[0] for l in limbs) < jd1:
+        b = a + chunk_days
+        found = limb_crossings(eph, a - OVERLAP_DAYS, b, trim, limbs=limbs)
+        for limb in limbs:
+            for jd, idx in zip(*found[limb]):
+                jd, idx = float(jd), int(idx)
+                last = prev.get(limb)
+                if jd >= b or (last and jd <= last[0] + 1e-4):
+                    continue
+                if last and jd > jd0 and last[0] < jd1:
+                    for ev in _limb_events(kinds, limb, last[0], jd, last[1]):
+                        heapq.heappush(pending, (ev.start, seq, ev))
+                        seq += 1
+                prev[limb] = (jd, idx)
+        # every event still to come starts at some limb's last crossing or later
+        horizon = min(prev.get(l, NONE)[0] for l in limbs)
+        while pending and pending[0][0] < horizon:
+            yield heapq.heappop(pending)[2]
+        a = b
+    while pending:
+        yield heapq.heappop(pending)[2]
+
+# ---------- Writers ----------
+# Both writers take any iterable of events and emit as they consume it, so
+# feed_events -> ics_lines -> a file or HTTP response never holds the range.
+def _local(jd, tz):
+    from .calendar import jd_to_local
+    return jd_to_local(jd, tz)
+
+def _utc_stamp(jd):
+    return _local(jd, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def _detail(ev):
+    if ev.kind == "shiva_vaas":
+        from .shiva_vaas import ABODES
+        return f"{ABODES[ev.index % 7][1]} ({TITHIS[ev.index]})"
+    return ""
+
+def _ics_text(s):
+    return s.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _fold(line):
+    """RFC 5545 content line: at most 75 octets per physical line, continuations start with a space."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, cur, size = [], [], 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > (75 if not parts else 74):
+            parts.append("".join(cur))
+            cur, size = [], 0
+        cur.append(ch)
+        size += n
+    parts.append("".join(cur))
+    return "\r\n ".join(parts) + "\r\n"
+
+def ics_lines(events, tz_name, lon, lat, name="Kaalachakra Panchang"):
+    """Yield the lines of an iCalendar (RFC 5545) feed for `events`, CRLF-terminated.
+
+    Times are UTC; UIDs depend only on kind, index, start second and place, so a
+    regenerated feed updates a subscribed calendar instead of duplicating it.
+    """
+    tz = pytz.timezone(tz_name)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    where = f"{lat:.4f},{lon:.4f}"
+    for line in ("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Kaalachakra//Panchang feed//EN", "CALSCALE:GREGORIAN",
+                 "METHOD:PUBLISH", f"X-WR-CALNAME:{_ics_text(name)}", f"X-WR-TIMEZONE:{tz_name}",
+                 f"X-WR-CALDESC:{_ics_text(f'Tithi, nakshatra, yoga, festivals and Shiva Vaas at {where} ({tz_name})')}"):
+        yield _fold(line)
+    for ev in events:
+        a, b = _local(ev.start, tz), _local(ev.end, tz)
+        desc = f"{a:%d %b %Y %H:%M} – {b:%d %b %Y %H:%M} {tz_name}"
+        if _detail(ev):
+            desc = _detail(ev) + "\n" + desc
+        for line in ("BEGIN:VEVENT",
+                     f"UID:{ev.kind}-{ev.index}-{round(ev.start * 86400.0)}@{where}",
+                     f"DTSTAMP:{stamp}",
+                     f"DTSTART:{_utc_stamp(ev.start)}",
+                     f"DTEND:{_utc_stamp(ev.end)}",
+                     f"SUMMARY:{_ics_text(KIND_LABELS[ev.kind] + ': ' + ev.name)}",
+                     f"DESCRIPTION:{_ics_text(desc)}",
+                     f"CATEGORIES:{_ics_text(KIND_LABELS[ev.kind])}",
+                     "TRANSP:TRANSPARENT",
+                     "END:VEVENT"):
+            yield _fold(line)
+    yield "END:VCALENDAR\r\n"
+
+CSV_FIELDS = ("kind", "name", "index", "start", "end", "detail")
+
+def csv_rows(events, tz_name):
+    """Yield one dict per event with local ISO times (fields: CSV_FIELDS)."""
+    tz = pytz.timezone(tz_name)
+    for ev in events:
+        yield {"kind": ev.kind, "name": ev.name, "index": ev.index,
+               "start": _local(ev.start, tz).isoformat(timespec="seconds"),
+               "end": _local(ev.end, tz).isoformat(timespec="seconds"), "detail": _detail(ev)}
+
+def csv_lines(events, tz_name):
+    """Yield the CSV text, header first, one line per event."""
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=CSV_FIELDS)
+    w.writeheader()
+    for row in csv_rows(events, tz_name):
+        w.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
+
+def feed_lines(events, fmt, tz_name, lon, lat):
+    """ics_lines or csv_lines by `fmt` ("ics" / "csv")."""
+    if fmt == "ics":
+        return ics_lines(events, tz_name, lon, lat)
+    if fmt == "csv":
+        return csv_lines(events, tz_name)
+    raise ValueError(f"format must be 'ics' or 'csv', not {fmt!r}")
+
+# ---------- CLI ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Panchang event feed (.ics or CSV) for one location over many years.")
+    ap.add_argument("--lat", type=float, required=True)
+    ap.add_argument("--lon", type=float, required=True)
+    ap.add_argument("--tz", default="Asia/Kolkata")
+    ap.add_argument("--start", type=date.fromisoformat, default=date(date.today().year, 1, 1))
+    ap.add_argument("--years", type=int, default=1)
+    ap.add_argument("--trim", type=float, default=0.0)
+    ap.add_argument("--kinds", nargs="*", default=list(FEED_KINDS), choices=FEED_KINDS)
+    ap.add_argument("--format", choices=("ics", "csv"), default="ics")
+    ap.add_argument("--out", help="output file (default: stdout)")
+    args = ap.parse_args(argv)
+    end = years_after(args.start, args.years)
+    events = feed_events(args.start, (end - args.start).days, args.lon, args.lat, args.tz, args.trim, args.kinds)
+    n, t0 = 0, time.perf_counter()
+
+    def counted():
+        nonlocal n
+        for ev in events:
+            n += 1
+            yield ev
+    f = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    try:
+        f.writelines(feed_lines(counted(), args.format, args.tz, args.lon, args.lat))
+    finally:
+        if args.out:
+            f.close()
+    print(f"{n} events, {args.start} .. {end}, {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/grahas.py
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from ._lazy import SUN, MOON, MARS, MERCURY, JUPITER, VENUS, SATURN, MEAN_NODE, TRUE_NODE
+from .context import EphemerisContext
+from .instrument import timed
+from .tables import RASHIS
+
+# ---------- Navagrahas ----------
+# Sun and Moon are topocentric when a location is given, as in the panchang;
+# the planets and nodes stay geocentric (parallax moves them by seconds of
+# arc, and its daily wobble would break the multi-day fits of graha_columns).
+NAVAGRAHAS = ("Surya", "Chandra", "Mangala", "Budha", "Guru", "Shukra", "Shani", "Rahu", "Ketu")
+PLANETS = (MARS, MERCURY, JUPITER, VENUS, SATURN)          # Mangala .. Shani, in NAVAGRAHAS order
+NODES = {"mean": MEAN_NODE, "true": TRUE_NODE}
+# graha_columns fits per group: (bodies, segment days, degree), each under 2″
+# against swe.calc_ut. The true node wobbles with a ~2 week period and gets short segments.
+FIT_GROUPS = (((MARS, MERCURY, VENUS), 32.0, 16), ((JUPITER, SATURN, MEAN_NODE), 64.0, 10), ((TRUE_NODE,), 8.0, 10))
+
+GrahaPosition = namedtuple("GrahaPosition", "name longitude rashi rashi_idx degree speed retrograde")
+
+def _node_id(node):
+    if node not in NODES:
+        raise ValueError(f"node must be 'mean' or 'true', not {node!r}")
+    return NODES[node]
+
+def _position(name, lon, speed):
+    lon = float(lon) % 360.0
+    k = int(lon // 30.0)
+    return GrahaPosition(name, lon, RASHIS[k], k, lon - 30.0 * k, float(speed), bool(speed < 0.0))
+
+# ---------- Snapshot (one instant) ----------
+@lru_cache(maxsize=1024)
+@timed("graha_snapshot")
+def _snapshot(minute, lon, lat, trim, node):
+    jd = minute / 1440.0
+    near = EphemerisContext(lon, lat).longs_speed(jd, (SUN, MOON), trim)
+    far = EphemerisContext().longs_speed(jd, PLANETS + (_node_id(node),), trim)
+    rahu_lon, rahu_speed = far[-1]
+    pos = near + far[:-1] + [(rahu_lon, rahu_speed), (rahu_lon + 180.0, rahu_speed)]
+    return tuple(_position(name, l, v) for name, (l, v) in zip(NAVAGRAHAS, pos))
+
+def graha_snapshot(when, lon=None, lat=None, trim=0.0, node="mean"):
+    """Sidereal positions of the nine grahas at `when` (aware datetime or JD UT), as GrahaPosition tuples.
+
+    Positions are taken at the start of the minute and memoized per (minute,
+    location, trim, node), so the sankalpa text, the debug panel and the
+    service share one set of Swiss Ephemeris calls. Speeds are °/day;
+    Rahu/Ketu come from the mean or true node ("mean" / "true").
+    """
+    if not isinstance(when, (int, float, np.floating)):
+        from .panchang import jd_from_dt
+        when = jd_from_dt(when)
+    minute = int(np.floor(float(when) * 1440.0 + 1e-6))
+    where = (None, None) if lon is None else (round(lon, 4), round(lat, 4))
+    return _snapshot(minute, *where, round(trim, 6), node)
+
+def grahas_by_name(snapshot):
+    return {g.name: g for g in snapshot}
+
+def clear_graha_snapshots():
+    _snapshot.cache_clear()
+
+# ---------- Calendar (many instants) ----------
+def graha_columns(jds, lon=None, lat=None, trim=0.0, node="mean", near=None):
+    """Flat NumPy columns <graha>_long, _speed, _rashi, _retro (graha lowercased) at every JD of `jds`.
+
+    One vectorized pass: Sun/Moon come from `near` (the topocentric fit the
+    panchang calendar already made) or a fresh one; the planets and the
+    node come from FIT_GROUPS fits on multi-week segments, about 2-3 Swiss
+    Ephemeris calls per day for all seven instead of seven.
+    """
+    from .ephemeris import ChebyshevEphemeris
+    jds = np.asarray(jds, dtype=float)
+    span = int(np.ptp(jds)) + 2 if jds.size else 1
+    near = near or ChebyshevEphemeris((SUN, MOON), lon, lat, max_segments=span + 8)
+    wanted = set(PLANETS) | {_node_id(node)}
+    l, v = near.longs(jds, trim), near.speeds(jds)
+    pos = {SUN: (l[0], v[0]), MOON: (l[1], v[1])}
+    for bodies, seg_days, deg in FIT_GROUPS:
+        bodies = tuple(b for b in bodies if b in wanted)
+        if not bodies:
+            continue
+        eph = ChebyshevEphemeris(bodies, degree=deg, segment_days=seg_days, max_segments=int(span / seg_days) + 4)
+        for b, l, v in zip(bodies, eph.longs(jds, trim), eph.speeds(jds)):
+            pos[b] = (l, v)
+    rahu = pos[_node_id(node)]
+    order = [pos[SUN], pos[MOON]] + [pos[b] for b in PLANETS] + [rahu, ((rahu[0] + 180.0) % 360.0, rahu[1])]
+    cols = {}
+    for name, (l, v) in zip(NAVAGRAHAS, order):
+        key = name.lower()
+        cols.update({key + "_long": l, key + "_speed": v, key + "_rashi": (l // 30.0).astype(np.int16),
+                     key + "_retro": v < 0.0})
+    return cols
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/instrument.py
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+# ---------- Ephemeris call accounting ----------
+# Swiss Ephemeris entry points that are counted when reached through core._lazy.swe.
+COUNTED = ("calc_ut", "rise_trans")
+
+_local = threading.local()
+
+def tick(name):
+    for counts in getattr(_local, "stack", ()):
+        counts[name] += 1
+
+class count_calls:
+    """Count counted swisseph calls made by this thread inside the block.
+
+        with count_calls() as n:
+            compute_panchang(...)
+        n["calc_ut"], n["rise_trans"]
+
+    Blocks nest; an outer block also sees the calls of inner ones.
+    """
+
+    def __enter__(self):
+        self.counts = Counter({name: 0 for name in COUNTED})
+        _local.stack = getattr(_local, "stack", ()) + (self.counts,)
+        return self.counts
+
+    def __exit__(self, *exc):
+        _local.stack = tuple(c for c in _local.stack if c is not self.counts)
+        return False
+
+# ---------- Stage timings ----------
+class Profile:
+    """Inclusive stage timings (ms), ephemeris call counts and gauges for one unit of work."""
+
+    def __init__(self, name="run"):
+        self.name = name
+        self.stages = {}
+        self.calls = Counter({c: 0 for c in COUNTED})
+        self.gauges = {}
+
+    def add(self, stage_name, ms):
+        st = self.stages.setdefault(stage_name, [0.0, 0])
+        st[0] += ms
+        st[1] += 1
+
+    def as_dict(self):
+        return {"name": self.name,
+                "stages": {k: {"ms": round(v[0], 3), "n": v[1]} for k, v in self.stages.items()},
+                "calls": dict(self.calls), "gauges": dict(self.gauges)}
+
+@contextmanager
+def stage(name):
+    """Time the block into every Profile active on this thread (a no-op when none is)."""
+    profiles = getattr(_local, "profiles", ())
+    if not profiles:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - t0) * 1000.0
+        for p in profiles:
+            p.add(name, ms)
+
+def timed(name):
+    """Decorator form of stage()."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+class profile_run:
+    """Collect a Profile for everything this thread does inside the block.
+
+    On exit the whole block is recorded as stage "total" and the profile is
+    passed to `sink` (e.g. log_sink) when one is given. start()/stop() do the
+    same for code, like a Streamlit script, that cannot sit inside a `with`.
+    """
+
+    def __init__(self, name="run", sink=None):
+        self.profile = Profile(name)
+        self.sink = sink
+        self._counter = count_calls()
+
+    def start(self):
+        self.profile.calls = self._counter.__enter__()
+        _local.profiles = getattr(_local, "profiles", ()) + (self.profile,)
+        self._t0 = time.perf_counter()
+        return self.profile
+
+    def stop(self):
+        self.profile.add("total", (time.perf_counter() - self._t0) * 1000.0)
+        _local.profiles = tuple(p for p in _local.profiles if p is not self.profile)
+        self._counter.__exit__(None, None, None)
+        if self.sink:
+            self.sink(self.profile.as_dict())
+        return self.profile
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+def log_sink(record, logger=logging.getLogger("kaalachakra.metrics")):
+    """Headless sink: one JSON line per profile on the kaalachakra.metrics logger."""
+    logger.info(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/lunar.py
+
+import argparse
+import json
+import math
+import os
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from ._lazy import swe, SUN, MOON
+from .context import EphemerisContext, LAHIRI
+from .tables import LUNAR_MONTHS, RASHIS
+
+# ---------- Lunation & sankranti index ----------
+# Geocentric Lahiri new moons, full moons and sankrantis, solved once by
+# `python -m kaalachakra.core.lunar` and shipped as data/lunar_index.npz.
+# Every lookup below is a bisect over these sorted arrays.
+INDEX_PATH = os.path.join(os.path.dirname(__file__), "data", "lunar_index.npz")
+INDEX_YEARS = (1700, 2300)
+
+SYNODIC = 29.530588853
+NEW_MOON_EPOCH = 2451550.09766   # 2000-01-06, mean new moon (Meeus)
+SUN_RATE = 360.0 / 365.256363    # mean sidereal motion, °/day
+UTTARAYANA_SIGNS = (9, 10, 11, 0, 1, 2)   # Makara .. Mithuna
+
+LunarMonth = namedtuple("LunarMonth", "index name adhika kshaya start end")
+
+def _newton(ctx, jd, target, bodies, angle, tol=1e-7, max_iter=12):
+    """Refine jd until angle(longitudes, speeds) == target (mod 360)."""
+    for _ in range(max_iter):
+        xs = ctx.longs_speed(jd, bodies)
+        a, rate = angle(xs)
+        dx = -((a - target + 180.0) % 360.0 - 180.0) / rate
+        jd += dx
+        if abs(dx) < tol:
+            break
+    return jd
+
+def _elongation(xs):
+    (s, ds), (m, dm) = xs
+    return m - s, dm - ds
+
+def _sun(xs):
+    return xs[0]
+
+def build_index(jd_start, jd_end):
+    """dict of arrays: new_moon, new_moon_sun (sidereal Sun at each), full_moon, sankranti (+ first sign)."""
+    ctx = EphemerisContext()   # geocentric, Lahiri
+    k0 = math.floor((jd_start - NEW_MOON_EPOCH) / SYNODIC) - 1
+    k1 = math.ceil((jd_end - NEW_MOON_EPOCH) / SYNODIC) + 1
+    new, new_sun, full = [], [], []
+    for k in range(k0, k1 + 1):
+        jd = _newton(ctx, NEW_MOON_EPOCH + k * SYNODIC, 0.0, (SUN, MOON), _elongation)
+        new.append(jd)
+        new_sun.append(ctx.longs(jd, (SUN,))[0])
+        full.append(_newton(ctx, NEW_MOON_EPOCH + (k + 0.5) * SYNODIC, 180.0, (SUN, MOON), _elongation))
+    s = ctx.longs(new[0], (SUN,))[0]
+    sign = int(s // 30.0) + 1
+    jd = new[0] + (sign * 30.0 - s) / SUN_RATE
+    first_sign, sank = sign % 12, []
+    while jd < full[-1]:
+        jd = _newton(ctx, jd, (sign % 12) * 30.0, (SUN,), _sun)
+        sank.append(jd)
+        sign += 1
+        jd += 30.0 / SUN_RATE
+    return {"new_moon": np.array(new), "new_moon_sun": np.array(new_sun),
+            "full_moon": np.array(full), "sankranti": np.array(sank), "first_sign": first_sign}
+
+def save_index(index, path=INDEX_PATH, **meta):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, new_moon=index["new_moon"], new_moon_sun=index["new_moon_sun"],
+                        full_moon=index["full_moon"], sankranti=index["sankranti"],
+                        first_sign=np.int8(index["first_sign"]), meta=np.array(json.dumps(meta)))
+
+class LunarIndex:
+    """Sorted lunation/sankranti arrays with O(log n) calendar lookups.
+
+    `trim` is the same ayanamsa trim (°) as elsewhere: it shifts the Sun's
+    sidereal longitude, which moves sankrantis and can move a month boundary.
+    """
+
+    def __init__(self, new_moon, new_moon_sun, full_moon, sankranti, first_sign, meta=None):
+        self.new_moon, self.new_moon_sun = new_moon, new_moon_sun
+        self.full_moon, self.sankranti = full_moon, sankranti
+        self.first_sign = int(first_sign)
+        self.meta = meta or {}
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as z:
+            return cls(z["new_moon"], z["new_moon_sun"], z["full_moon"], z["sankranti"],
+                       z["first_sign"], json.loads(str(z["meta"])))
+
+    def _lunation(self, jd):
+        k = bisect_right(self.new_moon, jd) - 1
+        if k < 0 or k + 1 >= len(self.new_moon):
+            raise ValueError(f"JD {jd} is outside the lunar index ({self.meta.get('years')})")
+        return k
+
+    def _amanta(self, k, trim):
+        s0 = int(((self.new_moon_sun[k] + trim) % 360.0) // 30.0)
+        s1 = int(((self.new_moon_sun[k + 1] + trim) % 360.0) // 30.0)
+        passes = (s1 - s0) % 12   # sankrantis inside the lunation
+        i = (s0 + 1) % 12
+        return LunarMonth(i, LUNAR_MONTHS[i], passes == 0, passes >= 2,
+                          float(self.new_moon[k]), float(self.new_moon[k + 1]))
+
+    def lunar_month(self, jd, trim=0.0, scheme="amanta"):
+        """LunarMonth at jd. Amānta months run new moon to new moon and are named
+        after the sign the Sun enters during them; a lunation without a sankranti
+        is adhika (named like the month after it), one with two is kṣaya.
+        scheme="purnimanta" starts each month at the preceding full moon instead.
+        """
+        k = self._lunation(jd)
+        month = self._amanta(k, trim)
+        if scheme == "amanta":
+            return month
+        if scheme != "purnimanta":
+            raise ValueError(f"unknown scheme {scheme!r}")
+        f = bisect_right(self.full_moon, jd) - 1
+        if self.full_moon[f] > month.start:   # Krishna paksha: already the next pūrṇimānta month
+            nxt = self._amanta(k + 1, trim)
+            return nxt._replace(start=float(self.full_moon[f]), end=float(self.full_moon[f + 1]))
+        return month._replace(start=float(self.full_moon[f]), end=float(self.full_moon[f + 1]))
+
+    def solar_sign(self, jd, trim=0.0):
+        """(sign index, sankranti JD it began, next sankranti JD) for the sidereal Sun at jd."""
+        shift = trim / SUN_RATE   # a positive trim brings every sankranti forward
+        j = bisect_right(self.sankranti, jd + shift) - 1
+        if j < 0 or j + 1 >= len(self.sankranti):
+            raise ValueError(f"JD {jd} is outside the lunar index ({self.meta.get('years')})")
+        return (self.first_sign + j) % 12, float(self.sankranti[j] - shift), float(self.sankranti[j + 1] - shift)
+
+    def ayana(self, jd, trim=0.0):
+        """"Uttarayana" from Makara sankranti to Karka sankranti, else "Dakshinayana"."""
+        return "Uttarayana" if self.solar_sign(jd, trim)[0] in UTTARAYANA_SIGNS else "Dakshinayana"
+
+    def new_moons(self, jd_start, jd_end):
+        i, j = np.searchsorted(self.new_moon, (jd_start, jd_end))
+        return self.new_moon[i:j]
+
+    def full_moons(self, jd_start, jd_end):
+        i, j = np.searchsorted(self.full_moon, (jd_start, jd_end))
+        return self.full_moon[i:j]
+
+@lru_cache(maxsize=1)
+def lunar_index():
+    """The shipped index, loaded on first use."""
+    return LunarIndex.load()
+
+def lunar_month(jd, trim=0.0, scheme="amanta"):
+    return lunar_index().lunar_month(jd, trim, scheme)
+
+def ayana(jd, trim=0.0):
+    return lunar_index().ayana(jd, trim)
+
+def solar_sign(jd, trim=0.0):
+    return lunar_index().solar_sign(jd, trim)
+
+# ---------- CLI ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the new moon / full moon / sankranti index.")
+    ap.add_argument("--start", type=int, default=INDEX_YEARS[0], help="first year")
+    ap.add_argument("--end", type=int, default=INDEX_YEARS[1], help="last year")
+    ap.add_argument("--ephe-path", default=None)
+    ap.add_argument("--out", default=INDEX_PATH)
+    args = ap.parse_args(argv)
+    if args.ephe_path:
+        swe.set_ephe_path(args.ephe_path)
+    index = build_index(swe.julday(args.start, 1, 1, 0.0), swe.julday(args.end + 1, 1, 1, 0.0))
+    flags = EphemerisContext().calc_ut(2451545.0, SUN)[1]
+    source = "swieph" if flags & swe.FLG_SWIEPH else "moshier"
+    save_index(index, args.out, years=[args.start, args.end], sid_mode=LAHIRI,
+               swe=swe.version, ephemeris=source)
+    print(f"{len(index['new_moon'])} new moons, {len(index['full_moon'])} full moons, "
+          f"{len(index['sankranti'])} sankrantis ({source}) -> {args.out} ({os.path.getsize(args.out)} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/panchang.py
+
+import math
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta, timezone
+
+from ._lazy import swe, SUN, MOON
+from .context import EphemerisContext
+from .riseset import rise_set_day
+from .instrument import stage, timed
+from .tables import STEP_NAK, TITHIS, NAKSHATRAS, YOGAS, KARANA_60
+
+EPS = 1e-9
+
+# ---------- TIME ----------
+def jd_to_local_dt(jd_ut, tz):
+    if jd_ut is None or (isinstance(jd_ut,float) and math.isnan(jd_ut)): return None
+    y,m,d,ut = swe.revjul(jd_ut, swe.GREG_CAL)
+    return (datetime(y,m,d,tzinfo=timezone.utc)+timedelta(hours=ut)).astimezone(tz)
+
+def jd_from_dt(dt):
+    """JD (UT) of an aware datetime."""
+    u = dt.astimezone(timezone.utc)
+    return swe.julday(u.year, u.month, u.day, u.hour + u.minute/60.0 + (u.second + u.microsecond/1e6)/3600.0)
+
+def tz_name_of(tz):
+    """IANA name of a pytz or zoneinfo zone; the rise/set tables are keyed by it."""
+    name = "UTC" if tz is timezone.utc else getattr(tz, "zone", None) or getattr(tz, "key", None)
+    if not name:
+        raise ValueError(f"need a named IANA time zone (pytz or zoneinfo), got {tz!r}")
+    return name
+
+# ---------- RISE / SET ----------
+@timed("rise_set")
+def sun_moon_rise_set(local_date, lon, lat, tz=None):
+    """Sun/Moon rise and set on the local date of local_date, reported in tz (default: its own zone).
+
+    Read from the cached rise/set table (core.riseset); an event that does not
+    happen that day comes back as None.
+    """
+    tz = tz or local_date.tzinfo
+    r = rise_set_day(local_date.date(), lon, lat, tz_name_of(local_date.tzinfo))
+    return (jd_to_local_dt(r["sunrise"], tz), jd_to_local_dt(r["sunset"], tz),
+            jd_to_local_dt(r["moonrise"], tz), jd_to_local_dt(r["moonset"], tz), r["sunrise"])
+
+# ---------- LONGITUDES & LIMBS ----------
+def sidereal_longs(jd_ut, lon, lat, trim=0.0):
+    s, m = EphemerisContext(lon, lat).longs(jd_ut, (SUN, MOON), trim)
+    return s, m
+
+def sidereal_longs_speed(jd_ut, lon, lat, trim=0.0):
+    """Like sidereal_longs, plus the Sun/Moon speeds (°/day) from FLG_SPEED."""
+    (s, ds), (m, dm) = EphemerisContext(lon, lat).longs_speed(jd_ut, (SUN, MOON), trim)
+    return s, m, ds, dm
+
+def clamp_idx(val, max_exclusive):
+    i = int(math.floor(min(max(val - EPS, 0.0), max_exclusive - EPS)))
+    return max(0, min(i, max_exclusive-1))
+
+def tithi_index(s,m): return clamp_idx(((m - s) % 360.0) / 12.0, 30)
+def nak_index(m):     return clamp_idx((m % 360.0) / STEP_NAK, 27)
+def yoga_index(s,m):  return clamp_idx(((s + m) % 360.0) / STEP_NAK, 27)
+def karana_index(s,m): return clamp_idx(((m - s) % 360.0) / 6.0, 60)
+def karana_name(s,m): return ["Kinstughna"] + ["Bava","Balava","Kaulava","Taitila","Garaja","Vanija","Vishti"]*8 + ["Shakuni","Chatushpada","Naga"][int(((m - s) % 360.0) // 6.0) : int(((m - s) % 360.0) // 6.0)+1] if False else KARANA_60[int(((m - s) % 360.0) // 6.0)]
+
+# Limb angles (tithi, nak, yoga; karana is the tithi angle in half steps) only ever increase;
+# each index spans LIMB_STEP degrees.
+LIMB_STEP = {"tithi": 12.0, "nak": STEP_NAK, "yoga": STEP_NAK, "karana": 6.0}
+
+def limb_angle(kind, s, m, ds, dm):
+    if kind in ("tithi", "karana"): return (m - s) % 360.0, dm - ds
+    if kind=="nak":   return m % 360.0, dm
+    if kind=="yoga":  return (s + m) % 360.0, ds + dm
+    return None, None
+
+def next_change(jd_start, lon, lat, kind, cur_idx, trim=0.0, max_hours=48, tol=1e-5, max_iter=8):
+    """JD (UT) where `kind` leaves `cur_idx`, or None if not within max_hours.
+
+    Linear prediction from angle + rate, then Newton steps on the FLG_SPEED
+    rates (typically 4 evaluations). If a step leaves the [lo, hi] bracket or
+    does not settle, fall back to an hourly scan plus bisection.
+    """
+    with stage("next_change:" + kind):
+        return _next_change(jd_start, lon, lat, kind, cur_idx, trim, max_hours, tol, max_iter)
+
+def _next_change(jd_start, lon, lat, kind, cur_idx, trim, max_hours, tol, max_iter):
+    step = LIMB_STEP.get(kind)
+    if step is None: return None
+    target = ((cur_idx + 1) * step) % 360.0
+    jd_end = jd_start + max_hours/24.0
+
+    def resid_at(jd):
+        # < 0 before the boundary, > 0 after it
+        a, rate = limb_angle(kind, *sidereal_longs_speed(jd, lon, lat, trim))
+        return (a - target + 180.0) % 360.0 - 180.0, rate
+
+    lo, hi = jd_start, None
+    r, rate = resid_at(jd_start)
+    jd = jd_start - r/rate if rate > 0 else None
+    for _ in range(max_iter):
+        if jd is None or jd <= lo or jd >= (hi if hi is not None else jd_end + 1.0):
+            break
+        r, rate = resid_at(jd)
+        if r < 0: lo = jd
+        else: hi = jd
+        if rate <= 0: break
+        dx = -r/rate
+        if abs(dx) < tol:
+            jd += dx
+            return jd if jd <= jd_end else None
+        jd += dx
+
+    # Fallback: bracket with an hourly scan, then bisect.
+    if hi is None:
+        probe = lo
+        while hi is None:
+            if probe >= jd_end: return None
+            probe = min(probe + 1.0/24.0, jd_end)
+            if resid_at(probe)[0] < 0: lo = probe
+            else: hi = probe
+    while hi - lo > tol:
+        mid = (lo + hi)/2.0
+        if resid_at(mid)[0] < 0: lo = mid
+        else: hi = mid
+    return hi if hi <= jd_end else None
+
+# ---------- SHARED-SAMPLE EVENT ENGINE ----------
+Transition = namedtuple("Transition", "jd kind from_idx to_idx")
+
+# The four limbs ride on three angles: elongation (tithi 12°, karana 6°), Moon (nak), Sun+Moon (yoga).
+# Crossings are solved per angle at its finest step; tithi boundaries are the even karana ones.
+EVENT_ANGLES = (
+    ("elong", 6.0,      (("karana", 1, 60), ("tithi", 2, 30))),
+    ("moon",  STEP_NAK, (("nak", 1, 27),)),
+    ("sum",   STEP_NAK, (("yoga", 1, 27),)),
+)
+
+def event_angles(s, m):
+    return {"elong": (m - s) % 360.0, "moon": m % 360.0, "sum": (s + m) % 360.0}
+
+def cubic_through(u):
+    """Coefficients (c0..c3, in t) of the cubic through u at t = -1, 0, 1, 2."""
+    um, u0, u1, u2 = u
+    c2 = 0.5*(um + u1) - u0
+    c3 = (u2 - 3.0*u1 + 3.0*u0 - um)/6.0
+    return u0, u1 - u0 - c2 - c3, c2, c3
+
+def cubic_root(c, target, t=0.5):
+    """t in [0, 1] where the (increasing) cubic c reaches target, by Newton from t."""
+    c0, c1, c2, c3 = c
+    for _ in range(8):
+        f = c0 + t*(c1 + t*(c2 + t*c3)) - target
+        df = c1 + t*(2.0*c2 + 3.0*t*c3)
+        if df <= 0: break
+        dt = f/df
+        t = min(max(t - dt, 0.0), 1.0)
+        if abs(dt) < 1e-10: break
+    return t
+
+def limb_transitions(jd_start, lon, lat, trim=0.0, max_hours=30, node_hours=3, tol=1e-5, max_iter=8, eph=None):
+    """Ordered Transitions of tithi, karana, nak and yoga in [jd_start, jd_start + max_hours].
+
+    Sun/Moon longitudes are sampled once every node_hours, without FLG_SPEED
+    (which costs 5-8 plain calc_ut). Each crossing is located on the cubic
+    through the four nodes around it, then polished with Newton steps on
+    fresh longitudes, the rate taken from that cubic (usually two
+    evaluations); a step that leaves the bracketing nodes bisects instead.
+    A karana end that is also a tithi end is solved once. With `eph` (a
+    ChebyshevEphemeris) every evaluation comes from its fit.
+    """
+    h = node_hours/24.0
+    n = max(1, int(math.ceil(max_hours/node_hours)))
+    jd_end = jd_start + max_hours/24.0
+    cache = {}
+    def angles_at(jd):
+        if jd not in cache:
+            if eph is None: cache[jd] = event_angles(*sidereal_longs(jd, lon, lat, trim))
+            else: cache[jd] = event_angles(*(float(x) for x in eph.longs(jd, trim)))
+        return cache[jd]
+    # one node before jd_start and one past the last segment complete the cubic stencils
+    nodes = [jd_start + k*h for k in range(-1, n + 2)]
+    with stage("longitudes"):
+        if eph is None: samples = [angles_at(jd) for jd in nodes]
+        else: samples = [event_angles(float(s), float(m)) for s, m in eph.longs(nodes, trim).T]
+
+    out = []
+    for name, step, limbs in EVENT_ANGLES:
+        with stage("transitions:" + "+".join(kind for kind, _, _ in limbs)):
+            u = [samples[0][name]]
+            for k in range(1, len(nodes)):   # unwrapped: each angle only ever increases
+                u.append(u[-1] + (samples[k][name] - samples[k-1][name]) % 360.0)
+            for k in range(1, n + 1):        # segment [nodes[k], nodes[k+1]]
+                c = cubic_through(u[k-1:k+3])
+                j = int(math.floor(u[k]/step)) + 1
+                while j*step <= u[k+1]:
+                    target = j*step
+                    lo, hi = nodes[k], nodes[k+1]
+                    t = cubic_root(c, target, (target - u[k])/(u[k+1] - u[k]))
+                    jd = lo + h*t
+                    for _ in range(max_iter):
+                        r = (angles_at(jd)[name] - target % 360.0 + 180.0) % 360.0 - 180.0
+                        if r < 0: lo = jd
+                        else: hi = jd
+                        t = (jd - nodes[k])/h
+                        rate = (c[1] + t*(2.0*c[2] + 3.0*t*c[3]))/h
+                        dx = -r/rate if rate > 0 else hi - lo
+                        if abs(dx) < tol:
+                            jd += dx
+                            break
+                        # Newton inside the bracket, bisection if a step escapes it
+                        jd = jd + dx if lo < jd + dx < hi else (lo + hi)/2.0
+                    if jd_start < jd <= jd_end:
+                        for kind, every, count in limbs:
+                            if j % every == 0:
+                                to_idx = (j//every) % count
+                                out.append(Transition(jd, kind, (to_idx - 1) % count, to_idx))
+                    j += 1
+    out.sort()
+    return out
+
+# ---------- PANCHANG ----------
+# The trim moves neither sunrise nor the tithi/karana angle (m - s); it shifts
+# the nakshatra angle by trim and the yoga angle by 2 x trim. So the rise/set
+# times, jd_eval, the untrimmed longitudes and a slightly padded untrimmed
+# transition list are kept per (date, place) as the "base"; any trim is then
+# a few Newton steps on the nak/yoga crossings of that list.
+TRIM_SHIFT = {"nak": 1, "yoga": 2}   # how many times the trim enters each angle
+TRIM_PAD_HOURS = 2.0                   # base scan margin; the Moon covers ~1° in 2 h
+MAX_RETRIM = 0.4                       # |trim| (°) the margin covers for yoga (2 x trim); beyond it, scan afresh
+MAX_BASES = 256
+_BASES = OrderedDict()
+_BASES_LOCK = threading.Lock()
+
+def panchang_base(local_date, lon, lat):
+    """Trim-independent part of compute_panchang for the local date of local_date, cached per (date, place)."""
+    key = (local_date.date(), tz_name_of(local_date.tzinfo), round(lon, 6), round(lat, 6))
+    with _BASES_LOCK:
+        base = _BASES.get(key)
+        if base is not None:
+            _BASES.move_to_end(key)
+            return base
+    from .ephemeris import sun_moon_ephemeris
+    r = rise_set_day(local_date.date(), lon, lat, tz_name_of(local_date.tzinfo))
+    sr_jd = r["sunrise"]
+    if not sr_jd:
+        fb = local_date.replace(hour=6, minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+        sr_jd = swe.julday(fb.year, fb.month, fb.day, fb.hour + fb.minute/60.0)
+    jd_eval = sr_jd + 15/1440.0
+    eph = sun_moon_ephemeris(lon, lat)
+    with stage("longitudes"):
+        s0, m0 = (float(x) for x in eph.longs(jd_eval))
+    pad = TRIM_PAD_HOURS/24.0
+    events = limb_transitions(jd_eval - pad, lon, lat, 0.0, max_hours=30 + 2*TRIM_PAD_HOURS, eph=eph)
+    base = {"rise_set": tuple(r[k] for k in ("sunrise", "sunset", "moonrise", "moonset")),
+            "jd_eval": jd_eval, "sun_long": s0, "moon_long": m0, "events": events, "eph": eph}
+    with _BASES_LOCK:
+        _BASES[key] = base
+        while len(_BASES) > MAX_BASES:
+            _BASES.popitem(last=False)
+    return base
+
+def clear_panchang_bases():
+    with _BASES_LOCK:
+        _BASES.clear()
+
+def retrim_transitions(events, trim, eph, jd_start, jd_end, tol=1e-5, max_iter=6):
+    """Transitions of the untrimmed `events` under `trim`, kept if in (jd_start, jd_end].
+
+    Tithi and karana ends are unchanged; the nak/yoga ends are re-solved
+    together, with vectorized Newton steps from their untrimmed times, which
+    are already within minutes of the answer.
+    """
+    import numpy as np
+    moved = [i for i, ev in enumerate(events) if trim and ev.kind in TRIM_SHIFT]
+    jds = [ev.jd for ev in events]
+    if moved:
+        jd = np.array([jds[i] for i in moved])
+        k = np.array([TRIM_SHIFT[events[i].kind] for i in moved])
+        target = np.array([events[i].to_idx * STEP_NAK for i in moved]) % 360.0
+        for _ in range(max_iter):
+            s, m = eph.longs(jd, trim)
+            ds, dm = eph.speeds(jd)
+            a, rate = np.where(k == 1, m, s + m), np.where(k == 1, dm, ds + dm)
+            dx = -((a - target + 180.0) % 360.0 - 180.0) / rate
+            jd = jd + dx
+            if np.abs(dx).max() < tol:
+                break
+        for i, x in zip(moved, jd):
+            jds[i] = float(x)
+    out = [ev._replace(jd=jd) if jd != ev.jd else ev for ev, jd in zip(events, jds) if jd_start < jd <= jd_end]
+    out.sort()
+    return out
+
+def compute_panchang(local_date, lon, lat, trim=0.0, tz=None):
+    """Sunrise-based panchang for the aware datetime local_date, times reported in tz (default: its zone)."""
+    tz = tz or local_date.tzinfo
+    base = panchang_base(local_date, lon, lat)
+    jd_eval = base["jd_eval"]
+    if abs(trim) <= MAX_RETRIM:
+        with stage("retrim"):
+            events = retrim_transitions(base["events"], trim, base["eph"], jd_eval, jd_eval + 30/24.0)
+    else:
+        events = limb_transitions(jd_eval, lon, lat, trim, eph=base["eph"])
+    rise_set = tuple(jd_to_local_dt(jd, tz) for jd in base["rise_set"])
+    s_now, m_now = (base["sun_long"] + trim) % 360.0, (base["moon_long"] + trim) % 360.0
+    return panchang_result(rise_set, s_now, m_now, events, jd_eval, tz)
+
+def panchang_result(rise_set, s_now, m_now, events, jd_eval, tz):
+    """The compute_panchang dict from its astronomical inputs (shared with core.store)."""
+    sr_local, ss_local, mr_local, ms_local = rise_set
+    ti = tithi_index(s_now, m_now)
+    ni = nak_index(m_now)
+    yi = yoga_index(s_now, m_now)
+    ki = karana_index(s_now, m_now)
+    tithi = TITHIS[ti]; paksha = "Shukla" if ti < 15 else "Krishna"
+    nak = NAKSHATRAS[ni]; yoga = YOGAS[yi]
+    karana = KARANA_60[ki]
+    first = {}
+    for ev in events: first.setdefault(ev.kind, ev.jd)
+    te, ne, ye, ke = first.get("tithi"), first.get("nak"), first.get("yoga"), first.get("karana")
+    return {
+        "sunrise": sr_local, "sunset": ss_local, "moonrise": mr_local, "moonset": ms_local,
+        "sun_long": s_now, "moon_long": m_now, "elong": (m_now - s_now) % 360.0,
+        "tithi": tithi, "paksha": paksha, "nakshatra": nak, "yoga": yoga, "karana": karana,
+        "tithi_ends": jd_to_local_dt(te, tz), "nak_ends": jd_to_local_dt(ne, tz), "yoga_ends": jd_to_local_dt(ye, tz),
+        "karana_ends": jd_to_local_dt(ke, tz),
+        "ti_idx":ti, "nak_idx":ni, "yoga_idx":yi, "kar_idx":ki, "transitions": events, "jd_eval": jd_eval
+    }
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/places.py
+
+import argparse
+import csv
+import json
+import math
+import os
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# ---------- Bundled city table ----------
+# GeoNames cities (https://www.geonames.org, CC BY 4.0), reduced by
+# `python -m kaalachakra.core.places cities15000.txt` to data/places.npz:
+# names as one UTF-8 blob, float32 coordinates and a time zone id per city.
+PLACES_PATH = os.path.join(os.path.dirname(__file__), "data", "places.npz")
+MIN_POPULATION = 15000
+GRID_DEG = 1.0            # nearest-city grid cell
+MAX_RINGS = 4             # past this many rings (open ocean, polar) nearest() scans every city
+EARTH_KM = 6371.0
+TZ_SNAP = 0.001           # timezone_at() cache resolution (~100 m)
+
+Place = namedtuple("Place", "name country lat lon tz population")
+
+def fold(text):
+    """Lowercase, accent-free search key: "Śrīnagar" -> "srinagar"."""
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)).lower().strip()
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere; the nearest city is the one with the largest dot product."""
+    la, lo = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(la) * np.cos(lo), np.cos(la) * np.sin(lo), np.sin(la)], axis=-1)
+
+def build_places(geonames_path, min_population=MIN_POPULATION):
+    """Columns for save_places() from a GeoNames cities*.txt dump (tab separated, no header)."""
+    rows = []
+    with open(geonames_path, encoding="utf-8") as f:
+        for r in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(r) < 18 or not r[17] or int(r[14] or 0) < min_population:
+                continue
+            rows.append((r[1], r[8], float(r[4]), float(r[5]), r[17], int(r[14] or 0)))
+    rows.sort(key=lambda r: -r[5])   # most populous first: ties in search and nearest go to the bigger city
+    zones = sorted({r[4] for r in rows})
+    zone_id = {z: i for i, z in enumerate(zones)}
+    keys = sorted((fold(r[0]), i) for i, r in enumerate(rows))
+    return {"names": "\n".join(r[0] for r in rows), "keys": "\n".join(k for k, _ in keys),
+            "key_order": np.array([i for _, i in keys], dtype=np.int32), "country": np.array([r[1] for r in rows], dtype="U2"),
+            "lat": np.array([r[2] for r in rows], np.float32), "lon": np.array([r[3] for r in rows], np.float32),
+            "tz": np.array([zone_id[r[4]] for r in rows], np.uint16), "zones": zones,
+            "population": np.array([r[5] for r in rows], np.int32)}
+
+def save_places(table, path=PLACES_PATH, **meta):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, names=np.frombuffer(table["names"].encode("utf-8"), np.uint8),
+                        keys=np.frombuffer(table["keys"].encode("utf-8"), np.uint8), key_order=table["key_order"],
+                        country=table["country"], lat=table["lat"], lon=table["lon"], tz=table["tz"],
+                        zones=np.array("\n".join(table["zones"])), population=table["population"],
+                        meta=np.array(json.dumps(meta)))
+
+# ---------- Index ----------
+class PlaceIndex:
+    """Nearest-city lookups on a 1° grid and name-prefix search over a sorted key list.
+
+    Loaded once from the bundled table (a few tens of milliseconds); after that
+    a nearest() call touches a handful of grid cells and a search() is two
+    bisections.
+    """
+
+    def __init__(self, names, keys, key_order, country, lat, lon, tz, zones, population, meta=None):
+        self.names, self.country = names, country
+        self.lat, self.lon = lat.astype(np.float64), lon.astype(np.float64)
+        self.tz, self.zones, self.population = tz, zones, population
+        self.meta = meta or {}
+        self._keys, self._key_idx = keys, key_order   # folded names, sorted, and the city of each
+        self._xyz = unit_vectors(self.lat, self.lon)
+        cells = {}
+        for i, cell in enumerate(zip(self._cell(self.lat), self._cell(self.lon))):
+            cells.setdefault(cell, []).append(i)
+        self._cells = {c: np.array(ix, dtype=np.int32) for c, ix in cells.items()}
+
+    @classmethod
+    def load(cls, path=PLACES_PATH):
+        with np.load(path) as z:
+            return cls(z["names"].tobytes().decode("utf-8").split("\n"), z["keys"].tobytes().decode("utf-8").split("\n"),
+                       z["key_order"], z["country"], z["lat"], z["lon"], z["tz"], str(z["zones"]).split("\n"),
+                       z["population"], json.loads(str(z["meta"])))
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _cell(x):
+        return np.floor(np.asarray(x) / GRID_DEG).astype(int)
+
+    def place(self, i):
+        return Place(self.names[i], str(self.country[i]), float(self.lat[i]), float(self.lon[i]),
+                     self.zones[self.tz[i]], int(self.population[i]))
+
+    def nearest(self, lat, lon):
+        """(Place, distance in km) of the closest city, searching outward ring by ring."""
+        ci, cj = int(self._cell(lat)), int(self._cell(lon))
+        ncols, west = int(round(360 / GRID_DEG)), int(round(-180 / GRID_DEG))
+        q = unit_vectors(lat, lon)
+        best, best_dot = None, -2.0
+        for ring in range(MAX_RINGS + 1):
+            cand = [self._cells.get((ci + di, (cj + dj - west) % ncols + west))
+                    for di in range(-ring, ring + 1) for dj in range(-ring, ring + 1)
+                    if max(abs(di), abs(dj)) == ring]
+            cand = [c for c in cand if c is not None]
+            if cand:
+                ix = np.concatenate(cand)
+                dots = self._xyz[ix] @ q
+                k = int(np.argmax(dots))
+                if dots[k] > best_dot:
+                    best, best_dot = int(ix[k]), float(dots[k])
+            # anything beyond this ring is at least `ring` cells away, in latitude or
+            # in longitude at a latitude no more than ring + 1 cells further poleward
+            reach = ring * GRID_DEG * 111.0 * math.cos(math.radians(min(90.0, abs(lat) + (ring + 1) * GRID_DEG)))
+            if best is not None and EARTH_KM * math.acos(min(best_dot, 1.0)) <= reach:
+                break
+        else:
+            best = int(np.argmax(self._xyz @ q))
+        best_km = float(haversine_km(lat, lon, self.lat[best], self.lon[best]))
+        return self.place(best), best_km
+
+    def search(self, prefix, limit=10):
+        """Places whose name starts with `prefix` (accents and case ignored), most populous first."""
+        key = fold(prefix)
+        if not key:
+            return []
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + "\uffff", lo)
+        ix = self._key_idx[lo:hi]
+        ix = ix[np.argsort(-self.population[ix], kind="stable")[:limit]]
+        return [self.place(int(i)) for i in ix]
+
+@lru_cache(maxsize=1)
+def place_index():
+    """The bundled index, loaded on first use."""
+    return PlaceIndex.load()
+
+@lru_cache(maxsize=4096)
+def nearest_place(lat, lon):
+    """(Place, km) of the bundled city closest to (lat, lon); repeated coordinates are cached."""
+    return place_index().nearest(lat, lon)
+
+@lru_cache(maxsize=1024)
+def search_places(prefix, limit=10):
+    """Bundled cities whose name starts with `prefix`, most populous first (cached per prefix)."""
+    return tuple(place_index().search(prefix, limit))
+
+# ---------- Time zones ----------
+# timezonefinder (zone polygons, ~0.2 s to load) answers when installed; without
+# it the zone of the nearest bundled city is used, which can be wrong within a
+# few km of a zone border.
+_FINDER = None
+_FINDER_LOCK = threading.Lock()
+
+def _finder():
+    global _FINDER
+    if _FINDER is None:
+        with _FINDER_LOCK:
+            if _FINDER is None:
+                try:
+                    from timezonefinder import TimezoneFinder
+                    _FINDER = TimezoneFinder()
+                except ImportError:
+                    _FINDER = False
+    return _FINDER
+
+@lru_cache(maxsize=4096)
+def _timezone_at(lat_cell, lon_cell):
+    lat, lon = lat_cell * TZ_SNAP, lon_cell * TZ_SNAP
+    finder = _finder()
+    name = finder.timezone_at(lat=lat, lng=lon) if finder else None
+    return name or nearest_place(lat, lon)[0].tz
+
+def timezone_at(lat, lon):
+    """IANA zone name at (lat, lon), cached per ~100 m cell."""
+    return _timezone_at(int(round(lat / TZ_SNAP)), int(round(lon / TZ_SNAP)))
+
+def location_timezone(lat, lon):
+    """pytz zone at (lat, lon); pytz caches the zone objects themselves."""
+    import pytz
+    return pytz.timezone(timezone_at(lat, lon))
+
+# ---------- CLI ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the bundled city table from a GeoNames cities dump.")
+    ap.add_argument("geonames", help="cities15000.txt (or cities5000/1000) from download.geonames.org/export/dump")
+    ap.add_argument("--min-population", type=int, default=MIN_POPULATION)
+    ap.add_argument("--out", default=PLACES_PATH)
+    args = ap.parse_args(argv)
+    table = build_places(args.geonames, args.min_population)
+    save_places(table, args.out, source=os.path.basename(args.geonames), min_population=args.min_population,
+                license="GeoNames, CC BY 4.0")
+    print(f"{len(table['lat'])} places in {len(table['zones'])} zones -> {args.out} ({os.path.getsize(args.out)} bytes)")
+
+if __name__ == "__main__":
+    main()
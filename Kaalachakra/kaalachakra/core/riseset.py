@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/riseset.py
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytz
+
+from ._lazy import swe, SUN, MOON
+from .context import EphemerisContext
+
+# ---------- Events & markers ----------
+# event -> (body, rise_trans mode name)
+EVENTS = {"sunrise": (SUN, "CALC_RISE"), "sunset": (SUN, "CALC_SET"),
+          "moonrise": (MOON, "CALC_RISE"), "moonset": (MOON, "CALC_SET")}
+RISE_SET_EVENTS = tuple(EVENTS)
+
+# `<event>_status` values; the JD column is NaN for everything but OCCURS.
+OCCURS = 0        # the event happens during this local day
+SKIPPED = 1       # falls just outside the day (the Moon does this about once a month)
+ALWAYS_UP = 2     # body above the horizon all day (midnight sun, circumpolar Moon)
+ALWAYS_DOWN = 3   # body below the horizon all day (polar night)
+STATUS_NAMES = ("occurs", "skipped", "always up", "always down")
+
+PERIOD = {SUN: 1.0, MOON: 1.035}   # mean days between successive rises
+MAX_DEC = {SUN: 23.45, MOON: 28.7}
+# Half a day of declination drift plus refraction, parallax and semi-diameter:
+# farther than this past the polar limit at local noon, the body cannot cross the horizon that day.
+POLAR_MARGIN = {SUN: 1.5, MOON: 5.0}
+SEED_LEAD = 0.25   # start each search this long before the previous event + PERIOD
+
+# ---------- Solver ----------
+def local_midnights(start, days, tz):
+    """JD (UT) of local midnight for `days` consecutive dates from `start`."""
+    jds = np.empty(days)
+    for i in range(days):
+        d = start + timedelta(days=i)
+        utc = tz.localize(datetime(d.year, d.month, d.day)).astimezone(pytz.utc)
+        jds[i] = swe.julday(utc.year, utc.month, utc.day, utc.hour + utc.minute/60.0 + utc.second/3600.0)
+    return jds
+
+def _declination(jd_ut, body):
+    return EphemerisContext(sid_mode=None).calc_ut(jd_ut, body, swe.FLG_EQUATORIAL)[0][1]
+
+def _polar_status(dec, lat, loose=0.0):
+    """ALWAYS_UP / ALWAYS_DOWN when |dec| is past the polar limit for lat (minus `loose`), else None."""
+    if abs(dec) <= 90.0 - abs(lat) - loose:
+        return None
+    return ALWAYS_UP if (dec >= 0.0) == (lat >= 0.0) else ALWAYS_DOWN
+
+def solve_event(mids, ends, event, lon, lat):
+    """(jd, status) arrays for one event over the local days [mids[i], ends[i]).
+
+    Each search is seeded from the previous day's result; an event found past
+    the end of a day answers every day up to it. Near the poles, days whose
+    noon declination is clearly past the polar limit are settled with one
+    calc_ut instead of a failing rise_trans.
+    """
+    body, mode = EVENTS[event]
+    mode = getattr(swe, mode)
+    ctx = EphemerisContext(lon, lat)
+    n = len(mids)
+    jd = np.full(n, np.nan)
+    status = np.full(n, OCCURS, dtype=np.int8)
+    polar_possible = 90.0 - abs(lat) < MAX_DEC[body] + POLAR_MARGIN[body]
+    nxt, last = -np.inf, None
+    for i in range(n):
+        jd0, jd1 = mids[i], ends[i]
+        if nxt < jd0:
+            if polar_possible:
+                polar = _polar_status(_declination(0.5*(jd0 + jd1), body), lat, -POLAR_MARGIN[body])
+                if polar is not None:
+                    status[i] = polar
+                    continue
+            seed = jd0
+            if last is not None and not polar_possible and jd0 - last < 2.0:
+                seed = last + PERIOD[body] - SEED_LEAD
+            nxt = ctx.rise_trans(seed, body, mode)
+            if nxt is None: nxt = -np.inf
+        if jd0 <= nxt < jd1:
+            jd[i] = last = nxt
+        else:
+            polar = _polar_status(_declination(0.5*(jd0 + jd1), body), lat, 2.0) if polar_possible else None
+            status[i] = SKIPPED if polar is None else polar
+    return jd, status
+
+def rise_set_table(start, days, lon, lat, tz_name, events=RISE_SET_EVENTS):
+    """Rise/set JDs for `days` local dates from `start`, as a dict of NumPy columns.
+
+    Columns: date, midnight (JD of local midnight), and per event its JD (NaN
+    when it does not happen that day) plus `<event>_status` (OCCURS, SKIPPED,
+    ALWAYS_UP or ALWAYS_DOWN). Disc centre with refraction, as before.
+    """
+    tz = pytz.timezone(tz_name)
+    bounds = local_midnights(start, days + 1, tz)
+    mids, ends = bounds[:-1], bounds[1:]
+    table = {"date": np.arange(np.datetime64(start), np.datetime64(start) + days), "midnight": mids}
+    for event in events:
+        table[event], table[event + "_status"] = solve_event(mids, ends, event, lon, lat)
+    return table
+
+# ---------- Per-day lookups ----------
+# Single days are served from a cached block of BLOCK_DAYS dates, so the daily
+# view, reruns and neighbouring dates share one batched solve per location.
+BLOCK_DAYS = 7
+MAX_TABLES = 64
+_TABLES = OrderedDict()
+_TABLES_LOCK = threading.Lock()
+
+def rise_set_block(day, lon, lat, tz_name):
+    """(table, row) for the local date `day`, solving its block on first use."""
+    first = date.fromordinal(day.toordinal() - day.toordinal() % BLOCK_DAYS)
+    key = (round(lon, 6), round(lat, 6), tz_name, first)
+    with _TABLES_LOCK:
+        table = _TABLES.get(key)
+        if table is not None:
+            _TABLES.move_to_end(key)
+    if table is None:
+        table = rise_set_table(first, BLOCK_DAYS, lon, lat, tz_name)
+        with _TABLES_LOCK:
+            _TABLES[key] = table
+            if len(_TABLES) > MAX_TABLES:
+                _TABLES.popitem(last=False)
+    return table, (day - first).days
+
+def rise_set_day(day, lon, lat, tz_name):
+    """{event: JD or None} for one local date, plus `<event>_status` markers."""
+    table, i = rise_set_block(day, lon, lat, tz_name)
+    out = {}
+    for event in RISE_SET_EVENTS:
+        jd = table[event][i]
+        out[event] = None if np.isnan(jd) else float(jd)
+        out[event + "_status"] = int(table[event + "_status"][i])
+    return out
+
+def clear_rise_set_tables():
+    with _TABLES_LOCK:
+        _TABLES.clear()
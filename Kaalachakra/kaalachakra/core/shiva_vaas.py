@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/shiva_vaas.py
+
+# ---------- Shiva Vaas by Paksha & Tithi (1 = Prathama, 15 = Purnima/Amavasya) ----------
+shukla_data = {
+    1: ("शमशान", "मृत्युतुल्य"),
+    2: ("गौरी सानिध्य", "सुखप्रद"),
+    3: ("सभायां", "संताप"),
+    4: ("क्रीडायां", "कष्ट एवं दुःख"),
+    5: ("कैलाश पर", "सुखप्रद"),
+    6: ("वृषारूढ", "अभीष्टसिद्धि"),
+    7: ("भोजन", "पीड़ा"),
+    8: ("शमशान", "मृत्युतुल्य"),
+    9: ("गौरी सानिध्य", "सुखप्रद"),
+    10: ("सभायां", "संताप"),
+    11: ("क्रीडायां", "कष्ट एवं दुःख"),
+    12: ("कैलाश पर", "सुखप्रद"),
+    13: ("वृषारूढ", "अभीष्टसिद्धि"),
+    14: ("भोजन", "पीड़ा"),
+    15: ("शमशान", "मृत्युतुल्य")
+}
+
+krishna_data = {
+    1: ("गौरी सानिध्य", "सुखप्रद"),
+    2: ("सभायां", "संताप"),
+    3: ("क्रीडायां", "कष्ट एवं दुःख"),
+    4: ("कैलाश पर", "सुखप्रद"),
+    5: ("वृषारूढ", "अभीष्टसिद्धि"),
+    6: ("भोजन", "पीड़ा"),
+    7: ("शमशान", "मृत्युतुल्य"),
+    8: ("गौरी सानिध्य", "सुखप्रद"),
+    9: ("सभायां", "संताप"),
+    10: ("क्रीडायां", "कष्ट एवं दुःख"),
+    11: ("कैलाश पर", "सुखप्रद"),
+    12: ("वृषारूढ", "अभीष्टसिद्धि"),
+    13: ("भोजन", "पीड़ा"),
+    14: ("शमशान", "मृत्युतुल्य"),
+    15: ("गौरी सानिध्य", "सुखप्रद")
+}
+
+SHIVA_VAAS = {"Shukla Paksha": shukla_data, "Krishna Paksha": krishna_data}
+
+# Both tables are one 7-step cycle over the 0..29 tithi index: abode = ABODES[ti % 7].
+ABODES = [shukla_data[t] for t in range(1, 8)]
+
+def shiva_vaas(paksha, tithi):
+    """(vaas, phal) for "Shukla Paksha"/"Krishna Paksha" and tithi 1..15."""
+    return SHIVA_VAAS[paksha][tithi]
+
+def shiva_vaas_for_index(ti):
+    """(vaas, phal) for a 0..29 tithi index as used by the panchang core."""
+    return ABODES[ti % 7]
+
+# ---------- From date & location ----------
+def shiva_vaas_at(local_dt, lon, lat, trim=0.0):
+    """Shiva Vaas in force at the aware datetime local_dt (the tithi of that instant).
+
+    Returns {"vaas", "phal", "ti_idx", "since", "until"}; since/until bound the
+    current tithi, in local_dt's zone.
+    """
+    w = shiva_vaas_windows(local_dt, local_dt, lon, lat, trim)
+    i = int(w["tithi"][0])
+    vaas, phal = ABODES[i % 7]
+    return {"vaas": vaas, "phal": phal, "ti_idx": i,
+            "since": _local(w["prev"], local_dt.tzinfo), "until": _local(w["end"][0], local_dt.tzinfo)}
+
+def shiva_vaas_windows(start_dt, end_dt, lon, lat, trim=0.0):
+    """Every Shiva Vaas window between two aware datetimes, from one batched tithi scan.
+
+    Returns NumPy columns start, end (JD UT) and tithi (0..29 index) plus
+    "prev", the JD the first window's tithi began. The first window starts at
+    start_dt and the last one ends at the first tithi change after end_dt.
+    """
+    import numpy as np
+    from .calendar import LIMBS, limb_angles, limb_crossings, limb_index
+    from .ephemeris import SpanEphemeris
+    from .panchang import jd_from_dt
+
+    jd0, jd1 = jd_from_dt(start_dt), jd_from_dt(end_dt)
+    step, count = next((st, n) for limb, st, n in LIMBS if limb == "tithi")
+    eph = SpanEphemeris(lon, lat, max_days=jd1 - jd0 + 4)
+    jds, idx = limb_crossings(eph, jd0 - 1.5, jd1 + 1.5, trim)["tithi"]
+    s, m = eph.longs(jd0, trim)
+    first = int(limb_index(limb_angles(s, m)["tithi"], step, count))
+    before = jds <= jd0
+    inside, new_idx = jds[~before], idx[~before]
+    if not inside.size:
+        raise ValueError("no tithi change found after the range; extend the scan")
+    n = np.searchsorted(inside, jd1, side="left") + 1
+    ends = inside[:n]
+    starts = np.concatenate(([jd0], ends[:-1]))
+    tithis = np.concatenate(([first], new_idx[:n - 1]))
+    return {"start": starts, "end": ends, "tithi": tithis.astype(np.int16),
+            "prev": float(jds[before][-1]) if before.any() else None}
+
+def shiva_vaas_calendar(start, days, lon, lat, tz_name, trim=0.0):
+    """Shiva Vaas windows for `days` local dates from `start`, split at local midnights.
+
+    Yields one dict per (date, window): date, start, end (aware local
+    datetimes, end at most the next midnight), until (when the window really
+    ends, possibly a later date), ti_idx, tithi, vaas, phal. A day with an
+    intra-day tithi change yields two or more rows.
+    """
+    from datetime import datetime, timedelta
+    import pytz
+    from .tables import TITHIS
+
+    tz = pytz.timezone(tz_name)
+    day0 = tz.localize(datetime(start.year, start.month, start.day))
+    last = start + timedelta(days=days)
+    day_end = tz.localize(datetime(last.year, last.month, last.day))
+    w = shiva_vaas_windows(day0, day_end, lon, lat, trim)
+    for a, b, ti in zip(w["start"], w["end"], w["tithi"]):
+        a, b, ti = _local(a, tz), _local(b, tz), int(ti)
+        vaas, phal = ABODES[ti % 7]
+        d = a.date()
+        while a < b and d < last:
+            nxt = tz.localize(datetime.combine(d + timedelta(days=1), datetime.min.time()))
+            yield {"date": d, "start": a, "end": min(b, nxt), "until": b, "ti_idx": ti, "tithi": TITHIS[ti],
+                   "vaas": vaas, "phal": phal}
+            a, d = nxt, d + timedelta(days=1)
+
+def _local(jd, tz):
+    from .calendar import jd_to_local
+    return None if jd is None else jd_to_local(jd, tz)
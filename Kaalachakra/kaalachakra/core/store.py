@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# kaalachakra/core/store.py
+
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytz
+
+from .cache import GRID_DEG
+from .context import LAHIRI
+
+log = logging.getLogger("kaalachakra.store")
+
+# ---------- Versioning ----------
+# Bump STORE_VERSION whenever compute_panchang's results change meaning or
+# precision; rows written under another version are simply never read.
+STORE_VERSION = 1
+TRANSITION_DTYPE = np.dtype([("jd", "<f8"), ("kind", "u1"), ("from_idx", "u1"), ("to_idx", "u1")])
+KINDS = ("tithi", "nak", "yoga", "karana")
+
+def store_version(trim=0.0, sid_mode=LAHIRI, grid=GRID_DEG):
+    """Version tag of a row: store format, Swiss Ephemeris release, ayanamsa mode, trim and grid."""
+    from ._lazy import swe
+    return f"v{STORE_VERSION}/swe{swe.version}/sid{sid_mode}/trim{trim:+.6f}/grid{grid:g}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS panchang (
+    version    TEXT    NOT NULL,
+    lat_cell   INTEGER NOT NULL,
+    lon_cell   INTEGER NOT NULL,
+    tz         TEXT    NOT NULL,
+    date       TEXT    NOT NULL,
+    sunrise REAL, sunset REAL, moonrise REAL, moonset REAL,
+    jd_eval REAL NOT NULL, sun_long REAL NOT NULL, moon_long REAL NOT NULL,
+    ti_idx INTEGER, nak_idx INTEGER, yoga_idx INTEGER, kar_idx INTEGER,
+    tithi_end REAL, nak_end REAL, yoga_end REAL, karana_end REAL,
+    transitions BLOB NOT NULL,
+    PRIMARY KEY (version, lat_cell, lon_cell, tz, date)
+) WITHOUT ROWID
+"""
+COLUMNS = ("sunrise", "sunset", "moonrise", "moonset", "jd_eval", "sun_long", "moon_long",
+           "ti_idx", "nak_idx", "yoga_idx", "kar_idx", "tithi_end", "nak_end", "yoga_end", "karana_end",
+           "transitions")
+
+# ---------- Records ----------
+def to_record(P):
+    """compute_panchang dict -> tuple of COLUMNS (JDs, indices, packed transitions)."""
+    from .panchang import jd_from_dt
+    jd = lambda dt: None if dt is None else jd_from_dt(dt)
+    tr = np.array([(t.jd, KINDS.index(t.kind), t.from_idx, t.to_idx) for t in P["transitions"]],
+                  dtype=TRANSITION_DTYPE)
+    ends = {}
+    for t in P["transitions"]:
+        ends.setdefault(t.kind, t.jd)
+    return (jd(P["sunrise"]), jd(P["sunset"]), jd(P["moonrise"]), jd(P["moonset"]),
+            P["jd_eval"], P["sun_long"], P["moon_long"],
+            P["ti_idx"], P["nak_idx"], P["yoga_idx"], P["kar_idx"],
+            ends.get("tithi"), ends.get("nak"), ends.get("yoga"), ends.get("karana"),
+            tr.tobytes())
+
+def from_record(row, tz):
+    """Tuple of COLUMNS -> the dict compute_panchang would have returned, times in tz."""
+    from .panchang import Transition, jd_to_local_dt, panchang_result
+    rec = dict(zip(COLUMNS, row))
+    events = [Transition(float(t["jd"]), KINDS[t["kind"]], int(t["from_idx"]), int(t["to_idx"]))
+              for t in np.frombuffer(rec["transitions"], dtype=TRANSITION_DTYPE)]
+    rise_set = tuple(jd_to_local_dt(rec[k], tz) for k in ("sunrise", "sunset", "moonrise", "moonset"))
+    return panchang_result(rise_set, rec["sun_long"], rec["moon_long"], events, rec["jd_eval"], tz)
+
+# ---------- Store ----------
+class PanchangStore:
+    """Daily compute_panchang results in SQLite, keyed by grid cell, time zone and local date.
+
+    Every lookup is one primary-key read. Rows carry store_version(trim), so a
+    different ayanamsa mode, trim, grid or Swiss Ephemeris release never sees
+    them. Open with readonly=True to serve a prebuilt file from many replicas.
+    """
+
+    def __init__(self, path, readonly=False, grid=GRID_DEG):
+        self.path = path
+        self.readonly = readonly
+        self.grid = grid
+        self._local = threading.local()
+        self._versions = {}
+        self.hits = self.misses = self.writes = 0
+        if not readonly:
+            with self._conn() as con:
+                con.execute(SCHEMA)
+
+    def _conn(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            if self.readonly:
+                con = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            else:
+                con = sqlite3.connect(self.path, timeout=30.0)
+                con.execute("PRAGMA journal_mode=WAL")
+                con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def key(self, day, lon, lat, tz_name, trim):
+        version = self._versions.get(trim)
+        if version is None:
+            version = self._versions[trim] = store_version(trim, grid=self.grid)
+        return (version, int(round(lat / self.grid)), int(round(lon / self.grid)), tz_name, day.isoformat())
+
+    def get(self, day, lon, lat, tz_name, trim=0.0):
+        """Stored panchang for the local date `day`, or None."""
+        row = self._conn().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM panchang "
+            "WHERE version=? AND lat_cell=? AND lon_cell=? AND tz=? AND date=?",
+            self.key(day, lon, lat, tz_name, trim)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return from_record(row, pytz.timezone(tz_name))
+
+    def put_many(self, items):
+        """Write (day, lon, lat, tz_name, trim, P) items in one transaction."""
+        if self.readonly:
+            return 0
+        rows = [self.key(day, lon, lat, tz_name, trim) + to_record(P) for day, lon, lat, tz_name, trim, P in items]
+        try:
+            with self._conn() as con:
+                con.executemany(f"INSERT OR REPLACE INTO panchang VALUES ({', '.join('?' * (5 + len(COLUMNS)))})", rows)
+        except sqlite3.Error as e:   # a cache write must never fail the request that computed it
+            log.warning("panchang store write to %s failed: %s", self.path, e)
+            return 0
+        self.writes += len(rows)
+        return len(rows)
+
+    def put(self, day, lon, lat, tz_name, trim, P):
+        return self.put_many([(day, lon, lat, tz_name, trim, P)])
+
+    def checkpoint(self):
+        """Fold the WAL back into the main file, e.g. before shipping it to read-only replicas."""
+        self._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM panchang").fetchone()[0]
+
+    def purge_stale(self, keep_trims=(0.0,)):
+        """Delete rows of other versions (old format, Swiss Ephemeris or trims not kept)."""
+        keep = [store_version(t, grid=self.grid) for t in keep_trims]
+        with self._conn() as con:
+            cur = con.execute(f"DELETE FROM panchang WHERE version NOT IN ({', '.join('?' * len(keep))})", keep)
+        return cur.rowcount
+
+    def stats(self):
+        return {"path": self.path, "readonly": self.readonly, "hits": self.hits,
+                "misses": self.misses, "writes": self.writes}
+
+def open_store(path=None, readonly=None):
+    """Store at `path` (default $KAALACHAKRA_STORE); None when no path is configured.
+
+    $KAALACHAKRA_STORE_READONLY=1 opens it read-only, e.g. on serving replicas.
+    """
+    path = path or os.environ.get("KAALACHAKRA_STORE")
+    if not path:
+        return None
+    if readonly is None:
+        readonly = os.environ.get("KAALACHAKRA_STORE_READONLY", "") not in ("", "0")
+    return PanchangStore(path, readonly=readonly)
+
+# ---------- Precompute ----------
+def _days_job(loc, start, days, trim, grid):
+    from .cache import snap
+    from .panchang import compute_panchang
+    tz = pytz.timezone(loc.tz_name)
+    lat, lon = snap(loc.lat, grid), snap(loc.lon, grid)
+    out = []
+    for i in range(days):
+        d = start + timedelta(days=i)
+        P = compute_panchang(tz.localize(datetime(d.year, d.month, d.day, 12)), lon, lat, trim, tz)
+        out.append((d, lon, lat, loc.tz_name, trim, P))
+    return out
+
+def precompute(store, locations, start, days, trim=0.0, workers=None, chunk_days=31, ephe_path=None):
+    """Fill `store` with compute_panchang results for every location and date; yields (location, rows)."""
+    from .batch import _init_worker, as_location
+    workers = workers or os.cpu_count() or 1
+    jobs = ((as_location(loc, i), start + timedelta(days=off), min(chunk_days, days - off))
+            for i, loc in enumerate(locations) for off in range(0, days, chunk_days))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ephe_path,)) as pool:
+        pending = {}
+        for loc, chunk_start, n in jobs:
+            pending[pool.submit(_days_job, loc, chunk_start, n, trim, store.grid)] = loc
+            while len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield pending.pop(fut), store.put_many(fut.result())
+        for fut in as_completed(pending):
+            yield pending[fut], store.put_many(fut.result())
+
+# ---------- CLI ----------
+def main(argv=None):
+    from .batch import read_locations
+    ap = argparse.ArgumentParser(description="Precompute daily panchang records into a SQLite store.")
+    ap.add_argument("locations", help="CSV with name, lat, lon, tz columns")
+    ap.add_argument("--db", default=os.environ.get("KAALACHAKRA_STORE", "panchang.sqlite"))
+    ap.add_argument("--start", type=date.fromisoformat, default=date.today())
+    ap.add_argument("--days", type=int, default=366)
+    ap.add_argument("--trim", type=float, default=0.0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--ephe-path", default=None)
+    ap.add_argument("--purge-stale", action="store_true", help="drop rows of other versions first")
+    args = ap.parse_args(argv)
+    store = PanchangStore(args.db)
+    if args.purge_stale:
+        print(f"purged {store.purge_stale([args.trim])} stale rows")
+    total = 0
+    for loc, n in precompute(store, read_locations(args.locations), args.start, args.days, args.trim,
+                             args.workers, ephe_path=args.ephe_path):
+        total += n
+        print(f"{loc.name}: +{n}")
+    store.checkpoint()
+    print(f"{total} rows written, {store.count()} in {args.db}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""Headless JSON service for Kaalachakra: panchang, transitions, Shiva Vaas and sankalpas over HTTP.
+
+    python service.py --port 8765
+    curl 'localhost:8765/panchang?lat=28.6139&lon=77.209&tz=Asia/Kolkata'
+
+GET  /panchang?lat=&lon=&tz=[&at=ISO local time][&trim=]   sunrise-based panchang + transitions
+GET  /shiva-vaas?lat=&lon=&tz=[&at=][&trim=]                abode in force at `at` (echoed only when given)
+GET  /grahas?lat=&lon=&tz=[&at=][&trim=][&node=mean|true]   nine-graha snapshot for the minute of `at`
+GET  /feed.ics, /feed.csv?lat=&lon=&tz=[&start=YYYY-MM-DD][&years=][&kinds=tithi,nak,...][&trim=]
+                                                            multi-year event feed, streamed as it is computed
+POST /panchang/batch   {"queries": [{lat, lon, tz, at?, trim?}, ...]}
+                       or {"dates": [...], "locations": [{lat, lon, tz}, ...], "trim"?}  (every pair)
+POST /sankalpa         {"when", "lat", "lon", "tz", "country", "state", "city", "trim"?,
+                        "participants": [{name, gotra, gender, purpose, offering}, ...]}
+GET  /health, /stats
+
+Panchangs come from the process-wide PANCHANG_CACHE (and its store, when
+$KAALACHAKRA_STORE is set), which the Streamlit app uses as well. Encoded
+responses are cached too, until the next transition, sunrise or local
+midnight (next_event), when the "now" view moves on. That moment also
+sets Cache-Control max-age and Expires, and the ETag lets clients
+revalidate for a 304. A query with an explicit `at` describes a fixed
+instant, so it is served with a day's max-age. Feeds are not cached: they
+are streamed in chunks straight from core.feed, so a 20-year feed costs no
+more memory than a month.
+"""
+
+import argparse
+import hashlib
+import logging
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytz
+
+from kaalachakra.core import (PANCHANG_CACHE, TITHIS, NAKSHATRAS, YOGAS, KARANA_60, ABODES, FEED_KINDS,
+                              compute_panchang, feed_events, feed_lines, graha_snapshot, jd_to_local_dt, next_event,
+                              shiva_vaas_at, years_after)
+
+MAX_BATCH = 1000            # queries (or date x location pairs) per batch request
+MAX_PARTICIPANTS = 5000
+MAX_BODY = 4 * 1024 * 1024
+MAX_RESPONSES = 4096
+MIN_MAX_AGE = 1             # seconds; a response right at an event edge is still cacheable briefly
+FIXED_MAX_AGE = 86400       # seconds, for queries with an explicit `at`: their answer never changes
+MAX_FEED_YEARS = 20
+STREAM_CHUNK = 64 * 1024    # bytes per chunk of a streamed feed
+FEED_TYPES = {"/feed.ics": ("ics", "text/calendar; charset=utf-8"), "/feed.csv": ("csv", "text/csv; charset=utf-8")}
+LIMB_NAMES = {"tithi": TITHIS, "nak": NAKSHATRAS, "yoga": YOGAS, "karana": KARANA_60}
+
+log = logging.getLogger("kaalachakra.service")
+
+class BadRequest(ValueError):
+    pass
+
+# ---------- Queries ----------
+def _tz(name):
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        raise BadRequest(f"unknown time zone {name!r}")
+
+def parse_query(q):
+    """(local_dt, lon, lat, tz, trim) from a dict of query fields; `at` defaults to now in `tz`."""
+    try:
+        lat, lon = float(q["lat"]), float(q["lon"])
+        trim = float(q.get("trim") or 0.0)
+    except KeyError as e:
+        raise BadRequest(f"missing {e.args[0]}")
+    except (TypeError, ValueError):
+        raise BadRequest("lat, lon and trim must be numbers")
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        raise BadRequest("lat/lon out of range")
+    if abs(trim) > 1.0:
+        raise BadRequest("trim must be within ±1°")
+    tz = _tz(q.get("tz") or "Asia/Kolkata")
+    at = q.get("at")
+    if not at:
+        local_dt = datetime.now(tz)
+    else:
+        try:
+            local_dt = datetime.fromisoformat(str(at))
+        except ValueError:
+            raise BadRequest(f"bad `at` {at!r}; use ISO 8601, e.g. 2025-11-05T07:30")
+        local_dt = tz.localize(local_dt) if local_dt.tzinfo is None else local_dt.astimezone(tz)
+    return local_dt, lon, lat, tz, trim
+
+# ---------- Encoding ----------
+def _iso(dt):
+    return dt.isoformat(timespec="seconds") if dt else None
+
+def transitions_json(events, tz):
+    return [{"at": _iso(jd_to_local_dt(ev.jd, tz)), "kind": ev.kind,
+             "from": LIMB_NAMES[ev.kind][ev.from_idx], "to": LIMB_NAMES[ev.kind][ev.to_idx]} for ev in events]
+
+def panchang_json(P, local_dt, lon, lat, tz, trim):
+    vaas, phal = ABODES[P["ti_idx"] % 7]
+    return {"date": local_dt.date().isoformat(), "lat": lat, "lon": lon, "tz": tz.zone, "trim": trim,
+            "sunrise": _iso(P["sunrise"]), "sunset": _iso(P["sunset"]),
+            "moonrise": _iso(P["moonrise"]), "moonset": _iso(P["moonset"]),
+            "sun_long": round(P["sun_long"], 6), "moon_long": round(P["moon_long"], 6),
+            "tithi": {"name": P["tithi"], "index": P["ti_idx"], "ends": _iso(P["tithi_ends"])},
+            "paksha": P["paksha"],
+            "nakshatra": {"name": P["nakshatra"], "index": P["nak_idx"], "ends": _iso(P["nak_ends"])},
+            "yoga": {"name": P["yoga"], "index": P["yoga_idx"], "ends": _iso(P["yoga_ends"])},
+            "karana": {"name": P["karana"], "index": P["kar_idx"], "ends": _iso(P["karana_ends"])},
+            "shiva_vaas": {"vaas": vaas, "phal": phal},
+            "transitions": transitions_json(P["transitions"], tz)}
+
+# ---------- Shared response cache ----------
+class ResponseCache:
+    """Encoded responses shared by every request thread, each valid until its `expires`."""
+
+    def __init__(self, max_entries=MAX_RESPONSES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, build):
+        """(body, etag, expires) for key; on a miss or expiry build() returns (payload, expires)."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and now < hit[2]:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return hit
+            self.misses += 1
+        payload, expires = build()
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = (body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"', expires.astimezone(timezone.utc))
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+RESPONSES = ResponseCache()
+
+def panchang_for(local_dt, lon, lat, tz, trim):
+    return PANCHANG_CACHE.get(local_dt, lon, lat, tz.zone, trim,
+                              lambda lo, la: compute_panchang(local_dt, lo, la, trim, tz))
+
+def _expires(query, live_until):
+    """Response expiry: the next change of the live view for "now" queries, a fixed horizon for an explicit `at`."""
+    if query.get("at"):
+        return datetime.now(timezone.utc) + timedelta(seconds=FIXED_MAX_AGE)
+    return live_until
+
+def panchang_entry(query):
+    """Cached (body, etag, expires) of one panchang query; the key extends the panchang cache's own."""
+    local_dt, lon, lat, tz, trim = parse_query(query)
+    key = ("panchang", bool(query.get("at"))) + PANCHANG_CACHE.key(local_dt, lon, lat, tz.zone, trim)
+
+    def build():
+        P = panchang_for(local_dt, lon, lat, tz, trim)
+        return panchang_json(P, local_dt, key[4], key[3], tz, trim), _expires(query, next_event(P, local_dt)[0])
+    return RESPONSES.get(key, build)
+
+def shiva_vaas_entry(query):
+    """Cached Shiva Vaas; a "now" answer holds until the tithi changes, so its key has no time in it."""
+    local_dt, lon, lat, tz, trim = parse_query(query)
+    when = local_dt.replace(second=0, microsecond=0) if query.get("at") else "now"
+    key = ("shiva_vaas", when, round(lon, 4), round(lat, 4), tz.zone, trim)
+
+    def build():
+        v = shiva_vaas_at(local_dt, lon, lat, trim)
+        payload = {"vaas": v["vaas"], "phal": v["phal"], "tithi": TITHIS[v["ti_idx"]],
+                   "since": _iso(v["since"]), "until": _iso(v["until"])}
+        if query.get("at"):   # a "now" body is served until `until`; the instant it was built would go stale
+            payload = {"at": _iso(local_dt), **payload}
+        return payload, _expires(query, v["until"])
+    return RESPONSES.get(key, build)
+
+def grahas_entry(query):
+    """Cached nine-graha snapshot for the minute of `at` (now: until the minute turns)."""
+    local_dt, lon, lat, tz, trim = parse_query(query)
+    node = query.get("node") or "mean"
+    minute = local_dt.replace(second=0, microsecond=0)
+    key = ("grahas", minute, round(lon, 4), round(lat, 4), tz.zone, trim, node)
+
+    def build():
+        try:
+            snap = graha_snapshot(minute, lon, lat, trim, node)
+        except ValueError as e:
+            raise BadRequest(str(e))
+        return ({"at": _iso(minute), "node": node,
+                 "grahas": [{"name": g.name, "longitude": round(g.longitude, 6), "rashi": g.rashi,
+                             "degree": round(g.degree, 4), "speed": round(g.speed, 6), "retrograde": g.retrograde}
+                            for g in snap]},
+                _expires(query, minute + timedelta(minutes=1)))
+    return RESPONSES.get(key, build)
+
+def _list_of(body, field, objects=False):
+    """body[field] if it is a JSON array (of objects, with `objects`), else BadRequest."""
+    value = body[field]
+    if not isinstance(value, list) or objects and not all(isinstance(v, dict) for v in value):
+        raise BadRequest(f"`{field}` must be a list{' of objects' if objects else ''}")
+    return value
+
+def batch_queries(body):
+    if "queries" in body:
+        queries = _list_of(body, "queries")
+    else:
+        try:
+            dates, locations = _list_of(body, "dates"), _list_of(body, "locations", objects=True)
+        except KeyError as e:
+            raise BadRequest(f"batch needs `queries`, or `dates` and `locations` (missing {e.args[0]})")
+        if len(dates) * len(locations) > MAX_BATCH:
+            raise BadRequest(f"batch of {len(dates) * len(locations)} pairs exceeds {MAX_BATCH}")
+        queries = [{**loc, "at": d, "trim": body.get("trim", loc.get("trim"))} for loc in locations for d in dates]
+    if len(queries) > MAX_BATCH:
+        raise BadRequest(f"batch of {len(queries)} queries exceeds {MAX_BATCH}")
+    return queries
+
+def panchang_batch(body):
+    """(payload, expires): one result per query, in order; a bad query yields {"error"} in its slot."""
+    results, expires = [], None
+    for q in batch_queries(body):
+        try:
+            if not isinstance(q, dict):
+                raise BadRequest("query must be an object")
+            raw, _, exp = panchang_entry(q)
+        except BadRequest as e:
+            results.append({"error": str(e)})
+            continue
+        results.append(json.loads(raw))
+        expires = exp if expires is None else min(expires, exp)
+    return {"results": results}, expires
+
+# ---------- Feeds ----------
+def feed_query(q):
+    """(start, days, lon, lat, tz, trim, kinds) of a feed request; `start` defaults to 1 January this year."""
+    local_dt, lon, lat, tz, trim = parse_query({**q, "at": None})
+    try:
+        start = date.fromisoformat(q["start"]) if q.get("start") else date(local_dt.year, 1, 1)
+        years = int(q.get("years") or 1)
+    except ValueError:
+        raise BadRequest("start must be YYYY-MM-DD and years a whole number")
+    if not 1 <= years <= MAX_FEED_YEARS:
+        raise BadRequest(f"years must be 1..{MAX_FEED_YEARS}")
+    kinds = tuple(k for k in (q.get("kinds") or ",".join(FEED_KINDS)).split(",") if k)
+    if not kinds or set(kinds) - set(FEED_KINDS):
+        raise BadRequest(f"kinds must be a comma list of {', '.join(FEED_KINDS)}")
+    return start, (years_after(start, years) - start).days, lon, lat, tz, trim, kinds
+
+# ---------- Sankalpa ----------
+@lru_cache(maxsize=256)
+def _occasion(when_minute, tz_name, lon, lat, trim, country, state, city):
+    from utils.sankalpa_batch import sankalpa_occasion
+    return sankalpa_occasion(when_minute, lon, lat, country=country, state=state, city=city, trim=trim)
+
+def sankalpa_batch(body):
+    from utils.sankalpa_batch import batch_sankalpas
+    local_dt, lon, lat, tz, trim = parse_query({**body, "at": body.get("when")})
+    if "participants" in body:
+        participants = _list_of(body, "participants", objects=True)
+    else:
+        participants = [body["participant"]] if body.get("participant") else []
+        if participants and not isinstance(participants[0], dict):
+            raise BadRequest("`participant` must be an object")
+    if not participants:
+        raise BadRequest("no participants")
+    if len(participants) > MAX_PARTICIPANTS:
+        raise BadRequest(f"{len(participants)} participants exceeds {MAX_PARTICIPANTS}")
+    occasion = _occasion(local_dt.replace(second=0, microsecond=0), tz.zone, lon, lat, trim,
+                         body.get("country", "Bhāratavarṣe"), body.get("state", ""), body.get("city", ""))
+    return {"when": _iso(local_dt),
+            "results": [{"row": r.row, "name": r.name, "text": r.text, "error": r.error}
+                        for r in batch_sankalpas(participants, occasion)]}
+
+# ---------- HTTP ----------
+class Handler(BaseHTTPRequestHandler):
+    server_version = "Kaalachakra/1.0"
+    protocol_version = "HTTP/1.1"    # keep-alive for clients that reuse connections
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        routes = {"/panchang": panchang_entry, "/shiva-vaas": shiva_vaas_entry, "/grahas": grahas_entry}
+        if url.path == "/health":
+            return self._json({"ok": True})
+        if url.path == "/stats":
+            return self._json({"panchang_cache": PANCHANG_CACHE.stats(), "responses": RESPONSES.stats()})
+        if url.path in FEED_TYPES:
+            return self._guard(lambda: self._feed(q, *FEED_TYPES[url.path]))
+        if url.path not in routes:
+            return self._json({"error": f"no route {url.path}"}, HTTPStatus.NOT_FOUND)
+        self._guard(lambda: self._cached(*routes[url.path](q)))
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        routes = {"/panchang/batch": panchang_batch, "/sankalpa": lambda b: (sankalpa_batch(b), None)}
+        if path not in routes:
+            return self._json({"error": f"no route {path}"}, HTTPStatus.NOT_FOUND)
+
+        def handle():
+            payload, expires = routes[path](self._body())
+            if expires is None:
+                return self._json(payload)
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            self._cached(body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"', expires.astimezone(timezone.utc))
+        self._guard(handle)
+
+    def _guard(self, fn):
+        try:
+            fn()
+        except BadRequest as e:
+            self._json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+        except Exception as e:
+            self._json({"error": f"{type(e).__name__}: {e}"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        if n > MAX_BODY:
+            raise BadRequest(f"body over {MAX_BODY} bytes")
+        try:
+            body = json.loads(self.rfile.read(n) or b"{}")
+        except ValueError as e:
+            raise BadRequest(f"body is not JSON: {e}")
+        if not isinstance(body, dict):
+            raise BadRequest("body must be a JSON object")
+        return body
+
+    def _cached(self, body, etag, expires):
+        max_age = max(MIN_MAX_AGE, int((expires - datetime.now(timezone.utc)).total_seconds()))
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}", "Expires": format_datetime(expires, usegmt=True)}
+        if etag in (t.strip() for t in self.headers.get("If-None-Match", "").split(",")):
+            return self._send(HTTPStatus.NOT_MODIFIED, b"", headers)
+        self._send(HTTPStatus.OK, body, headers)
+
+    def _feed(self, q, fmt, content_type):
+        start, days, lon, lat, tz, trim, kinds = feed_query(q)     # a BadRequest still gets its 400 here
+        events = feed_events(start, days, lon, lat, tz.zone, trim, kinds)
+        self._stream(feed_lines(events, fmt, tz.zone, lon, lat), content_type,
+                     {"Cache-Control": f"public, max-age={FIXED_MAX_AGE}",
+                      "Content-Disposition": f'inline; filename="kaalachakra-{start.isoformat()}.{fmt}"'})
+
+    def _stream(self, pieces, content_type, headers):
+        """Chunked 200 response of the str pieces, sent every STREAM_CHUNK bytes as they are produced.
+
+        An error after the headers cannot become a status any more: the
+        connection is closed without the last chunk, which clients see as a
+        truncated body.
+        """
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        buf, size = [], 0
+        try:
+            for piece in pieces:
+                data = piece.encode("utf-8")
+                buf.append(data)
+                size += len(data)
+                if size >= STREAM_CHUNK:
+                    self._chunk(b"".join(buf))
+                    buf, size = [], 0
+            self._chunk(b"".join(buf))
+            self.wfile.write(b"0\r\n\r\n")
+        except Exception:
+            log.exception("feed stream aborted")
+            self.close_connection = True
+
+    def _chunk(self, data):
+        if data:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def _json(self, payload, status=HTTPStatus.OK):
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._send(status, body, {"Cache-Control": "no-store"})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+def make_server(host="127.0.0.1", port=8765, verbose=False):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    args = ap.parse_args(argv)
+    server = make_server(args.host, args.port, args.verbose)
+    print(f"Kaalachakra service on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
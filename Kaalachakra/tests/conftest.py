@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Shared fixtures: a fixed place and a brute-force limb reference on bare swisseph."""
+
+from datetime import datetime
+
+import pytest
+import pytz
+import swisseph
+
+from kaalachakra.core import jd_from_dt
+from kaalachakra.core.context import reset_applied
+
+DELHI = (77.2090, 28.6139, "Asia/Kolkata")   # lon, lat, tz
+SECOND = 1 / 86400.0
+LIMB_STEPS = {"tithi": (12.0, 30), "nak": (360.0 / 27, 27), "yoga": (360.0 / 27, 27), "karana": (6.0, 60)}
+
+def bare_indices(jd, lon, lat, trim=0.0):
+    """{limb: index} at jd from raw swisseph calls (topocentric Lahiri), none of the engines' code."""
+    swisseph.set_sid_mode(swisseph.SIDM_LAHIRI, 0, 0)
+    swisseph.set_topo(lon, lat, 0.0)
+    flags = swisseph.FLG_SWIEPH | swisseph.FLG_SIDEREAL | swisseph.FLG_TOPOCTR
+    s = (swisseph.calc_ut(jd, swisseph.SUN, flags)[0][0] + trim) % 360.0
+    m = (swisseph.calc_ut(jd, swisseph.MOON, flags)[0][0] + trim) % 360.0
+    reset_applied()
+    angles = {"tithi": (m - s) % 360.0, "nak": m, "yoga": (s + m) % 360.0, "karana": (m - s) % 360.0}
+    return {k: int(angles[k] // step) % count for k, (step, count) in LIMB_STEPS.items()}
+
+def brute_end(jd0, kind, lon, lat, trim=0.0, step=15 / 1440.0, tol=1e-8):
+    """First JD after jd0 where `kind` changes index: 15-minute scan, then bisection."""
+    idx = bare_indices(jd0, lon, lat, trim)[kind]
+    a = jd0
+    while bare_indices(a + step, lon, lat, trim)[kind] == idx:
+        a += step
+    lo, hi = a, a + step
+    while hi - lo > tol:
+        mid = 0.5 * (lo + hi)
+        if bare_indices(mid, lon, lat, trim)[kind] == idx:
+            lo = mid
+        else:
+            hi = mid
+    return 0.5 * (lo + hi)
+
+@pytest.fixture
+def delhi():
+    lon, lat, tz_name = DELHI
+    return lon, lat, pytz.timezone(tz_name)
+
+@pytest.fixture
+def new_moon_eve(delhi):
+    """Delhi, 8 April 2024 06:00 IST: Amavasya, the new moon (18:21 UT geocentric) falls that evening."""
+    lon, lat, tz = delhi
+    return jd_from_dt(tz.localize(datetime(2024, 4, 8, 6))), lon, lat
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from kaalachakra.core import Location, batch_calendars, panchang_calendar
+from kaalachakra.core.batch import as_location
+
+PLACES = [("Delhi", 28.6139, 77.2090, "Asia/Kolkata"), ("Reykjavik", 64.1466, -21.9426, "Atlantic/Reykjavik")]
+
+def test_as_location_forms():
+    assert as_location(PLACES[0]) == Location(*PLACES[0])
+    assert as_location(PLACES[0][1:], 3) == Location("loc3", *PLACES[0][1:])
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_every_chunk_once_and_as_computed(workers):
+    start, days, chunk = date(2024, 3, 1), 10, 4
+    got = {(loc.name, cs): cal for loc, cs, cal in batch_calendars(PLACES, start, days, workers=workers,
+                                                                     chunk_days=chunk)}
+    assert set(got) == {(p[0], start + timedelta(days=off)) for p in PLACES for off in (0, 4, 8)}
+    for name, lat, lon, tz_name in PLACES:
+        ref = panchang_calendar(start, days, lon, lat, tz_name)
+        for off in (0, 4, 8):
+            cal = got[(name, start + timedelta(days=off))]
+            assert len(cal["date"]) == min(chunk, days - off)
+            for col in ("sunrise", "tithi", "tithi_end", "nak_end"):
+                np.testing.assert_allclose(cal[col], ref[col][off:off + len(cal["date"])], atol=1e-6)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+import pytz
+
+from kaalachakra.core import Transition, jd_from_dt
+from kaalachakra.core.cache import PanchangCache, end_of_day, next_event
+
+KOLKATA = pytz.timezone("Asia/Kolkata")
+
+def counting():
+    calls = []
+    def compute(lon, lat):
+        calls.append((lon, lat))
+        return {"n": len(calls)}
+    return compute, calls
+
+def test_one_entry_per_local_date():
+    cache, (compute, calls) = PanchangCache(), counting()
+    early = KOLKATA.localize(datetime(2024, 4, 8, 0, 30))
+    late = KOLKATA.localize(datetime(2024, 4, 8, 23, 30))
+    assert cache.get(early, 77.2090, 28.6139, "Asia/Kolkata", 0.0, compute) == {"n": 1}
+    assert cache.get(late, 77.2091, 28.6138, "Asia/Kolkata", 0.0, compute) == {"n": 1}   # same ~1 km cell
+    assert calls == [(77.21, 28.61)]
+    cache.get(late, 77.2090, 28.6139, "Asia/Kolkata", 0.1, compute)                      # another trim
+    assert len(calls) == 2 and cache.stats()["hits"] == 1
+
+def test_new_entry_once_the_local_date_rolls_over():
+    # 18:29 UTC is still 8 April in UTC but 9 April 00:00 in Kolkata
+    cache, (compute, calls) = PanchangCache(), counting()
+    before = datetime(2024, 4, 8, 18, 29, tzinfo=timezone.utc).astimezone(KOLKATA)
+    after = before + timedelta(minutes=2)
+    assert (before.date().day, after.date().day) == (8, 9)
+    cache.get(before, 77.2, 28.6, "Asia/Kolkata", 0.0, compute)
+    cache.get(after, 77.2, 28.6, "Asia/Kolkata", 0.0, compute)
+    assert len(calls) == 2
+
+@pytest.mark.parametrize("tz", [pytz.timezone("America/New_York"), ZoneInfo("America/New_York")])
+def test_end_of_day_across_a_dst_change(tz):
+    now = datetime(2024, 3, 10, 1, 30)
+    now = tz.localize(now) if hasattr(tz, "localize") else now.replace(tzinfo=tz)
+    end = end_of_day(now)
+    assert (end.year, end.month, end.day, end.hour, end.minute) == (2024, 3, 11, 0, 0)
+    assert end.utcoffset() == timedelta(hours=-4)
+    assert end.astimezone(timezone.utc) - now.astimezone(timezone.utc) == timedelta(hours=21, minutes=30)   # a 23 h date
+
+def test_end_of_day_by_local_not_utc_date():
+    now = datetime(2024, 4, 8, 20, 0, tzinfo=timezone.utc).astimezone(KOLKATA)   # 9 April 01:30 IST
+    assert end_of_day(now) == KOLKATA.localize(datetime(2024, 4, 10))
+
+def live_p(now):
+    sunrise = now.replace(hour=6, minute=0)
+    ends = [now + timedelta(hours=2), now + timedelta(hours=5)]
+    return {"sunrise": sunrise,
+            "transitions": [Transition(jd_from_dt(now - timedelta(hours=1)), "tithi", 28, 29),
+                            Transition(jd_from_dt(ends[0]), "karana", 58, 59),
+                            Transition(jd_from_dt(ends[1]), "nak", 3, 4)]}
+
+def test_next_event_is_the_next_limb_end():
+    now = KOLKATA.localize(datetime(2024, 4, 8, 12, 0))
+    when, label = next_event(live_p(now), now)
+    assert label == "Karana ends"
+    assert abs((when - (now + timedelta(hours=2))).total_seconds()) < 0.01
+
+def test_next_event_falls_back_to_midnight_and_sunrise():
+    now = KOLKATA.localize(datetime(2024, 4, 8, 22, 0))
+    assert next_event({"sunrise": now.replace(hour=6), "transitions": []}, now) == \
+        (KOLKATA.localize(datetime(2024, 4, 9)), "Midnight")
+    early = KOLKATA.localize(datetime(2024, 4, 8, 5, 0))
+    assert next_event({"sunrise": early.replace(hour=6), "transitions": []}, early) == \
+        (early.replace(hour=6), "Sunrise")
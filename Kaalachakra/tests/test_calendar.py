@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from kaalachakra.core import SpanEphemeris, compute_panchang, jd_from_dt, panchang_calendar
+from kaalachakra.core.calendar import limb_crossings
+
+from conftest import SECOND
+
+KEYS = {"tithi": ("ti_idx", "tithi_ends"), "nak": ("nak_idx", "nak_ends"),
+        "yoga": ("yoga_idx", "yoga_ends"), "karana": ("kar_idx", "karana_ends")}
+
+def test_calendar_matches_compute_panchang(delhi):
+    lon, lat, tz = delhi
+    start = date(2024, 4, 6)
+    cal = panchang_calendar(start, 5, lon, lat, tz.zone)
+    for i in range(5):
+        d = start + timedelta(days=i)
+        P = compute_panchang(tz.localize(datetime(d.year, d.month, d.day, 12)), lon, lat)
+        assert cal["sunrise"][i] == pytest.approx(jd_from_dt(P["sunrise"]), abs=0.5 * SECOND)
+        for limb, (idx, ends) in KEYS.items():
+            assert cal[limb][i] == P[idx]
+            assert cal[limb + "_end"][i] == pytest.approx(jd_from_dt(P[ends]), abs=0.1 * SECOND)
+
+def test_limbs_filter(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    eph = SpanEphemeris(lon, lat)
+    every = limb_crossings(eph, jd, jd + 3.0)
+    some = limb_crossings(eph, jd, jd + 3.0, limbs=("nak", "karana"))
+    assert set(every) == {"tithi", "nak", "yoga", "karana"}
+    assert set(some) == {"nak", "karana"}
+    for limb in some:
+        np.testing.assert_array_equal(some[limb][0], every[limb][0])
+        np.testing.assert_array_equal(some[limb][1], every[limb][1])
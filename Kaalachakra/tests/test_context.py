@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+
+import pytest
+
+from kaalachakra.core import EphemerisContext, SUN, MOON
+from kaalachakra.core._lazy import swe
+
+JD = 2460409.0
+POINTS = [(77.2090, 28.6139), (-74.0060, 40.7128), (151.2093, -33.8688), (15.6356, 78.2232), (None, None)]
+
+def workload(ctx):
+    out = []
+    for k in range(25):
+        jd = JD + 0.37 * k
+        out.append(tuple(ctx.longs(jd, (SUN, MOON))))
+        out.append(tuple(ctx.longs_speed(jd, (MOON,), 0.01)))
+        if ctx.lon is not None and k % 5 == 0:
+            out.append(ctx.rise_trans(jd, SUN, swe.CALC_RISE))
+    return out
+
+@pytest.fixture
+def frequent_switches():
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(old)
+
+def test_threads_match_a_serial_run(frequent_switches):
+    contexts = [EphemerisContext(lon, lat) for lon, lat in POINTS] + [EphemerisContext(77.2090, 28.6139, sid_mode=None)]
+    serial = [workload(ctx) for ctx in contexts]
+    results, errors = {}, []
+    start = threading.Barrier(len(contexts) * 2)
+
+    def session(i, ctx):
+        start.wait()
+        try:
+            results[i] = [workload(ctx) for _ in range(3)]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(i, ctx)) for i, ctx in enumerate(contexts * 2)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors
+    for i, runs in results.items():
+        for run in runs:
+            assert run == serial[i % len(contexts)]
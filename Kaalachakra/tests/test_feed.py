@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+import pytest
+
+from kaalachakra.core.feed import FEED_KINDS, csv_lines, feed_events, ics_lines, years_after
+
+from conftest import DELHI
+
+START = date(2024, 3, 1)
+DAYS = 40
+
+@pytest.fixture(scope="module")
+def events():
+    lon, lat, tz_name = DELHI
+    return list(feed_events(START, DAYS, lon, lat, tz_name))
+
+def test_ordered_by_start(events):
+    starts = [ev.start for ev in events]
+    assert starts == sorted(starts)
+
+def test_each_kind_tiles_the_range(events):
+    for kind in ("tithi", "nak", "yoga"):
+        evs = [ev for ev in events if ev.kind == kind]
+        assert all(a.end == b.start for a, b in zip(evs, evs[1:])), kind
+        assert all(0.3 < ev.end - ev.start < 1.5 for ev in evs), kind
+    assert {ev.kind for ev in events} == set(FEED_KINDS)
+
+@pytest.mark.parametrize("chunk_days", [1, 3, 7])
+def test_chunk_edges_lose_nothing(events, chunk_days):
+    lon, lat, tz_name = DELHI
+    small = list(feed_events(START, DAYS, lon, lat, tz_name, chunk_days=chunk_days))
+    assert [(ev.kind, ev.index) for ev in small] == [(ev.kind, ev.index) for ev in events]
+    assert [ev.start for ev in small] == pytest.approx([ev.start for ev in events], abs=1e-6)
+
+def test_kinds_filter():
+    lon, lat, tz_name = DELHI
+    evs = list(feed_events(START, 10, lon, lat, tz_name, kinds=("festival",)))
+    assert evs and {ev.name for ev in evs} <= {"Shukla Ekadashi", "Purnima", "Krishna Ekadashi", "Amavasya"}
+    with pytest.raises(ValueError):
+        list(feed_events(START, 10, lon, lat, tz_name, kinds=("eclipse",)))
+
+def test_writers(events):
+    lon, lat, tz_name = DELHI
+    ics = "".join(ics_lines(events, tz_name, lon, lat))
+    assert ics.startswith("BEGIN:VCALENDAR\r\n") and ics.endswith("END:VCALENDAR\r\n")
+    assert ics.count("BEGIN:VEVENT") == len(events)
+    assert all(len(line.encode("utf-8")) <= 75 for line in ics.split("\r\n"))
+    rows = "".join(csv_lines(events, tz_name)).splitlines()
+    assert rows[0] == "kind,name,index,start,end,detail" and len(rows) == len(events) + 1
+
+def test_years_after_leap_day():
+    assert years_after(date(2024, 2, 29), 1) == date(2025, 2, 28)
+    assert years_after(date(2024, 3, 1), 10) == date(2034, 3, 1)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from kaalachakra.core import NAVAGRAHAS, SUN, MOON, clear_graha_snapshots, graha_columns, graha_snapshot
+from kaalachakra.core._lazy import swe
+from kaalachakra.core.context import reset_applied
+from kaalachakra.core.grahas import FIT_GROUPS, NODES, PLANETS
+
+ARCSEC = 1 / 3600.0
+
+def bare(jd, bodies, lon=None, lat=None, trim=0.0):
+    """(longitude, speed) per body straight from swe.calc_ut, Lahiri sidereal, topocentric with lon/lat."""
+    swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
+    flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL | swe.FLG_SPEED
+    if lon is not None:
+        swe.set_topo(lon, lat, 0.0)
+        flags |= swe.FLG_TOPOCTR
+    out = [swe.calc_ut(jd, b, flags)[0] for b in bodies]
+    reset_applied()
+    return [((x[0] + trim) % 360.0, x[3]) for x in out]
+
+def wrap(d):
+    return (np.asarray(d) + 180.0) % 360.0 - 180.0
+
+@pytest.mark.parametrize("node", ["mean", "true"])
+def test_snapshot_matches_calc_ut(new_moon_eve, node):
+    jd, lon, lat = new_moon_eve
+    clear_graha_snapshots()
+    snap = graha_snapshot(jd, lon, lat, 0.1, node)
+    minute = np.floor(jd * 1440.0 + 1e-6) / 1440.0
+    ref = bare(minute, (SUN, MOON), lon, lat, 0.1) + bare(minute, PLANETS + (NODES[node],), trim=0.1)
+    ref.append(((ref[-1][0] + 180.0) % 360.0, ref[-1][1]))
+    assert [g.name for g in snap] == list(NAVAGRAHAS)
+    for g, (l, v) in zip(snap, ref):
+        assert abs(wrap(g.longitude - l)) < 1e-9 and g.speed == pytest.approx(v)
+        assert g.rashi_idx == int(l // 30.0) and g.degree == pytest.approx(l - 30.0 * g.rashi_idx)
+        assert g.retrograde == (v < 0.0)
+
+def test_snapshot_is_memoized_per_minute(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    clear_graha_snapshots()
+    a = graha_snapshot(jd, lon, lat)
+    assert graha_snapshot(jd + 20 / 86400.0, lon, lat) is a
+    with pytest.raises(ValueError):
+        graha_snapshot(jd, lon, lat, node="osculating")
+
+@pytest.mark.parametrize("node", ["mean", "true"])
+def test_columns_match_calc_ut(delhi, node):
+    lon, lat, _ = delhi
+    jds = 2460400.5 + np.sort(np.random.default_rng(5).uniform(0.0, 400.0, 60))
+    cols = graha_columns(jds, lon, lat, 0.0, node)
+    far = PLANETS + (NODES[node],)
+    names = [n.lower() for n in NAVAGRAHAS]
+    h = 1e-4
+    for i, jd in enumerate(jds):
+        # topocentric FLG_SPEED differs from the rate of the topocentric longitude by up to ~1e-3 °/day;
+        # the fit's derivative follows the positions, so Sun/Moon speeds come from a central difference
+        near = [(l, float(wrap(b - a)) / (2 * h)) for (l, _), (a, _), (b, _) in
+                zip(bare(jd, (SUN, MOON), lon, lat), bare(jd - h, (SUN, MOON), lon, lat), bare(jd + h, (SUN, MOON), lon, lat))]
+        ref = near + bare(jd, far)
+        ref.append(((ref[-1][0] + 180.0) % 360.0, ref[-1][1]))
+        for name, (l, v) in zip(names, ref):
+            assert abs(wrap(cols[name + "_long"][i] - l)) < 2 * ARCSEC, name   # FIT_GROUPS: under 2″
+            assert cols[name + "_speed"][i] == pytest.approx(v, abs=1e-4), name
+            assert cols[name + "_rashi"][i] == int(cols[name + "_long"][i] // 30.0)
+            if abs(v) > 1e-3:
+                assert cols[name + "_retro"][i] == (v < 0.0), name
+
+def test_fit_groups_cover_every_planet_and_node():
+    fitted = [b for bodies, _, _ in FIT_GROUPS for b in bodies]
+    assert sorted(fitted) == sorted(PLANETS + tuple(NODES.values()))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from kaalachakra.core import limb_transitions, sun_moon_ephemeris
+
+from conftest import SECOND, brute_end
+
+def test_first_ends_match_brute_force(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    events = limb_transitions(jd, lon, lat)
+    assert [ev.jd for ev in events] == sorted(ev.jd for ev in events)
+    first = {}
+    for ev in events:
+        first.setdefault(ev.kind, ev)
+    assert set(first) == {"tithi", "nak", "yoga", "karana"}
+    for kind, ev in first.items():
+        assert ev.jd == pytest.approx(brute_end(jd, kind, lon, lat), abs=0.1 * SECOND)
+    assert (first["tithi"].from_idx, first["tithi"].to_idx) == (29, 0)
+
+def test_every_end_in_48_hours(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    for ev in limb_transitions(jd, lon, lat, max_hours=48):
+        assert ev.jd == pytest.approx(brute_end(ev.jd - 600 * SECOND, ev.kind, lon, lat), abs=0.1 * SECOND)
+
+def test_chain_indices(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    last = {}
+    for ev in limb_transitions(jd, lon, lat, max_hours=30):
+        if ev.kind in last:
+            assert ev.from_idx == last[ev.kind]
+        last[ev.kind] = ev.to_idx
+
+def test_fitted_ephemeris_agrees(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    direct = limb_transitions(jd, lon, lat)
+    fitted = limb_transitions(jd, lon, lat, eph=sun_moon_ephemeris(lon, lat))
+    assert [(ev.kind, ev.to_idx) for ev in fitted] == [(ev.kind, ev.to_idx) for ev in direct]
+    for a, b in zip(fitted, direct):
+        assert a.jd == pytest.approx(b.jd, abs=0.1 * SECOND)
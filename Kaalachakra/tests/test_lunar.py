@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timezone
+
+import pytest
+
+from kaalachakra.core import jd_from_dt, lunar_month
+
+def jd(y, m, d):
+    return jd_from_dt(datetime(y, m, d, 12, tzinfo=timezone.utc))
+
+@pytest.mark.parametrize("when, name", [
+    ((2023, 8, 1), "Shravana"),     # Adhika Shravana, 18 Jul - 16 Aug 2023
+    ((2026, 6, 1), "Jyeshtha"),     # Adhika Jyeshtha, 17 May - 15 Jun 2026
+    ((1982, 10, 1), "Ashwin"),
+])
+def test_adhika_months(when, name):
+    month = lunar_month(jd(*when))
+    assert (month.name, month.adhika, month.kshaya) == (name, True, False)
+
+def test_nija_month_follows_adhika():
+    adhika = lunar_month(jd(2023, 8, 1))
+    nija = lunar_month(adhika.end + 1.0)
+    assert (nija.name, nija.adhika) == ("Shravana", False)
+    assert nija.start == pytest.approx(adhika.end)
+
+def test_kshaya_pausha_1983():
+    # 1982-83: Adhika Ashwin, Kshaya Pausha, Adhika Phalguna
+    month = lunar_month(jd(1983, 1, 20))
+    assert (month.name, month.adhika, month.kshaya) == ("Pausha", False, True)
+    assert lunar_month(month.end + 1.0).name == "Phalguna"
+
+def test_ordinary_month():
+    month = lunar_month(jd(2024, 4, 20))   # Chaitra 2024 began with the 8 April new moon
+    assert (month.name, month.adhika, month.kshaya) == ("Chaitra", False, False)
+    assert month.start < jd(2024, 4, 20) < month.end
+
+def test_purnimanta_runs_ahead_in_krishna_paksha():
+    when = jd(2024, 4, 3)   # Krishna paksha before the 8 April 2024 new moon
+    amanta, purnimanta = lunar_month(when), lunar_month(when, scheme="purnimanta")
+    assert (amanta.name, purnimanta.name) == ("Phalguna", "Chaitra")
+    assert amanta.start < purnimanta.start < when < amanta.end < purnimanta.end
+    assert amanta.end == pytest.approx(2460409.2646, abs=2 / 1440.0)   # new moon 2024-04-08 18:21 UT
+
+def test_outside_the_index():
+    with pytest.raises(ValueError):
+        lunar_month(jd(1600, 1, 1))
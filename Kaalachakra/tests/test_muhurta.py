@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from kaalachakra.core.muhurta import allowed_indices, intersect
+
+def layer(starts, values, allowed):
+    mask = np.zeros(max(values) + 1, bool)
+    mask[list(allowed)] = True
+    return np.array(starts, float), np.array(values), mask
+
+def test_no_layers_is_the_whole_range():
+    starts, ends = intersect(0.0, 10.0, [])
+    assert starts.tolist() == [0.0] and ends.tolist() == [10.0]
+
+def test_overlap_of_two_layers():
+    a = layer([0, 2, 5, 8], [0, 1, 0, 1], {1})   # allowed on [2, 5) and [8, 10]
+    b = layer([0, 4, 9], [0, 1, 0], {1})         # allowed on [4, 9)
+    starts, ends = intersect(0.0, 10.0, [a, b])
+    assert list(zip(starts, ends)) == [(4.0, 5.0), (8.0, 9.0)]
+
+def test_adjacent_pieces_merge():
+    a = layer([0, 3, 6], [1, 2, 0], {1, 2})       # values change at 3 but both are allowed
+    starts, ends = intersect(0.0, 10.0, [a])
+    assert list(zip(starts, ends)) == [(0.0, 6.0)]
+
+def test_clipped_to_the_range():
+    a = layer([-5, 1, 4], [1, 0, 1], {1})
+    starts, ends = intersect(0.5, 7.0, [a])
+    assert list(zip(starts, ends)) == [(0.5, 1.0), (4.0, 7.0)]
+
+def test_nothing_allowed():
+    starts, ends = intersect(0.0, 10.0, [layer([0, 5], [0, 1], set())])
+    assert starts.size == ends.size == 0
+
+def test_allowed_indices():
+    names = ["Shukla Panchami", "Krishna Panchami", "Purnima"]
+    assert allowed_indices("panchami", names, "tithi").tolist() == [True, True, False]
+    assert allowed_indices(["Purnima", 0], names, "tithi").tolist() == [True, False, True]
+    with pytest.raises(ValueError):
+        allowed_indices("Dashami", names, "tithi")
+    with pytest.raises(ValueError):
+        allowed_indices(3, names, "tithi")
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from kaalachakra.core import next_change, sidereal_longs, tithi_index, nak_index, yoga_index, karana_index
+
+from conftest import SECOND, brute_end
+
+INDEX = {"tithi": lambda s, m: tithi_index(s, m), "nak": lambda s, m: nak_index(m),
+         "yoga": lambda s, m: yoga_index(s, m), "karana": lambda s, m: karana_index(s, m)}
+
+@pytest.mark.parametrize("kind", ["tithi", "nak", "yoga", "karana"])
+def test_matches_brute_force(new_moon_eve, kind):
+    jd, lon, lat = new_moon_eve
+    s, m = sidereal_longs(jd, lon, lat)
+    end = next_change(jd, lon, lat, kind, INDEX[kind](s, m))
+    assert end == pytest.approx(brute_end(jd, kind, lon, lat), abs=1.0 * SECOND)
+
+def test_amavasya_ends_near_the_new_moon(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    end = next_change(jd, lon, lat, "tithi", 29)
+    new_moon = 2460409.264583   # 2024-04-08 18:21 UT
+    assert abs(end - new_moon) < 1.5 / 24.0   # topocentric parallax moves it by under ~1.5 h
+
+def test_none_past_max_hours(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    assert next_change(jd, lon, lat, "tithi", 29, max_hours=1) is None
+
+def test_unknown_kind(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    assert next_change(jd, lon, lat, "rashi", 0) is None
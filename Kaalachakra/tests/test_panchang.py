@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from kaalachakra.core import (compute_panchang, sidereal_longs, tithi_index, nak_index, yoga_index, karana_index,
+                              tz_name_of)
+from kaalachakra.core.tables import TITHIS
+
+from conftest import bare_indices
+
+def test_indices_match_bare_swisseph(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    s, m = sidereal_longs(jd, lon, lat)
+    assert (tithi_index(s, m), nak_index(m), yoga_index(s, m), karana_index(s, m)) == \
+        tuple(bare_indices(jd, lon, lat)[k] for k in ("tithi", "nak", "yoga", "karana"))
+    assert TITHIS[tithi_index(s, m)] == "Amavasya"
+
+def test_zoneinfo_and_pytz_agree(delhi):
+    lon, lat, tz = delhi
+    a = compute_panchang(tz.localize(datetime(2024, 4, 8, 12)), lon, lat)
+    b = compute_panchang(datetime(2024, 4, 8, 12, tzinfo=ZoneInfo("Asia/Kolkata")), lon, lat)
+    assert a == b
+
+def test_tz_name_of(delhi):
+    assert tz_name_of(delhi[2]) == tz_name_of(ZoneInfo("Asia/Kolkata")) == "Asia/Kolkata"
+    assert tz_name_of(timezone.utc) == "UTC"
+    with pytest.raises(ValueError):
+        tz_name_of(timezone(timedelta(hours=5)))
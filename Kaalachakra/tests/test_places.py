@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import numpy as np
+import pytest
+
+from kaalachakra.core import places
+from kaalachakra.core.places import PlaceIndex, build_places, haversine_km, place_index
+
+# GeoNames columns used by build_places: 1 name, 4 lat, 5 lon, 8 country, 14 population, 17 zone
+CITIES = [("Śrīnagar", 34.08, 74.80, "IN", 1200000, "Asia/Kolkata"),
+          ("Srinagar Garhwal", 30.22, 78.78, "IN", 20000, "Asia/Kolkata"),
+          ("Sringeri", 13.42, 75.25, "IN", 16000, "Asia/Kolkata"),
+          ("Suva", -18.14, 178.44, "FJ", 93000, "Pacific/Fiji"),
+          ("Taveuni East", -16.80, -179.90, "FJ", 16000, "Pacific/Fiji"),
+          ("Labasa", -16.43, 179.38, "FJ", 28000, "Pacific/Fiji")]
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "cities.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        for name, lat, lon, cc, pop, tz in CITIES:
+            row = [""] * 19
+            row[1], row[4], row[5], row[8], row[14], row[17] = name, str(lat), str(lon), cc, str(pop), tz
+            f.write("\t".join(row) + "\n")
+    t = build_places(str(path))
+    return PlaceIndex(t["names"].split("\n"), t["keys"].split("\n"), t["key_order"], t["country"], t["lat"],
+                      t["lon"], t["tz"], t["zones"], t["population"])
+
+def test_prefix_search_folds_accents_and_ranks_by_population(index):
+    assert [p.name for p in index.search("sri")] == ["Śrīnagar", "Srinagar Garhwal", "Sringeri"]
+    assert [p.name for p in index.search("SRĪNAGAR ")] == ["Śrīnagar", "Srinagar Garhwal"]
+    assert [p.name for p in index.search("sri", limit=1)] == ["Śrīnagar"]
+    assert index.search("xyz") == [] and index.search("  ") == []
+
+@pytest.mark.parametrize("lat, lon, name", [(-16.8, 179.99, "Taveuni East"),    # across the line, 0.11° away
+                                            (-15.9, -179.98, "Labasa"),         # back across it: 90 km vs 100 km
+                                            (-18.0, 178.5, "Suva")])
+def test_ring_search_wraps_the_antimeridian(index, lat, lon, name):
+    place, km = index.nearest(lat, lon)
+    assert place.name == name
+    assert km == pytest.approx(float(haversine_km(lat, lon, place.lat, place.lon)))
+
+def test_nearest_matches_a_full_scan():
+    idx = place_index()
+    rng = np.random.default_rng(3)
+    for lat, lon in zip(rng.uniform(-60, 70, 200), rng.uniform(-180, 180, 200)):
+        place, km = idx.nearest(lat, lon)
+        assert km == pytest.approx(float(haversine_km(lat, lon, idx.lat, idx.lon).min()), abs=1e-6)
+
+@pytest.fixture
+def no_timezonefinder(monkeypatch):
+    monkeypatch.setitem(sys.modules, "timezonefinder", None)   # import now raises ImportError
+    monkeypatch.setattr(places, "_FINDER", None)
+    places._timezone_at.cache_clear()
+    yield
+    places._timezone_at.cache_clear()
+
+def test_timezone_falls_back_to_the_nearest_city(no_timezonefinder):
+    assert places.timezone_at(28.6139, 77.2090) == "Asia/Kolkata"
+    assert places.timezone_at(40.7128, -74.0060) == "America/New_York"
+    assert places._FINDER is False
+    assert places.location_timezone(51.5074, -0.1278).zone == "Europe/London"
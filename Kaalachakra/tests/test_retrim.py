@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from kaalachakra.core import limb_transitions, sun_moon_ephemeris
+from kaalachakra.core.panchang import retrim_transitions
+
+from conftest import SECOND
+
+@pytest.mark.parametrize("trim", [0.25, -0.3])
+def test_matches_a_fresh_scan(new_moon_eve, trim):
+    jd, lon, lat = new_moon_eve
+    eph = sun_moon_ephemeris(lon, lat)
+    pad = 2 / 24.0
+    base = limb_transitions(jd - pad, lon, lat, 0.0, max_hours=34, eph=eph)
+    moved = retrim_transitions(base, trim, eph, jd, jd + 30 / 24.0)
+    fresh = limb_transitions(jd, lon, lat, trim, max_hours=30, eph=eph)
+    assert [(ev.kind, ev.to_idx) for ev in moved] == [(ev.kind, ev.to_idx) for ev in fresh]
+    for a, b in zip(moved, fresh):
+        assert a.jd == pytest.approx(b.jd, abs=0.1 * SECOND)
+
+def test_leaves_tithi_and_karana(new_moon_eve):
+    jd, lon, lat = new_moon_eve
+    eph = sun_moon_ephemeris(lon, lat)
+    base = limb_transitions(jd, lon, lat, 0.0, eph=eph)
+    moved = retrim_transitions(base, 0.3, eph, jd - 1.0, jd + 2.0)
+    keep = [ev for ev in base if ev.kind in ("tithi", "karana")]
+    assert [ev for ev in moved if ev.kind in ("tithi", "karana")] == keep
+    assert retrim_transitions(base, 0.0, eph, jd - 1.0, jd + 2.0) == sorted(base)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+import pytz
+
+from kaalachakra.core import EphemerisContext, SUN, count_calls, rise_set_table
+from kaalachakra.core._lazy import swe
+from kaalachakra.core.context import reset_applied
+from kaalachakra.core.riseset import (ALWAYS_DOWN, ALWAYS_UP, OCCURS, PERIOD, SEED_LEAD, SKIPPED, local_midnights,
+                                      solve_event)
+
+from conftest import SECOND
+
+SVALBARD = (15.6356, 78.2232, "Arctic/Longyearbyen")
+
+@pytest.mark.parametrize("start, marker", [(date(2024, 6, 10), ALWAYS_UP), (date(2024, 12, 10), ALWAYS_DOWN)])
+def test_polar_day_and_night(start, marker):
+    lon, lat, tz_name = SVALBARD
+    with count_calls() as calls:
+        table = rise_set_table(start, 10, lon, lat, tz_name, events=("sunrise", "sunset"))
+    for event in ("sunrise", "sunset"):
+        assert (table[event + "_status"] == marker).all()
+        assert np.isnan(table[event]).all()
+    assert calls["rise_trans"] == 0   # settled from the noon declination alone
+
+def test_seeded_from_the_previous_day(delhi, monkeypatch):
+    lon, lat, tz = delhi
+    seeds = []
+    bare = EphemerisContext.rise_trans
+    def recording(self, jd_ut, body, mode):
+        seeds.append(jd_ut)
+        return bare(self, jd_ut, body, mode)
+    monkeypatch.setattr(EphemerisContext, "rise_trans", recording)
+    bounds = local_midnights(date(2024, 4, 1), 8, tz)
+    jd, status = solve_event(bounds[:-1], bounds[1:], "sunrise", lon, lat)
+    assert (status == OCCURS).all()
+    assert seeds[0] == bounds[0]
+    assert seeds[1:] == pytest.approx(list(jd[:-1] + PERIOD[SUN] - SEED_LEAD), abs=1e-9)
+
+def test_moon_skips_a_day_each_month(delhi):
+    lon, lat, tz = delhi
+    table = rise_set_table(date(2024, 4, 1), 30, lon, lat, tz.zone, events=("moonrise",))
+    skipped = table["moonrise_status"] == SKIPPED
+    assert skipped.sum() == 1
+    assert np.isnan(table["moonrise"][skipped]).all() and not np.isnan(table["moonrise"][~skipped]).any()
+
+def test_mid_latitude_day_matches_bare_rise_trans(delhi):
+    lon, lat, tz = delhi
+    table = rise_set_table(date(2024, 4, 8), 1, lon, lat, tz.zone)
+    for event, body, mode in (("sunrise", swe.SUN, swe.CALC_RISE), ("sunset", swe.SUN, swe.CALC_SET),
+                              ("moonrise", swe.MOON, swe.CALC_RISE), ("moonset", swe.MOON, swe.CALC_SET)):
+        ret, tret = swe.rise_trans(table["midnight"][0], body, mode | swe.BIT_DISC_CENTER, (lon, lat, 0.0), 1013.25, 15.0)
+        assert ret >= 0
+        assert table[event][0] == pytest.approx(tret[0], abs=0.5 * SECOND)
+    reset_applied()
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from utils.sankalpa_engine import PURPOSE_MATCHER, PhraseMatcher, sanskritize_free
+
+def test_longest_key_wins():
+    m = PhraseMatcher({"new": "A", "new moon": "B", "new moon day": "C"})
+    assert m.find("on the new moon day") == ["C"]
+    assert m.find("on the new moon") == ["B"]
+    assert m.find("a new start") == ["A"]
+
+def test_word_start_only():
+    m = PhraseMatcher({"obstacle": "vighna", "peace": "shanti"})
+    assert m.find("remove all obstacles") == ["vighna"]
+    assert m.find("nonobstacle") == []
+    assert m.find("PEACE and Obstacle, peace again") == ["shanti", "vighna"]
+
+def test_shipped_vocabulary():
+    assert PURPOSE_MATCHER.find("for prosperity and health") == ["samṛddhyartham", "ārogya-siddhyartham"]
+    assert PURPOSE_MATCHER.find("to prosper") == ["samṛddhyartham"]
+
+def test_extend_and_fallback():
+    m = PhraseMatcher({"lamp": "dīpam"}).extend({"lamps": "dīpān"})
+    assert len(m) == 2 and m.find("lamps") == ["dīpān"]
+    assert PhraseMatcher({}).find("anything") == []
+    assert sanskritize_free("something else", {"lamp": "dīpam"}, "iti") == "something else iti"
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from utils.sankalpa_batch import batch_sankalpas, read_participants, sankalpa_occasion, write_batch
+
+ROWS = [
+    {"Name ": "Amlan Mishra", " Gotra": "Kashyapa", "GENDER": "male", "purpose": "good health", "offering": ""},
+    {"name": "No Gender", "gotra": "", "gender": "", "purpose": "", "offering": ""},
+    ("Sita Devi", "", "female", "prosperity", "flowers"),
+    {"name": "Odd One", "gender": "x"},
+    {"name": "", "gender": "f"},
+]
+
+@pytest.fixture(scope="module")
+def occasion():
+    import pytz
+    when = pytz.timezone("Asia/Kolkata").localize(datetime(2024, 4, 8, 7, 30))
+    return sankalpa_occasion(when, 77.2090, 28.6139, country="Bhāratavarṣe", state="Dillī", city="Dillī")
+
+@pytest.fixture(scope="module")
+def results(occasion):
+    return list(batch_sankalpas(ROWS, occasion))
+
+def test_errors_stay_in_their_rows(results):
+    assert [r.row for r in results] == [1, 2, 3, 4, 5]
+    assert [r.error is None for r in results] == [True, False, True, False, False]
+    assert results[1].name == "No Gender" and "missing gender" in results[1].error
+    assert results[3].name == "Odd One" and "gender must be male or female" in results[3].error
+    assert "missing name" in results[4].error
+    assert results[0].name == "Amlan Mishra" and results[2].name == "Sita Devi"
+    assert results[0].text.split("\n")[:3] == results[2].text.split("\n")[:3]   # one shared preamble
+
+def test_read_participants_streams_a_csv():
+    buf = io.StringIO("name,gotra,gender,purpose,offering\nA,,m,,\nB,,f,,\n")
+    assert [r["name"] for r in read_participants(buf)] == ["A", "B"]
+
+def test_write_zip(results, tmp_path):
+    out = str(tmp_path / "s.zip")
+    written, errors = write_batch(iter(results), out)
+    assert (written, [r.row for r in errors]) == (2, [2, 4, 5])
+    with zipfile.ZipFile(out) as zf:
+        assert zf.namelist() == ["00001_Amlan_Mishra.txt", "00003_Sita_Devi.txt", "errors.csv"]
+        assert zf.read("00003_Sita_Devi.txt").decode("utf-8") == results[2].text
+        rows = list(csv.reader(io.StringIO(zf.read("errors.csv").decode("utf-8"))))
+    assert [r[:2] for r in rows] == [["row", "name"], ["2", "No Gender"], ["4", "Odd One"], ["5", ""]]
+
+def test_write_zip_to_a_file_object(results):
+    buf = io.BytesIO()
+    assert write_batch(iter(results), buf)[0] == 2
+    assert len(zipfile.ZipFile(io.BytesIO(buf.getvalue())).namelist()) == 3
+
+def test_write_text(results, tmp_path):
+    out = str(tmp_path / "s.txt")
+    written, errors = write_batch(iter(results), out)
+    assert (written, len(errors)) == (2, 3)
+    text = open(out, encoding="utf-8").read()
+    assert text.startswith("=" * 20 + " 1: Amlan Mishra " + "=" * 20 + "\n" + results[0].text)
+    assert "=" * 20 + " 3: Sita Devi " in text and "No Gender" not in text
+    assert open(out + ".errors.csv", encoding="utf-8").read().splitlines()[0] == "row,name,error"
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import urllib.request
+from urllib.error import HTTPError
+
+import pytest
+
+import service
+
+DELHI_Q = "lat=28.6139&lon=77.209&tz=Asia/Kolkata"
+
+@pytest.fixture(scope="module")
+def base():
+    server = service.make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def call(url, body=None, headers=None):
+    """(status, headers, parsed JSON or raw text) of one request; HTTP errors are returned, not raised."""
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers=headers or {}, method="POST" if data else "GET")
+    try:
+        with urllib.request.urlopen(req, timeout=60) as r:
+            status, hdrs, raw = r.status, r.headers, r.read()
+    except HTTPError as e:
+        status, hdrs, raw = e.code, e.headers, e.read()
+    text = raw.decode("utf-8")
+    return status, hdrs, json.loads(text) if "json" in (hdrs.get("Content-Type") or "") and text else text
+
+def test_health_and_unknown_route(base):
+    assert call(base + "/health")[::2] == (200, {"ok": True})
+    assert call(base + "/nowhere")[0] == 404
+
+def test_panchang_fixed_instant_and_revalidation(base):
+    status, hdrs, P = call(f"{base}/panchang?{DELHI_Q}&at=2024-04-08T12:00")
+    assert status == 200
+    assert (P["date"], P["tithi"]["name"], P["tz"]) == ("2024-04-08", "Amavasya", "Asia/Kolkata")
+    assert service.FIXED_MAX_AGE - 5 <= int(hdrs["Cache-Control"].split("max-age=")[1]) <= service.FIXED_MAX_AGE
+    assert call(f"{base}/panchang?{DELHI_Q}&at=2024-04-08T12:00", headers={"If-None-Match": hdrs["ETag"]})[0] == 304
+
+def test_panchang_rejects_bad_queries(base):
+    assert call(f"{base}/panchang?lat=91&lon=0")[0] == 400
+    assert call(f"{base}/panchang?{DELHI_Q}&tz=Mars/Olympus")[0] == 400
+    status, _, body = call(f"{base}/panchang?{DELHI_Q}&at=yesterday")
+    assert status == 400 and "ISO 8601" in body["error"]
+
+def test_shiva_vaas_echoes_only_an_explicit_at(base):
+    status, _, now = call(f"{base}/shiva-vaas?{DELHI_Q}")
+    assert status == 200 and "at" not in now and now["since"] < now["until"]
+    status, _, fixed = call(f"{base}/shiva-vaas?{DELHI_Q}&at=2024-04-08T12:00")
+    assert fixed["at"] == "2024-04-08T12:00:00+05:30" and fixed["tithi"] == "Amavasya"
+
+def test_batch_keeps_per_query_errors_in_place(base):
+    status, _, body = call(base + "/panchang/batch", {"queries": [
+        {"lat": 28.6139, "lon": 77.209, "tz": "Asia/Kolkata", "at": "2024-04-08T12:00"}, {"lat": "x", "lon": 0}, 7]})
+    assert status == 200
+    first, bad, odd = body["results"]
+    assert first["tithi"]["name"] == "Amavasya" and "error" in bad and odd == {"error": "query must be an object"}
+    status, _, body = call(base + "/panchang/batch", {"dates": ["2024-04-08T12:00", "2024-04-09T12:00"],
+                                                      "locations": [{"lat": 28.6139, "lon": 77.209, "tz": "Asia/Kolkata"}]})
+    assert status == 200 and [r["date"] for r in body["results"]] == ["2024-04-08", "2024-04-09"]
+
+@pytest.mark.parametrize("body", [{"queries": "2024-04-08"}, {"queries": {"lat": 1}},
+                                  {"dates": "2024-04-08", "locations": []}, {"dates": [], "locations": [[28.6, 77.2]]},
+                                  {"dates": []}, {"queries": [{}] * (service.MAX_BATCH + 1)}])
+def test_batch_rejects_malformed_bodies(base, body):
+    assert call(base + "/panchang/batch", body)[0] == 400
+
+SANKALPA = {"when": "2024-04-08T07:30", "lat": 28.6139, "lon": 77.209, "tz": "Asia/Kolkata", "city": "Dillī"}
+
+def test_sankalpa_rows(base):
+    status, _, body = call(base + "/sankalpa", {**SANKALPA, "participants": [
+        {"name": "Amlan Mishra", "gender": "male"}, {"name": "No Gender"}]})
+    assert status == 200 and body["when"] == "2024-04-08T07:30:00+05:30"
+    ok, bad = body["results"]
+    assert ok["error"] is None and ok["text"] and bad["text"] is None and "gender" in bad["error"]
+
+@pytest.mark.parametrize("extra", [{"participants": "Amlan"}, {"participants": ["Amlan"]},
+                                   {"participants": {"name": "Amlan"}}, {"participant": "Amlan"}, {}])
+def test_sankalpa_rejects_participants_that_are_not_objects(base, extra):
+    status, _, body = call(base + "/sankalpa", {**SANKALPA, **extra})
+    assert status == 400 and "error" in body
+
+def test_feed_csv_streams(base):
+    status, hdrs, text = call(f"{base}/feed.csv?{DELHI_Q}&start=2024-04-01&years=1&kinds=tithi")
+    assert status == 200 and hdrs["Transfer-Encoding"] == "chunked"
+    lines = text.strip().splitlines()
+    assert len(lines) > 360   # a header and ~370 tithi ends in a year
+    assert call(f"{base}/feed.csv?{DELHI_Q}&years=99")[0] == 400
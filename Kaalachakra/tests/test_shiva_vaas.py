@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from kaalachakra.core import jd_from_dt, sidereal_longs, tithi_index
+from kaalachakra.core.shiva_vaas import (ABODES, krishna_data, shiva_vaas, shiva_vaas_calendar, shiva_vaas_for_index,
+                                         shiva_vaas_windows, shukla_data)
+
+from conftest import SECOND, brute_end
+
+@pytest.mark.parametrize("ti", range(30))
+def test_abode_cycle_matches_the_tables(ti):
+    table, tithi = (shukla_data, ti + 1) if ti < 15 else (krishna_data, ti - 14)
+    assert ABODES[ti % 7] == table[tithi] == shiva_vaas_for_index(ti)
+
+def test_named_lookups():
+    assert shiva_vaas("Shukla Paksha", 5) == ("कैलाश पर", "सुखप्रद")
+    assert shiva_vaas("Krishna Paksha", 15) == ("गौरी सानिध्य", "सुखप्रद")
+
+def test_windows_follow_the_tithi_ends(delhi):
+    lon, lat, tz = delhi
+    start = tz.localize(datetime(2024, 4, 1))
+    w = shiva_vaas_windows(start, start + timedelta(days=20), lon, lat)
+    assert w["start"][0] == jd_from_dt(start)
+    np.testing.assert_array_equal(w["start"][1:], w["end"][:-1])
+    assert ((w["tithi"][1:] - w["tithi"][:-1]) % 30 >= 1).all()
+    for a, b, ti in zip(w["start"], w["end"], w["tithi"]):
+        assert tithi_index(*sidereal_longs(0.5 * (a + b), lon, lat)) == ti
+    for end in w["end"][:3]:
+        assert end == pytest.approx(brute_end(end - 600 * SECOND, "tithi", lon, lat), abs=0.1 * SECOND)
+
+def test_calendar_rows_tile_each_date(delhi):
+    lon, lat, tz = delhi
+    rows = list(shiva_vaas_calendar(date(2024, 4, 1), 10, lon, lat, tz.zone))
+    assert {r["date"] for r in rows} == {date(2024, 4, 1) + timedelta(days=i) for i in range(10)}
+    for prev, r in zip(rows, rows[1:]):
+        assert r["start"] == prev["end"]
+    assert all(r["end"] <= r["until"] and (r["vaas"], r["phal"]) == ABODES[r["ti_idx"] % 7] for r in rows)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from kaalachakra.core import compute_panchang
+from kaalachakra.core import store as store_mod
+from kaalachakra.core.store import PanchangStore, precompute
+
+DAY = date(2024, 4, 8)
+
+@pytest.fixture
+def panchang(delhi):
+    lon, lat, tz = delhi
+    return compute_panchang(tz.localize(datetime(DAY.year, DAY.month, DAY.day, 12)), lon, lat, 0.0, tz)
+
+@pytest.fixture
+def store(tmp_path):
+    return PanchangStore(str(tmp_path / "panchang.sqlite"))
+
+def test_round_trip(store, panchang, delhi):
+    lon, lat, tz = delhi
+    assert store.get(DAY, lon, lat, tz.zone) is None
+    store.put(DAY, lon, lat, tz.zone, 0.0, panchang)
+    back = store.get(DAY, lon, lat, tz.zone)
+    assert back.keys() == panchang.keys()
+    for key, value in panchang.items():
+        if isinstance(value, datetime):
+            assert abs((back[key] - value).total_seconds()) < 1e-3, key
+        elif key == "transitions":
+            assert [(t.kind, t.from_idx, t.to_idx) for t in back[key]] == [(t.kind, t.from_idx, t.to_idx) for t in value]
+            assert [t.jd for t in back[key]] == pytest.approx([t.jd for t in value], abs=1e-9)
+        else:
+            assert back[key] == pytest.approx(value) if isinstance(value, float) else back[key] == value, key
+    assert (store.count(), store.hits, store.misses, store.writes) == (1, 1, 1, 1)
+
+def test_other_trim_or_place_misses(store, panchang, delhi):
+    lon, lat, tz = delhi
+    store.put(DAY, lon, lat, tz.zone, 0.0, panchang)
+    assert store.get(DAY, lon, lat, tz.zone, trim=0.1) is None
+    assert store.get(DAY, lon + 1.0, lat, tz.zone) is None
+    assert store.get(date(2024, 4, 9), lon, lat, tz.zone) is None
+
+def test_version_bump_invalidates(tmp_path, panchang, delhi, monkeypatch):
+    lon, lat, tz = delhi
+    path = str(tmp_path / "panchang.sqlite")
+    PanchangStore(path).put(DAY, lon, lat, tz.zone, 0.0, panchang)
+    monkeypatch.setattr(store_mod, "STORE_VERSION", store_mod.STORE_VERSION + 1)
+    newer = PanchangStore(path)
+    assert newer.get(DAY, lon, lat, tz.zone) is None
+    assert newer.purge_stale() == 1
+    assert newer.count() == 0
+
+def test_readonly_store_serves_but_never_writes(tmp_path, panchang, delhi):
+    lon, lat, tz = delhi
+    path = str(tmp_path / "panchang.sqlite")
+    PanchangStore(path).put(DAY, lon, lat, tz.zone, 0.0, panchang)
+    ro = PanchangStore(path, readonly=True)
+    assert ro.get(DAY, lon, lat, tz.zone)["tithi"] == panchang["tithi"]
+    assert ro.put(date(2024, 4, 9), lon, lat, tz.zone, 0.0, panchang) == 0
+
+def test_precompute_fills_every_chunk(store):
+    places = [("Delhi", 28.6139, 77.2090, "Asia/Kolkata"), ("Reykjavik", 64.1466, -21.9426, "Atlantic/Reykjavik")]
+    written = {}
+    for loc, n in precompute(store, places, DAY, 5, workers=2, chunk_days=2):
+        written[loc.name] = written.get(loc.name, 0) + n
+    assert written == {"Delhi": 5, "Reykjavik": 5}
+    assert store.count() == 10
+    for name, lat, lon, tz_name in places:
+        for i in range(5):
+            assert store.get(DAY + timedelta(days=i), lon, lat, tz_name) is not None
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""Kaalachakra benchmark suite: wall time plus Swiss Ephemeris call counts per operation.
+
+    pip install -e Kaalachakra                                # once, from the repository root
+    python -m tools.bench --out bench.json                    # from Kaalachakra/
+    python -m tools.bench --out new.json --compare bench.json # exit 1 on regressions
+
+The Sankalpa cases import utils/, which sits beside the package rather than
+in it, hence `-m` from Kaalachakra/.
+
+Every case runs over a fixed grid of dates and locations (including polar
+sites where rise_trans fails), so call counts are deterministic and a
+change in them is a real regression, not noise.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from kaalachakra.core import (compute_panchang, next_change, limb_transitions, sun_moon_rise_set,
+                              sidereal_longs, tithi_index, nak_index, yoga_index, jd_from_dt,
+                              panchang_calendar, rise_set_table, shiva_vaas_for_index, count_calls,
+                              lunar_month, find_muhurtas, clear_shared_ephemeris, clear_rise_set_tables,
+                              clear_panchang_bases, graha_snapshot, clear_graha_snapshots, clear_muhurta_evaluators)
+from utils.sankalpa_engine import generate_sankalpa
+
+# ---------- Fixed workload ----------
+DATES = [(2000, 1, 1), (2024, 3, 20), (2024, 6, 21), (2024, 12, 21), (2031, 9, 15)]
+LOCATIONS = [
+    ("delhi",     28.6139,   77.2090, "Asia/Kolkata"),
+    ("new_york",  40.7128,  -74.0060, "America/New_York"),
+    ("sydney",   -33.8688,  151.2093, "Australia/Sydney"),
+    ("fiji",     -18.1248,  178.4501, "Pacific/Fiji"),
+    ("tromso",    69.6492,   18.9553, "Europe/Oslo"),
+    ("svalbard",  78.2232,   15.6267, "Arctic/Longyearbyen"),
+]
+
+def cases():
+    for name, lat, lon, tz_name in LOCATIONS:
+        tz = pytz.timezone(tz_name)
+        for y, m, d in DATES:
+            yield f"{name}:{y:04d}-{m:02d}-{d:02d}", lat, lon, tz, tz.localize(datetime(y, m, d, 9, 0))
+
+def cold():
+    """Drop the process-wide Chebyshev fits, rise/set tables, panchang bases, graha snapshots and muhurta
+    evaluators so every case pays its own work."""
+    clear_shared_ephemeris()
+    clear_muhurta_evaluators()
+    clear_rise_set_tables()
+    clear_panchang_bases()
+    clear_graha_snapshots()
+
+# ---------- Operations ----------
+def op_compute_panchang(lat, lon, tz, when):
+    cold()
+    return compute_panchang(when, lon, lat, 0.0, tz)
+
+def op_compute_panchang_warm(lat, lon, tz, when):   # primed: see WARM_OPS
+    return compute_panchang(when, lon, lat, 0.0, tz)
+
+def _next_change(kind):
+    def op(lat, lon, tz, when):
+        jd = jd_from_dt(when)
+        s, m = sidereal_longs(jd, lon, lat)
+        idx = {"tithi": tithi_index(s, m), "nak": nak_index(m), "yoga": yoga_index(s, m)}[kind]
+        return next_change(jd, lon, lat, kind, idx)
+    return op
+
+def op_limb_transitions(lat, lon, tz, when):
+    return limb_transitions(jd_from_dt(when), lon, lat)
+
+def op_sun_moon_rise_set(lat, lon, tz, when):
+    cold()
+    return sun_moon_rise_set(when, lon, lat, tz)
+
+def op_sun_moon_rise_set_warm(lat, lon, tz, when):   # primed: see WARM_OPS
+    return sun_moon_rise_set(when, lon, lat, tz)
+
+def op_rise_set_year(lat, lon, tz, when):
+    return rise_set_table(when.date(), 365, lon, lat, tz.zone)
+
+def op_lunar_month(lat, lon, tz, when):
+    return lunar_month(jd_from_dt(when)), lunar_month(jd_from_dt(when), scheme="purnimanta")
+
+def op_shiva_vaas(lat, lon, tz, when):
+    return [shiva_vaas_for_index(ti) for ti in range(30)]
+
+def op_generate_sankalpa(lat, lon, tz, when):
+    return generate_sankalpa(
+        country="Bhāratavarṣe", state="Odisha", city="Bhubaneswar",
+        paksha_iast="Shukla", tithi_iast="Shukla Panchami", weekday_dt=when,
+        nakshatra_iast="Rohini", yoga_iast="Siddhi", karana_iast="Bava", lunar_month_iast="Kartika",
+        sun_lon_sidereal=200.0, moon_lon_sidereal=45.0, jupiter_lon_sidereal=80.0,
+        name_iast="Amlan Mishra", gotra_iast="Bhāradvāja",
+        purpose_free="to remove all obstacles and ensure divine protection",
+        offering_free="21 recitations of Kālabhairavāṣṭakam", gender="Male", when_dt=when)
+
+def op_calendar_year(lat, lon, tz, when):
+    return panchang_calendar(when.date(), 365, lon, lat, tz.zone)
+
+def op_graha_snapshot(lat, lon, tz, when):
+    cold()
+    return graha_snapshot(when, lon, lat)
+
+def op_calendar_year_grahas(lat, lon, tz, when):
+    return panchang_calendar(when.date(), 365, lon, lat, tz.zone, grahas="mean")
+
+def op_muhurta_year(lat, lon, tz, when):
+    cold()
+    return find_muhurtas(when, when + timedelta(days=365), lon, lat, paksha="Shukla",
+                         nakshatra=("Rohini", "Pushya", "Hasta"), weekday=("Monday", "Thursday"))
+
+OPERATIONS = {
+    "compute_panchang": (op_compute_panchang, None),
+    "compute_panchang_warm": (op_compute_panchang_warm, None),
+    "next_change_tithi": (_next_change("tithi"), None),
+    "next_change_nak": (_next_change("nak"), None),
+    "next_change_yoga": (_next_change("yoga"), None),
+    "limb_transitions": (op_limb_transitions, None),
+    "sun_moon_rise_set": (op_sun_moon_rise_set, None),
+    "sun_moon_rise_set_warm": (op_sun_moon_rise_set_warm, None),
+    "lunar_month": (op_lunar_month, None),
+    "shiva_vaas": (op_shiva_vaas, None),
+    "generate_sankalpa": (op_generate_sankalpa, None),
+    "panchang_calendar_365d": (op_calendar_year, 1),   # one date per location
+    "panchang_calendar_365d_grahas": (op_calendar_year_grahas, 1),
+    "graha_snapshot": (op_graha_snapshot, None),
+    "rise_set_table_365d": (op_rise_set_year, 1),
+    "muhurta_365d": (op_muhurta_year, 1),
+}
+# Cache-hit timings: each case is primed from cold with one untimed call on the
+# same (date, place), so every timed repeat reads what that call stored.
+WARM_OPS = ("compute_panchang_warm", "sun_moon_rise_set_warm")
+
+# ---------- Runner ----------
+def run(ops, repeat):
+    results = []
+    for op_name in ops:
+        fn, dates_per_loc = OPERATIONS[op_name]
+        seen = {}
+        for case, lat, lon, tz, when in cases():
+            loc = case.split(":")[0]
+            if dates_per_loc and seen.get(loc, 0) >= dates_per_loc:
+                continue
+            seen[loc] = seen.get(loc, 0) + 1
+            times, error = [], None
+            if op_name in WARM_OPS:
+                cold()
+                fn(lat, lon, tz, when)
+            for _ in range(repeat):
+                with count_calls() as n:
+                    t0 = time.perf_counter()
+                    try:
+                        fn(lat, lon, tz, when)
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}"
+                    times.append((time.perf_counter() - t0) * 1000.0)
+            results.append({"op": op_name, "case": case, "repeat": repeat,
+                            "wall_ms_median": statistics.median(times), "wall_ms_min": min(times),
+                            "calc_ut": n["calc_ut"], "rise_trans": n["rise_trans"], "error": error})
+    return results
+
+def summarize(results):
+    by_op = {}
+    for r in results:
+        by_op.setdefault(r["op"], []).append(r)
+    rows = []
+    for op_name, rs in by_op.items():
+        rows.append((op_name, len(rs), statistics.median(r["wall_ms_median"] for r in rs),
+                     max(r["wall_ms_median"] for r in rs),
+                     statistics.mean(r["calc_ut"] for r in rs), statistics.mean(r["rise_trans"] for r in rs),
+                     sum(1 for r in rs if r["error"])))
+    print(f"{'operation':26} {'cases':>5} {'med ms':>9} {'max ms':>9} {'calc_ut':>9} {'rise_tr':>8} {'errors':>6}")
+    for row in rows:
+        print(f"{row[0]:26} {row[1]:5d} {row[2]:9.3f} {row[3]:9.3f} {row[4]:9.1f} {row[5]:8.1f} {row[6]:6d}")
+
+def compare(results, baseline_path, time_tolerance):
+    """Regressions against a previous run: any extra ephemeris call, or wall time beyond tolerance."""
+    with open(baseline_path, encoding="utf-8") as f:
+        base = {(r["op"], r["case"]): r for r in json.load(f)["results"]}
+    problems = []
+    for r in results:
+        b = base.get((r["op"], r["case"]))
+        if b is None:
+            continue
+        for key in ("calc_ut", "rise_trans"):
+            if r[key] > b[key]:
+                problems.append(f"{r['op']} {r['case']}: {key} {b[key]} -> {r[key]}")
+        if r["wall_ms_min"] > b["wall_ms_min"] * time_tolerance + 0.05:
+            problems.append(f"{r['op']} {r['case']}: wall {b['wall_ms_min']:.3f} -> {r['wall_ms_min']:.3f} ms")
+    return problems
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--out", default="bench.json")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--ops", nargs="*", default=list(OPERATIONS), choices=list(OPERATIONS))
+    ap.add_argument("--compare", help="previous --out file; exit 1 on regressions")
+    ap.add_argument("--time-tolerance", type=float, default=1.5, help="allowed wall-time ratio vs --compare")
+    args = ap.parse_args(argv)
+
+    results = run(args.ops, args.repeat)
+    meta = {"when": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "platform": platform.platform(), "swisseph": getattr(__import__("swisseph"), "version", "?")}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=1)
+    summarize(results)
+    if args.compare:
+        problems = compare(results, args.compare, args.time_tolerance)
+        for p in problems:
+            print("REGRESSION", p)
+        return 1 if problems else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+"""Golden-dataset accuracy harness: the accelerated engines against a direct Swiss Ephemeris reference.
+
+    pip install -e Kaalachakra                 # once, from the repository root
+    python tools/golden.py build               # once (minutes): slow direct path -> tools/data/golden.npz
+    python tools/golden.py check               # every fast path vs the reference; exit 1 past tolerance
+    python tools/golden.py check --paths panchang_calendar --json golden_report.json
+
+The reference covers LOCATIONS (tropical, mid-latitude, polar, both sides of
+the date line) over RUNS of consecutive days spread across five centuries.
+It shares no solver code with the engines: per local day it stores
+sunrise/sunset/moonrise/moonset from one bare swisseph.rise_trans call each
+(no seeding, no polar shortcuts), the four limb indices at sunrise + 15 min,
+and each limb's end from a brute-force walk of raw swisseph.calc_ut in
+SCAN_DAYS steps until the index changes, bisected to BISECT_DAYS. Times are
+second offsets from the evaluation instant.
+
+check runs each accelerated path from cold caches. It reports the maximum
+and the percentiles of |fast - reference| per quantity, counts of index and
+missing-event mismatches, and ms per day against the part of the direct
+path it replaces, re-timed on this machine. Each path starts from cold
+caches and walks runs of consecutive days, as the app and the calendar do.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytz
+import swisseph
+
+from kaalachakra.core import (compute_panchang, jd_from_dt, limb_transitions, next_change, panchang_calendar,
+                              rise_set_table, sidereal_longs, tithi_index, nak_index, yoga_index, karana_index,
+                              clear_shared_ephemeris, clear_rise_set_tables, clear_panchang_bases, RISE_SET_EVENTS)
+from kaalachakra.core.context import EphemerisContext, reset_applied
+from kaalachakra.core.feed import feed_events
+from kaalachakra.core.riseset import EVENTS, local_midnights
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "golden.npz")
+
+# ---------- Coverage ----------
+LOCATIONS = [
+    ("delhi",        28.6139,   77.2090, "Asia/Kolkata"),
+    ("bhubaneswar",  20.2961,   85.8245, "Asia/Kolkata"),
+    ("quito",        -0.1807,  -78.4678, "America/Guayaquil"),
+    ("new_york",     40.7128,  -74.0060, "America/New_York"),
+    ("london",       51.5074,   -0.1278, "Europe/London"),
+    ("sydney",      -33.8688,  151.2093, "Australia/Sydney"),
+    ("fiji",        -18.1248,  178.4501, "Pacific/Fiji"),
+    ("apia",        -13.8333, -171.7667, "Pacific/Apia"),        # skipped 30 Dec 2011 crossing the date line
+    ("kiritimati",    1.8721, -157.4278, "Pacific/Kiritimati"),  # UTC+14
+    ("honolulu",     21.3069, -157.8583, "Pacific/Honolulu"),
+    ("reykjavik",    64.1466,  -21.9426, "Atlantic/Reykjavik"),
+    ("anchorage",    61.2181, -149.9003, "America/Anchorage"),
+    ("tromso",       69.6492,   18.9553, "Europe/Oslo"),
+    ("svalbard",     78.2232,   15.6267, "Arctic/Longyearbyen"),
+    ("ushuaia",     -54.8019,  -68.3030, "America/Argentina/Ushuaia"),
+    ("mcmurdo",     -77.8463,  166.6683, "Antarctica/McMurdo"),
+]
+# run starts: five centuries, solstice and equinox seasons for the polar sites
+RUNS = [date(1801, 3, 10), date(1900, 6, 8), date(1975, 12, 8), date(2000, 1, 1), date(2011, 12, 20),
+        date(2026, 6, 10), date(2050, 9, 12), date(2100, 3, 10), date(2199, 12, 10), date(2290, 6, 8)]
+RUN_DAYS = 28
+KINDS = ("tithi", "nak", "yoga", "karana")
+INDEX_FNS = {"tithi": lambda s, m: tithi_index(s, m), "nak": lambda s, m: nak_index(m),
+             "yoga": lambda s, m: yoga_index(s, m), "karana": lambda s, m: karana_index(s, m)}
+FEED_LIMBS = ("tithi", "nak", "yoga")
+EVAL_OFFSET = 15 / 1440.0
+MAX_HOURS = 48
+SCAN_DAYS = 15 / 1440.0
+BISECT_DAYS = 1e-8      # ~1 ms
+# (step °, count) per limb, and its angle from sidereal Sun/Moon longitudes
+REF_LIMBS = {"tithi": (12.0, 30), "nak": (360.0 / 27, 27), "yoga": (360.0 / 27, 27), "karana": (6.0, 60)}
+REF_ANGLES = {"tithi": lambda s, m: (m - s) % 360.0, "nak": lambda s, m: m % 360.0,
+              "yoga": lambda s, m: (s + m) % 360.0, "karana": lambda s, m: (m - s) % 360.0}
+
+# |fast - reference| allowed, seconds. Limb ends come out within ~0.05 s. Rise/set
+# is bounded by swe.rise_trans itself: at high latitudes its answer moves by up
+# to ~0.3 s with the start of the search (seeded in the table, midnight here).
+TOLERANCE_S = {"transition": 0.1, "rise_set": 0.5}
+
+def eval_jd(day, sunrise, tz):
+    """sunrise + 15 min, or 06:00 local + 15 min on a day without sunrise, as compute_panchang reads the day."""
+    if np.isnan(sunrise):
+        sunrise = jd_from_dt(tz.localize(datetime(day.year, day.month, day.day, 6)))
+    return sunrise + EVAL_OFFSET
+
+# ---------- Reference (brute force, bare swisseph) ----------
+class BareSky:
+    """Topocentric Lahiri Sun/Moon and rise/set times straight from the swisseph module.
+
+    Deliberately outside kaalachakra.core (no EphemerisContext, no call
+    counting): the library state is set here before every call, and
+    reset_applied() tells the engines' contexts afterwards.
+    """
+
+    def __init__(self, lon, lat):
+        self.geopos = (lon, lat, 0.0)
+        self.flags = swisseph.FLG_SWIEPH | swisseph.FLG_SIDEREAL | swisseph.FLG_TOPOCTR
+
+    def indices(self, jd):
+        swisseph.set_sid_mode(swisseph.SIDM_LAHIRI, 0, 0)
+        swisseph.set_topo(*self.geopos)
+        s = swisseph.calc_ut(jd, swisseph.SUN, self.flags)[0][0]
+        m = swisseph.calc_ut(jd, swisseph.MOON, self.flags)[0][0]
+        return {k: int(REF_ANGLES[k](s, m) // step) % count for k, (step, count) in REF_LIMBS.items()}
+
+    def limb_ends(self, jd0, idx, max_days):
+        """{kind: first JD after jd0 where its index leaves idx[kind], or NaN}: scan, then bisect."""
+        ends, a, todo = {}, jd0, set(idx)
+        while todo and a - jd0 < max_days:
+            b = a + SCAN_DAYS
+            now = self.indices(b)
+            for k in [k for k in todo if now[k] != idx[k]]:
+                lo, hi = a, b
+                while hi - lo > BISECT_DAYS:
+                    mid = 0.5 * (lo + hi)
+                    if self.indices(mid)[k] == idx[k]:
+                        lo = mid
+                    else:
+                        hi = mid
+                ends[k] = 0.5 * (lo + hi)
+                todo.discard(k)
+            a = b
+        return {k: ends.get(k, np.nan) for k in idx}
+
+    def rise_trans(self, jd, body, mode):
+        try:
+            ret, tret = swisseph.rise_trans(jd, body, mode | swisseph.BIT_DISC_CENTER, self.geopos, 1013.25, 15.0)
+        except swisseph.Error:
+            return None
+        return tret[0] if ret >= 0 else None
+
+def reference_day(day, mid, end, lon, lat, tz):
+    """(jd_eval, {event: jd or NaN}, {kind: idx}, {kind: end jd or NaN}) for one local day, brute force."""
+    sky = BareSky(lon, lat)
+    rs = {}
+    for event, (body, mode) in EVENTS.items():
+        jd = sky.rise_trans(mid, body, getattr(swisseph, mode))
+        rs[event] = jd if jd is not None and mid <= jd < end else np.nan
+    jd_eval = eval_jd(day, rs["sunrise"], tz)
+    idx = sky.indices(jd_eval)
+    ends = sky.limb_ends(jd_eval, idx, MAX_HOURS / 24.0)
+    reset_applied()
+    return jd_eval, rs, idx, ends
+
+def reference_run(start, days, lon, lat, tz_name):
+    tz = pytz.timezone(tz_name)
+    bounds = local_midnights(start, days + 1, tz)
+    for i in range(days):
+        yield reference_day(start + timedelta(days=i), bounds[i], bounds[i + 1], lon, lat, tz)
+
+# ---------- Direct path (speed baseline only) ----------
+def direct_day(day, mid, end, lon, lat, tz, clock):
+    """One local day the slow production way (rise_trans per event, next_change per limb), timed into `clock`."""
+    t0 = time.perf_counter()
+    ctx = EphemerisContext(lon, lat)
+    rs = {}
+    for event, (body, mode) in EVENTS.items():
+        jd = ctx.rise_trans(mid, body, getattr(swisseph, mode))
+        rs[event] = jd if jd is not None and mid <= jd < end else np.nan
+    jd_eval = eval_jd(day, rs["sunrise"], tz)
+    t1 = time.perf_counter()
+    s, m = sidereal_longs(jd_eval, lon, lat)
+    for k in KINDS:
+        next_change(jd_eval, lon, lat, k, INDEX_FNS[k](s, m), max_hours=MAX_HOURS)
+    t2 = time.perf_counter()
+    clock["rise_set"] = clock.get("rise_set", 0.0) + t1 - t0
+    clock["limbs"] = clock.get("limbs", 0.0) + t2 - t1
+
+def direct_ms(clock, n):
+    ms = {part: 1000.0 * sec / n for part, sec in clock.items()}
+    ms["day"] = sum(ms.values())
+    return ms
+
+def time_direct(locations, start, sample):
+    """ms per day of the direct path on this machine ({"rise_set", "limbs", "day"}), over `sample` days per location."""
+    clock, n = {}, 0
+    for name, lat, lon, tz_name in locations:
+        tz = pytz.timezone(tz_name)
+        bounds = local_midnights(start, sample + 1, tz)
+        for i in range(sample):
+            direct_day(start + timedelta(days=i), bounds[i], bounds[i + 1], lon, lat, tz, clock)
+            n += 1
+    return direct_ms(clock, n)
+
+def build(path=GOLDEN_PATH, locations=LOCATIONS, runs=RUNS, days=RUN_DAYS):
+    cols = {k: [] for k in ("loc", "run", "day", "jd_eval")}
+    cols.update({e: [] for e in RISE_SET_EVENTS})
+    cols.update({k + "_idx": [] for k in KINDS})
+    cols.update({k + "_end": [] for k in KINDS})
+    t0 = time.perf_counter()
+    for li, (name, lat, lon, tz_name) in enumerate(locations):
+        t1 = time.perf_counter()
+        for ri, start in enumerate(runs):
+            for di, (jd_eval, rs, idx, ends) in enumerate(reference_run(start, days, lon, lat, tz_name)):
+                cols["loc"].append(li); cols["run"].append(ri); cols["day"].append(di)
+                cols["jd_eval"].append(jd_eval)
+                for e in RISE_SET_EVENTS:
+                    cols[e].append((rs[e] - jd_eval) * 86400.0)
+                for k in KINDS:
+                    cols[k + "_idx"].append(idx[k])
+                    cols[k + "_end"].append((ends[k] - jd_eval) * 86400.0)
+        print(f"{name:12} {len(runs) * days} days  {time.perf_counter() - t1:6.1f} s")
+    elapsed = time.perf_counter() - t0
+    n = len(cols["loc"])
+    meta = {"built": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "swisseph": getattr(swisseph, "version", "?"), "locations": locations,
+            "runs": [d.isoformat() for d in runs], "run_days": days, "rows": n,
+            "scan_days": SCAN_DAYS, "bisect_days": BISECT_DAYS,
+            "direct_ms_per_day": time_direct(locations, runs[0], 4)}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, loc=np.array(cols["loc"], np.int8), run=np.array(cols["run"], np.int8),
+                        day=np.array(cols["day"], np.int16), jd_eval=np.array(cols["jd_eval"]),
+                        **{e: np.array(cols[e]) for e in RISE_SET_EVENTS},
+                        **{k + "_idx": np.array(cols[k + "_idx"], np.int8) for k in KINDS},
+                        **{k + "_end": np.array(cols[k + "_end"]) for k in KINDS},
+                        meta=np.array(json.dumps(meta)))
+    print(f"{n} reference days in {elapsed:.0f} s -> {path} ({os.path.getsize(path)} bytes)")
+
+# ---------- Loading ----------
+class Golden:
+    """The reference table with absolute JDs restored, split into (location, run) groups."""
+
+    def __init__(self, path=GOLDEN_PATH):
+        with np.load(path) as z:
+            self.meta = json.loads(str(z["meta"]))
+            self.loc, self.run, jd_eval = z["loc"], z["run"], z["jd_eval"]
+            self.jd_eval = jd_eval
+            self.rise_set = {e: jd_eval + z[e] / 86400.0 for e in RISE_SET_EVENTS}
+            self.idx = {k: z[k + "_idx"].astype(int) for k in KINDS}
+            self.ends = {k: jd_eval + z[k + "_end"] / 86400.0 for k in KINDS}
+        self.locations = [tuple(l) for l in self.meta["locations"]]
+        self.runs = [date.fromisoformat(d) for d in self.meta["runs"]]
+        self.days = self.meta["run_days"]
+
+    def groups(self):
+        """Yield (rows, (name, lat, lon, tz_name), start) per location and run; rows are in day order."""
+        for li, loc in enumerate(self.locations):
+            for ri, start in enumerate(self.runs):
+                rows = np.nonzero((self.loc == li) & (self.run == ri))[0]
+                yield rows, loc, start
+
+# ---------- Fast paths ----------
+# Each returns, for the rows of one group: {"rise_set": {event: jd}, "idx": {kind: idx}, "ends": {kind: jd}};
+# quantities a path does not produce are left out.
+def first_ends(events, after):
+    out = {}
+    for ev in events:
+        if ev.jd > after:
+            out.setdefault(ev.kind, ev.jd)
+    return out
+
+def path_compute_panchang(g, rows, loc, start):
+    name, lat, lon, tz_name = loc
+    tz = pytz.timezone(tz_name)
+    out = {"rise_set": {"sunrise": []}, "idx": {k: [] for k in KINDS}, "ends": {k: [] for k in KINDS}}
+    for i in range(len(rows)):
+        d = start + timedelta(days=i)
+        P = compute_panchang(tz.localize(datetime(d.year, d.month, d.day, 12)), lon, lat, 0.0, tz)
+        out["rise_set"]["sunrise"].append(jd_from_dt(P["sunrise"]) if P["sunrise"] else np.nan)
+        for k, key in zip(KINDS, ("ti_idx", "nak_idx", "yoga_idx", "kar_idx")):
+            out["idx"][k].append(P[key])
+        ends = first_ends(P["transitions"], P["jd_eval"])
+        for k in KINDS:
+            out["ends"][k].append(ends.get(k, np.nan))
+    return out
+
+def path_limb_transitions(g, rows, loc, start):
+    name, lat, lon, tz_name = loc
+    out = {"ends": {k: [] for k in KINDS}}
+    for r in rows:
+        ends = first_ends(limb_transitions(g.jd_eval[r], lon, lat, max_hours=MAX_HOURS), g.jd_eval[r])
+        for k in KINDS:
+            out["ends"][k].append(ends.get(k, np.nan))
+    return out
+
+def path_rise_set_table(g, rows, loc, start):
+    name, lat, lon, tz_name = loc
+    table = rise_set_table(start, len(rows), lon, lat, tz_name)
+    return {"rise_set": {e: table[e] for e in RISE_SET_EVENTS}}
+
+def path_panchang_calendar(g, rows, loc, start):
+    name, lat, lon, tz_name = loc
+    cal = panchang_calendar(start, len(rows), lon, lat, tz_name)
+    ends = {k: cal[k + "_end"] for k in KINDS}
+    # the calendar leaves an end past its scan window as NaN; the reference looks 48 h ahead
+    return {"rise_set": {"sunrise": cal["sunrise"]}, "idx": {k: cal[k] for k in KINDS}, "ends": ends}
+
+def path_feed(g, rows, loc, start):
+    name, lat, lon, tz_name = loc
+    out = {"ends": {k: np.full(len(rows), np.nan) for k in FEED_LIMBS}}
+    jd_eval = g.jd_eval[rows]
+    for ev in feed_events(start, len(rows), lon, lat, tz_name, kinds=FEED_LIMBS):
+        inside = (ev.start <= jd_eval) & (jd_eval < ev.end)
+        out["ends"][ev.kind][inside] = ev.end
+    return out
+
+PATHS = {
+    "compute_panchang": path_compute_panchang,
+    "limb_transitions": path_limb_transitions,
+    "rise_set_table": path_rise_set_table,
+    "panchang_calendar": path_panchang_calendar,
+    "feed": path_feed,
+}
+# the part of the direct day each path replaces, for its speedup
+BASELINE = {"compute_panchang": "day", "limb_transitions": "limbs", "rise_set_table": "rise_set",
+            "panchang_calendar": "day", "feed": "limbs"}
+
+def cold():
+    clear_shared_ephemeris()
+    clear_rise_set_tables()
+    clear_panchang_bases()
+
+# ---------- Comparison ----------
+class Tally:
+    """|Δ| seconds for one quantity, plus rows where exactly one side has no event."""
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.errors, self.missing = [], 0
+
+    def add(self, fast, ref):
+        fast, ref = np.asarray(fast, float), np.asarray(ref, float)
+        both = ~np.isnan(fast) & ~np.isnan(ref)
+        self.missing += int(np.sum(np.isnan(fast) != np.isnan(ref)))
+        self.errors.append(np.abs(fast[both] - ref[both]) * 86400.0)
+
+    def summary(self):
+        e = np.concatenate(self.errors) if self.errors else np.zeros(0)
+        if not e.size:
+            return {"n": 0, "missing": self.missing, "over": 0}
+        p = np.percentile(e, [50, 90, 99, 99.9])
+        return {"n": int(e.size), "max_s": float(e.max()), "p50_s": float(p[0]), "p90_s": float(p[1]),
+                "p99_s": float(p[2]), "p999_s": float(p[3]), "over": int(np.sum(e > self.tolerance)),
+                "missing": self.missing, "tolerance_s": self.tolerance}
+
+def check(g, paths, direct_sample=4):
+    direct = time_direct(g.locations, g.runs[0], direct_sample) if direct_sample else g.meta["direct_ms_per_day"]
+    report = {"reference": g.meta, "direct_ms_per_day": direct, "paths": {}}
+    for path in paths:
+        fn = PATHS[path]
+        tallies, idx_bad, idx_n, wall, days = {}, {}, {}, 0.0, 0
+        cold()
+        for rows, loc, start in g.groups():
+            t0 = time.perf_counter()
+            out = fn(g, rows, loc, start)
+            wall += time.perf_counter() - t0
+            days += len(rows)
+            for event, fast in out.get("rise_set", {}).items():
+                tallies.setdefault(event, Tally(TOLERANCE_S["rise_set"])).add(fast, g.rise_set[event][rows])
+            for kind, fast in out.get("ends", {}).items():
+                ref = g.ends[kind][rows]
+                if path == "panchang_calendar":
+                    ref = np.where(np.isnan(np.asarray(fast, float)) & (rows == rows[-1]), np.nan, ref)
+                tallies.setdefault(kind + "_end", Tally(TOLERANCE_S["transition"])).add(fast, ref)
+            for kind, fast in out.get("idx", {}).items():
+                idx_bad[kind] = idx_bad.get(kind, 0) + int(np.sum(np.asarray(fast) != g.idx[kind][rows]))
+                idx_n[kind] = idx_n.get(kind, 0) + len(rows)
+        fast_ms = 1000.0 * wall / days
+        base = direct[BASELINE[path]]
+        report["paths"][path] = {"days": days, "ms_per_day": fast_ms, "direct_ms_per_day": base,
+                                 "speedup": base / fast_ms,
+                                 "quantities": {q: t.summary() for q, t in tallies.items()},
+                                 "index_mismatches": idx_bad}
+    return report
+
+def print_report(report):
+    print(f"reference: {report['reference']['rows']} days, {len(report['reference']['locations'])} locations, "
+          f"runs {report['reference']['runs'][0]} .. {report['reference']['runs'][-1]}; "
+          f"direct path ms/day: " + ", ".join(f"{k} {v:.1f}" for k, v in report["direct_ms_per_day"].items()))
+    for path, r in report["paths"].items():
+        print(f"\n{path}: {r['ms_per_day']:.2f} ms/day, {r['speedup']:.1f}x vs direct {r['direct_ms_per_day']:.1f}; "
+              f"index mismatches {r['index_mismatches'] or '—'}")
+        print(f"  {'quantity':14} {'n':>6} {'max s':>9} {'p50 s':>8} {'p90 s':>8} {'p99 s':>8} {'p99.9 s':>8} "
+              f"{'>tol':>5} {'missing':>7}")
+        for q, s in r["quantities"].items():
+            if not s["n"]:
+                print(f"  {q:14} {0:6d} {'—':>9} {'':>8} {'':>8} {'':>8} {'':>8} {0:5d} {s['missing']:7d}")
+                continue
+            print(f"  {q:14} {s['n']:6d} {s['max_s']:9.3f} {s['p50_s']:8.3f} {s['p90_s']:8.3f} {s['p99_s']:8.3f} "
+                  f"{s['p999_s']:8.3f} {s['over']:5d} {s['missing']:7d}")
+
+def failures(report):
+    bad = []
+    for path, r in report["paths"].items():
+        for q, s in r["quantities"].items():
+            if s["over"] or s["missing"]:
+                bad.append(f"{path} {q}: {s['over']} past {s.get('tolerance_s')} s, {s['missing']} missing")
+        for kind, n in r["index_mismatches"].items():
+            if n:
+                bad.append(f"{path} {kind}: {n} index mismatches")
+    return bad
+
+# ---------- CLI ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="compute the reference with the direct path")
+    b.add_argument("--out", default=GOLDEN_PATH)
+    b.add_argument("--days", type=int, default=RUN_DAYS, help="consecutive days per run")
+    c = sub.add_parser("check", help="compare the accelerated paths against the reference")
+    c.add_argument("--golden", default=GOLDEN_PATH)
+    c.add_argument("--paths", nargs="*", default=list(PATHS), choices=list(PATHS))
+    c.add_argument("--direct-sample", type=int, default=4, help="days per location to re-time the direct path (0: use the build's)")
+    c.add_argument("--json", help="also write the report here")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        build(args.out, days=args.days)
+        return 0
+    report = check(Golden(args.golden), args.paths, args.direct_sample)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    bad = failures(report)
+    for line in bad:
+        print("FAIL", line)
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Load test for service.py: concurrent clients against a local instance, latency and throughput per endpoint.
+
+    python tools/load_test.py                         # starts service.py on a free port, 8 clients, 20 s
+    python tools/load_test.py --url http://127.0.0.1:8765 --clients 32 --seconds 60
+
+Clients draw from a fixed mix: live panchang and Shiva Vaas for a pool of
+locations (mostly cache hits), revalidation with If-None-Match (304s),
+panchang batches of dates x locations, and sankalpa batches. Every
+non-2xx/304 answer counts as an error; exits 1 if any occurred.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOCATIONS = [
+    {"lat": 28.6139, "lon": 77.2090, "tz": "Asia/Kolkata"},
+    {"lat": 20.2961, "lon": 85.8245, "tz": "Asia/Kolkata"},
+    {"lat": 19.0760, "lon": 72.8777, "tz": "Asia/Kolkata"},
+    {"lat": 40.7128, "lon": -74.0060, "tz": "America/New_York"},
+    {"lat": 51.5074, "lon": -0.1278, "tz": "Europe/London"},
+    {"lat": -33.8688, "lon": 151.2093, "tz": "Australia/Sydney"},
+    {"lat": 69.6492, "lon": 18.9553, "tz": "Europe/Oslo"},
+]
+PARTICIPANTS = [{"name": f"Bhakta {i}", "gotra": "Bhāradvāja", "gender": "Male" if i % 2 else "Female",
+                 "purpose": "peace and health for the family", "offering": "11 recitations and naivedya"}
+                for i in range(20)]
+
+# (name, weight)
+MIX = [("panchang", 50), ("revalidate", 20), ("shiva_vaas", 15), ("batch", 10), ("sankalpa", 5)]
+
+def request(base, kind, rng, etags):
+    """(endpoint label, method, url, body, headers) for one draw of the mix."""
+    loc = rng.choice(LOCATIONS)
+    q = "&".join(f"{k}={v}" for k, v in loc.items())
+    if kind == "panchang":
+        return "GET /panchang", "GET", f"{base}/panchang?{q}", None, {}
+    if kind == "revalidate":
+        url = f"{base}/panchang?{q}"
+        return "GET /panchang (If-None-Match)", "GET", url, None, {"If-None-Match": etags.get(url, '"none"')}
+    if kind == "shiva_vaas":
+        return "GET /shiva-vaas", "GET", f"{base}/shiva-vaas?{q}", None, {}
+    if kind == "batch":
+        start = date.today() + timedelta(days=rng.randrange(0, 30))
+        body = {"dates": [(start + timedelta(days=i)).isoformat() for i in range(7)], "locations": LOCATIONS[:4]}
+        return "POST /panchang/batch (28)", "POST", f"{base}/panchang/batch", body, {}
+    body = {**LOCATIONS[1], "when": date.today().isoformat() + "T07:30", "state": "Odisha", "city": "Bhubaneswar",
+            "participants": PARTICIPANTS}
+    return "POST /sankalpa (20)", "POST", f"{base}/sankalpa", body, {}
+
+def client(base, deadline, seed, stats, lock):
+    rng = random.Random(seed)
+    kinds, weights = zip(*MIX)
+    etags = {}
+    while time.monotonic() < deadline:
+        label, method, url, body, headers = request(base, rng.choices(kinds, weights)[0], rng, etags)
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(url, data=data, method=method,
+                                     headers={**headers, "Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=60) as r:
+                r.read()
+                status, etag = r.status, r.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            status, etag = e.code, e.headers.get("ETag")
+        except OSError as e:
+            status, etag = type(e).__name__, None
+        ms = (time.perf_counter() - t0) * 1000.0
+        if etag and method == "GET":
+            etags[url] = etag
+        with lock:
+            stats[label]["ms"].append(ms)
+            stats[label]["status"][status] += 1
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def spawn_service():
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "service.py"), "--port", str(port)],
+                            cwd=ROOT, stdout=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base + "/health", timeout=1).read()
+            return proc, base
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("service did not come up")
+
+def pct(sorted_ms, p):
+    return sorted_ms[min(len(sorted_ms) - 1, int(p * len(sorted_ms)))]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--url", help="running service; default: start service.py on a free local port")
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    proc, base = (None, args.url.rstrip("/")) if args.url else spawn_service()
+    stats = defaultdict(lambda: {"ms": [], "status": defaultdict(int)})
+    lock = threading.Lock()
+    try:
+        deadline = time.monotonic() + args.seconds
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(base, deadline, args.seed + i, stats, lock))
+                   for i in range(args.clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        server_stats = json.loads(urllib.request.urlopen(base + "/stats", timeout=10).read())
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    total = errors = 0
+    print(f"{'endpoint':32} {'n':>6} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}  status")
+    for label, s in sorted(stats.items()):
+        ms = sorted(s["ms"])
+        total += len(ms)
+        errors += sum(n for code, n in s["status"].items() if code not in (200, 304))
+        codes = " ".join(f"{code}×{n}" for code, n in sorted(s["status"].items(), key=str))
+        print(f"{label:32} {len(ms):6d} {len(ms) / elapsed:8.1f} {pct(ms, 0.5):8.2f} {pct(ms, 0.9):8.2f} "
+              f"{pct(ms, 0.99):8.2f}  {codes}")
+    print(f"{total} requests in {elapsed:.1f} s ({total / elapsed:.1f} req/s), {errors} errors, "
+          f"{args.clients} clients")
+    pc, rc = server_stats["panchang_cache"], server_stats["responses"]
+    print(f"server: panchang cache hits {pc['hits']} / misses {pc['misses']}  |  "
+          f"response cache hits {rc['hits']} / misses {rc['misses']}")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Rerun latency of the Streamlit app when a Sankalpa form is used, via streamlit.testing.
+
+    pip install -e Kaalachakra                    # once, from the repository root
+    python tools/rerun_latency.py --rounds 20
+
+"full rerun" is the whole script run after a Sankalpa field changes. Before the
+forms moved into st.form + st.fragment, every keystroke paid that. "fragment
+rerun" is a submit that reruns only its fragment, as a Streamlit server does:
+AppTest always runs the whole script, so the fragment id is queued on the
+rerun here; its wall time still carries AppTest's own per-run setup (tens of
+ms). "fragment body" is what the app itself records for that rerun (the
+session_state["fragment_ms"] gauge, left alone by full reruns).
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from functools import partial
+from unittest import mock
+
+import streamlit.testing.v1.local_script_runner as local_runner
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIELDS = ("Name (e.g., Amlan Mishra)", "Full Name (IAST or English)")
+# fragment_timer name -> (fragment function, submit label)
+SUBMITS = {"sankalpa_form": ("sankalpa_form", "✨ Generate"),
+           "grand_sankalpa": ("grand_sankalpa_form", "🔥 Generate Grand Sankalpa")}
+
+def _widget(at, kind, label):
+    return next((w for w in getattr(at, kind) if w.label == label), None)
+
+def _fragment_ids(at):
+    """{function name: fragment id} of the fragments registered by the last run (AppTest internals)."""
+    ids = {}
+    for fid, wrapped in at._fragment_storage._fragments.items():
+        cells = dict(zip(wrapped.__code__.co_freevars, wrapped.__closure__ or ()))
+        ids[cells["non_optional_func"].cell_contents.__name__] = fid
+    return ids
+
+def _timed_run(at, fragment_id=None):
+    """Wall ms of one rerun: the whole script, or only `fragment_id` as a server would rerun it."""
+    rerun = partial(local_runner.RerunData, fragment_id_queue=[fragment_id]) if fragment_id else local_runner.RerunData
+    t0 = time.perf_counter()
+    with mock.patch.object(local_runner, "RerunData", rerun):
+        at.run(timeout=60)
+    return (time.perf_counter() - t0) * 1000.0
+
+def measure(rounds):
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    at.run()   # cold: fits, rise/set tables, panchang cache
+    if at.exception:
+        raise SystemExit(f"app raised: {at.exception[0].message}")
+    out = {}
+    for label in FIELDS:
+        field = _widget(at, "text_input", label)
+        times = []
+        for i in range(rounds):
+            field.set_value(f"Participant {i}")
+            times.append(_timed_run(at))
+            field = _widget(at, "text_input", label)
+        out[f"full rerun: type in {label!r}"] = times
+    ids = _fragment_ids(at)
+    for name, (func, label) in SUBMITS.items():
+        full, wall, body = [], [], []
+        for _ in range(rounds):
+            button = _widget(at, "button", label)
+            if button is None:   # pre-form layout: submits were plain buttons too
+                break
+            if func in ids:
+                button.click()
+                wall.append(_timed_run(at, ids[func]))
+                body.append(at.session_state["fragment_ms"][name])
+                button = _widget(at, "button", label)
+            # last, so the element tree holds the whole page again for the next submit
+            button.click()
+            full.append(_timed_run(at))
+        out[f"full rerun: submit {name}"] = full
+        out[f"fragment rerun: submit {name}"] = wall
+        out[f"fragment body: submit {name}"] = body
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rounds", type=int, default=10)
+    args = ap.parse_args(argv)
+    logging.disable(logging.WARNING)   # AppTest's per-run deprecation notices
+    print(f"{'interaction':58} {'n':>3} {'med ms':>9} {'p90 ms':>9}")
+    for what, times in measure(args.rounds).items():
+        if not times:
+            print(f"{what:58} {0:3d} {'—':>9} {'—':>9}")
+            continue
+        times = sorted(times)
+        print(f"{what:58} {len(times):3d} {statistics.median(times):9.2f} {times[int(0.9 * (len(times) - 1))]:9.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
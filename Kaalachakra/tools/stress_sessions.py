@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Concurrent-session stress test: many threads at different coordinates must match a serial run.
+
+    pip install -e Kaalachakra                    # once, from the repository root
+    python tools/stress_sessions.py --sessions 32 --rounds 20
+    python tools/stress_sessions.py --unsafe      # the old set_topo-then-calc pattern, for contrast
+
+(--unsafe only fails on Swiss Ephemeris builds whose state is process-global;
+builds with thread-local state pass it, but there a new thread starts from the
+default sidereal mode, which the context run checks for.)
+
+Each session is a thread pinned to its own location, as Streamlit runs one
+script thread per browser session. Every result is compared bit-for-bit with
+the same call made serially beforehand; any difference means one session saw
+another's Swiss Ephemeris state. Exits 1 on mismatches or exceptions.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pytz
+
+from kaalachakra.core import (compute_panchang, sidereal_longs, sidereal_longs_speed, sun_moon_rise_set,
+                              shared_ephemeris, clear_shared_ephemeris, jd_from_dt, SUN, MOON, JUPITER)
+
+TZ = pytz.utc
+BASE = TZ.localize(datetime(2025, 1, 1, 6, 0))
+
+def sessions(n, seed):
+    """n distinct (lat, lon) points spread over the inhabited globe."""
+    rng = random.Random(seed)
+    return [(round(rng.uniform(-60.0, 66.0), 4), round(rng.uniform(-180.0, 180.0), 4)) for _ in range(n)]
+
+def unsafe_longs(jd, lon, lat):
+    """What the app did before EphemerisContext: set globals, then calc, with no lock."""
+    import swisseph as swe
+    swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
+    swe.set_topo(lon, lat, 0.0)
+    flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL | swe.FLG_TOPOCTR
+    return swe.calc_ut(jd, swe.SUN, flags)[0][0], swe.calc_ut(jd, swe.MOON, flags)[0][0]
+
+def workload(lat, lon, rnd, unsafe):
+    """Deterministic list of (label, result) for one session and round."""
+    when = BASE.replace(day=1 + rnd % 28, hour=(rnd * 5) % 24)
+    jd = jd_from_dt(when)
+    if unsafe:
+        return [("unsafe_longs", unsafe_longs(jd + 0.01 * k, lon, lat)) for k in range(20)]
+    out = [("sidereal_longs", sidereal_longs(jd, lon, lat)),
+           ("sidereal_longs_speed", sidereal_longs_speed(jd, lon, lat, 0.01)),
+           ("rise_set", sun_moon_rise_set(when, lon, lat, TZ)[-1]),
+           ("geocentric", tuple(shared_ephemeris((SUN, MOON, JUPITER)).longs(jd)))]
+    P = compute_panchang(when, lon, lat, 0.0, TZ)
+    out.append(("panchang", (P["tithi"], P["nakshatra"], P["yoga"], P["karana"],
+                             P["tithi_ends"], P["nak_ends"], P["yoga_ends"], P["karana_ends"])))
+    return out
+
+def run_serial(points, rounds, unsafe):
+    clear_shared_ephemeris()
+    return {(i, r): workload(lat, lon, r, unsafe) for i, (lat, lon) in enumerate(points) for r in range(rounds)}
+
+def run_concurrent(points, rounds, unsafe, reference):
+    clear_shared_ephemeris()
+    mismatches, errors = [], []
+    start = threading.Barrier(len(points))
+
+    def session(i, lat, lon):
+        start.wait()
+        for r in range(rounds):
+            try:
+                got = workload(lat, lon, r, unsafe)
+            except Exception as e:
+                errors.append(f"session {i} round {r}: {type(e).__name__}: {e}")
+                continue
+            for (label, a), (_, b) in zip(got, reference[(i, r)]):
+                if a != b:
+                    mismatches.append(f"session {i} ({lat}, {lon}) round {r} {label}: {a} != {b}")
+
+    threads = [threading.Thread(target=session, args=(i, lat, lon)) for i, (lat, lon) in enumerate(points)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return mismatches, errors, time.perf_counter() - t0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=24)
+    ap.add_argument("--rounds", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--switch-interval", type=float, default=1e-6,
+                    help="sys.setswitchinterval during the run; tiny values force frequent thread switches")
+    ap.add_argument("--unsafe", action="store_true", help="stress the unguarded set_topo/calc_ut pattern instead")
+    args = ap.parse_args(argv)
+
+    points = sessions(args.sessions, args.seed)
+    t0 = time.perf_counter()
+    reference = run_serial(points, args.rounds, args.unsafe)
+    serial_s = time.perf_counter() - t0
+
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(args.switch_interval)
+    try:
+        mismatches, errors, conc_s = run_concurrent(points, args.rounds, args.unsafe, reference)
+    finally:
+        sys.setswitchinterval(old)
+
+    for line in (errors + mismatches)[:20]:
+        print(line)
+    print(f"{args.sessions} sessions x {args.rounds} rounds ({'unsafe' if args.unsafe else 'context'}): "
+          f"serial {serial_s:.2f}s, concurrent {conc_s:.2f}s, {len(mismatches)} mismatches, {len(errors)} errors")
+    return 1 if mismatches or errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# utils/sankalpa_batch.py
+
+import argparse
+import csv
+import io
+import re
+import zipfile
+from collections import namedtuple
+from datetime import datetime
+
+from utils.sankalpa_engine import (OFFERING_MATCHER, PURPOSE_MATCHER, load_vocabulary, sankalpa_pledge,
+                                   sankalpa_preamble)
+
+# ---------- Participants ----------
+Participant = namedtuple("Participant", "name gotra gender purpose offering")
+PARTICIPANT_FIELDS = Participant._fields
+REQUIRED_FIELDS = ("name", "gender")
+
+# result of one row: `text` is None and `error` set when the row could not be rendered
+SankalpaResult = namedtuple("SankalpaResult", "row name text error")
+
+def as_participant(item):
+    """Accept Participant, a dict (CSV row; header case and spaces ignored) or a 5-tuple."""
+    if isinstance(item, Participant):
+        p = item
+    elif isinstance(item, dict):
+        row = {str(k).strip().lower(): ("" if v is None else str(v).strip()) for k, v in item.items() if k}
+        p = Participant(*(row.get(f, "") for f in PARTICIPANT_FIELDS))
+    else:
+        p = Participant(*item)
+    missing = [f for f in REQUIRED_FIELDS if not getattr(p, f)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if p.gender[:1].lower() not in ("m", "f"):
+        raise ValueError(f"gender must be male or female, got {p.gender!r}")
+    return p
+
+def read_participants(path_or_file):
+    """Yield participant rows (dicts) from a CSV one at a time; the file is never loaded whole."""
+    if isinstance(path_or_file, str):
+        with open(path_or_file, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+    else:
+        yield from csv.DictReader(path_or_file)
+
+# ---------- Occasion (computed once) ----------
+def sankalpa_occasion(when_dt, lon, lat, *, country, state, city, trim=0.0, node="mean"):
+    """Keyword arguments of sankalpa_preamble for the aware datetime when_dt at (lat, lon).
+
+    Runs the panchang, the nine-graha snapshot and the lunar month once;
+    every participant of the occasion shares the result.
+    """
+    from kaalachakra.core import compute_panchang, graha_snapshot, grahas_by_name, jd_from_dt, lunar_month
+    P = compute_panchang(when_dt, lon, lat, trim, when_dt.tzinfo)
+    g = grahas_by_name(graha_snapshot(when_dt, lon, lat, trim, node))
+    masa = lunar_month(jd_from_dt(when_dt), trim)
+    return dict(country=country, state=state, city=city,
+                paksha_iast=P["paksha"], tithi_iast=P["tithi"], weekday_dt=when_dt,
+                nakshatra_iast=P["nakshatra"], yoga_iast=P["yoga"], karana_iast=P["karana"],
+                lunar_month_iast=masa.name, adhika_masa=masa.adhika,
+                sun_lon_sidereal=g["Surya"].longitude, moon_lon_sidereal=g["Chandra"].longitude,
+                jupiter_lon_sidereal=g["Guru"].longitude,
+                graha_rashis={name: p.rashi for name, p in g.items()})
+
+# ---------- Rendering ----------
+def batch_sankalpas(participants, occasion, purpose_vocab=PURPOSE_MATCHER, offering_vocab=OFFERING_MATCHER):
+    """Yield a SankalpaResult per participant, in input order.
+
+    `occasion` is sankalpa_occasion()'s dict; its preamble is rendered once.
+    The vocabularies are PhraseMatchers, compiled once for the whole batch.
+    A bad row yields a result with `error` set instead of stopping the batch.
+    Rows are numbered from 1 (the first data row of a CSV).
+    """
+    preamble = sankalpa_preamble(**occasion)
+    for i, item in enumerate(participants, 1):
+        try:
+            p = as_participant(item)
+            text = preamble + sankalpa_pledge(name_iast=p.name, gotra_iast=p.gotra or "—", gender=p.gender,
+                                              purpose_free=p.purpose, offering_free=p.offering,
+                                              purpose_vocab=purpose_vocab, offering_vocab=offering_vocab)
+        except Exception as e:
+            yield SankalpaResult(i, _raw_name(item), None, f"{type(e).__name__}: {e}")
+            continue
+        yield SankalpaResult(i, p.name, text, None)
+
+def _raw_name(item):
+    if isinstance(item, dict):
+        return next((str(v).strip() for k, v in item.items() if k and k.strip().lower() == "name" and v), "")
+    return str(item[0]) if item else ""
+
+def _slug(name):
+    return re.sub(r"[^\w-]+", "_", name, flags=re.UNICODE).strip("_")[:40] or "sankalpa"
+
+def write_batch(results, out):
+    """Write results to `out` and return (written, errors).
+
+    out ending in .zip, or a binary file object: a ZIP with one UTF-8 text
+    file per participant plus errors.csv. Any other path: a single text file, sankalpas separated by a rule line,
+    with errors in `<out>.errors.csv`. Members are written as they arrive, so
+    memory stays flat however long the participant list is.
+    """
+    written, errors = 0, []
+    if not isinstance(out, str) or out.lower().endswith(".zip"):
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for r in results:
+                if r.error:
+                    errors.append(r)
+                    continue
+                zf.writestr(f"{r.row:05d}_{_slug(r.name)}.txt", r.text.encode("utf-8"))
+                written += 1
+            zf.writestr("errors.csv", _errors_csv(errors))
+        return written, errors
+    with open(out, "w", encoding="utf-8") as f:
+        for r in results:
+            if r.error:
+                errors.append(r)
+                continue
+            f.write(f"{'=' * 20} {r.row}: {r.name} {'=' * 20}\n{r.text}\n\n")
+            written += 1
+    if errors:
+        with open(out + ".errors.csv", "w", encoding="utf-8") as f:
+            f.write(_errors_csv(errors))
+    return written, errors
+
+def _errors_csv(errors):
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(("row", "name", "error"))
+    w.writerows((r.row, r.name, r.error) for r in errors)
+    return buf.getvalue()
+
+# ---------- CLI ----------
+def main(argv=None):
+    import pytz
+    ap = argparse.ArgumentParser(description="Render sankalpas for a CSV of participants sharing one occasion.")
+    ap.add_argument("participants", help="CSV with name, gotra, gender, purpose, offering columns")
+    ap.add_argument("--when", required=True, type=datetime.fromisoformat, help="local date and time, e.g. 2025-11-05T07:30")
+    ap.add_argument("--tz", default="Asia/Kolkata")
+    ap.add_argument("--lat", type=float, required=True)
+    ap.add_argument("--lon", type=float, required=True)
+    ap.add_argument("--country", default="Bhāratavarṣe")
+    ap.add_argument("--state", default="")
+    ap.add_argument("--city", default="")
+    ap.add_argument("--trim", type=float, default=0.0)
+    ap.add_argument("--purpose-vocab", help="two-column CSV (english, sanskrit) added to the built-in purposes")
+    ap.add_argument("--offering-vocab", help="two-column CSV (english, sanskrit) added to the built-in offerings")
+    ap.add_argument("--out", default="sankalpas.zip", help=".zip for one file per participant, else one text file")
+    args = ap.parse_args(argv)
+    when = pytz.timezone(args.tz).localize(args.when)
+    occasion = sankalpa_occasion(when, args.lon, args.lat, country=args.country, state=args.state,
+                                 city=args.city, trim=args.trim)
+    purposes = PURPOSE_MATCHER.extend(load_vocabulary(args.purpose_vocab)) if args.purpose_vocab else PURPOSE_MATCHER
+    offerings = OFFERING_MATCHER.extend(load_vocabulary(args.offering_vocab)) if args.offering_vocab else OFFERING_MATCHER
+    results = batch_sankalpas(read_participants(args.participants), occasion, purposes, offerings)
+    written, errors = write_batch(results, args.out)
+    for r in errors:
+        print(f"row {r.row} ({r.name or '—'}): {r.error}")
+    print(f"{written} sankalpas -> {args.out}, {len(errors)} errors")
+    return 1 if errors and not written else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # utils/sankalpa_engine.py
 
+import re
 from datetime import datetime
 
 # ---------- Transliteration helpers ----------
@@ -37,6 +38,16 @@ def ayana_from_sun_sign(sun_lon_deg: float) -> str:
     sign = int((sun_lon_deg % 360) // 30)
     return "Uttarāyane" if sign in [9, 10, 11, 0, 1, 2] else "Dakṣiṇāyane"
 
+# Locatives for "<rāśi> rāśisthite <graha>", the remaining grahas after Moon, Sun and Jupiter.
+GRAHA_LOCATIVE = {
+    "Mangala": "Bhaume",
+    "Budha": "Budhe",
+    "Shukra": "Śukre",
+    "Shani": "Śanaiścare",
+    "Rahu": "Rāhau",
+    "Ketu": "Ketau",
+}
+
 # ---------- Month → Ṛtu map ----------
 RITU_BY_LUNAR_MONTH = {
     "Chaitra": "Vasanta ṛtau",
@@ -79,17 +90,82 @@ OFFERING_MAP = {
     "lamp": "dīpam dīpayāmi",
 }
 
-def sanskritize_free(text: str, mapping: dict, default_suffix: str = "") -> str:
+# ---------- Phrase matcher ----------
+class PhraseMatcher:
+    """Every vocabulary key found in a text, in one left-to-right regex pass.
+
+    The keys are compiled into a single trie-shaped pattern, so matching costs
+    about the same for a dozen keys or many thousands. A key matches only at
+    the start of a word ("obstacle" matches "obstacles", not "nonobstacle");
+    where several keys start at the same place the longest one wins.
+    """
+
+    def __init__(self, mapping: dict):
+        self.mapping = {k.strip().lower(): v for k, v in mapping.items() if k and k.strip()}
+        self.pattern = re.compile(r"(?<!\w)" + _trie_pattern(self.mapping)) if self.mapping else None
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def find(self, text: str) -> list:
+        """Phrases for all matches in order, each distinct phrase once."""
+        if self.pattern is None or not text:
+            return []
+        return list(dict.fromkeys(self.mapping[m.group(0)] for m in self.pattern.finditer(text.lower())))
+
+    def extend(self, mapping: dict) -> "PhraseMatcher":
+        """A new matcher with `mapping` added on top of this vocabulary."""
+        return PhraseMatcher({**self.mapping, **mapping})
+
+def _trie_pattern(keys) -> str:
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = None
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # a key may end here: the greedy optional still tries the longer keys first
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+def load_vocabulary(path: str) -> dict:
+    """{english: sanskrit} from a two-column CSV (a header row starting with "#" or "key" is skipped)."""
+    import csv
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [r for r in csv.reader(f) if len(r) >= 2 and r[0].strip()]
+    if rows and (rows[0][0].startswith("#") or rows[0][0].strip().lower() in ("key", "english")):
+        rows = rows[1:]
+    return {r[0]: r[1].strip() for r in rows}
+
+PURPOSE_MATCHER = PhraseMatcher(PURPOSE_MAP)
+OFFERING_MATCHER = PhraseMatcher(OFFERING_MAP)
+
+def sanskritize_free(text: str, mapping, default_suffix: str = "") -> str:
+    """Sanskrit phrases for every intent found in `text`, joined with ", ".
+
+    `mapping` is a PhraseMatcher or a plain dict (compiled on each call, so
+    prefer a PhraseMatcher for large or repeated vocabularies). With no hit,
+    the text itself is kept, followed by `default_suffix`.
+    """
     if not text:
         return default_suffix.strip()
-    low = text.lower()
-    for k, v in mapping.items():
-        if k in low:
-            return v
+    matcher = mapping if isinstance(mapping, PhraseMatcher) else PhraseMatcher(mapping)
+    phrases = matcher.find(text)
+    if phrases:
+        return ", ".join(phrases)
     return (text.strip() + (" " + default_suffix if default_suffix else "")).strip()
 
-# ---------- MAIN GENERATOR ----------
-def generate_sankalpa(
+# ---------- Shared preamble & personal pledge ----------
+# A sankalpa is an occasion part (place, time, panchang, grahas) followed by
+# the taker's pledge. Batches render the preamble once and only the pledge per person.
+def sankalpa_preamble(
     *,
     country: str,
     state: str,
@@ -101,40 +177,35 @@ def generate_sankalpa(
     yoga_iast: str,
     karana_iast: str,
     lunar_month_iast: str,
+    adhika_masa: bool = False,
     sun_lon_sidereal: float,
     moon_lon_sidereal: float,
     jupiter_lon_sidereal: float,
-    name_iast: str,
-    gotra_iast: str,
-    purpose_free: str,
-    offering_free: str,
-    gender: str,
-    when_dt: datetime
+    graha_rashis: dict = None,
 ) -> str:
-    """Return full Sankalpa text (IAST-style)."""
+    """Occasion part of the Sankalpa, from ॐ up to the pledge (IAST-style).
+
+    graha_rashis ({"Mangala": "Simha", ...}, e.g. from core.graha_snapshot)
+    names the rāśi of every other graha; without it they are covered by the
+    customary "Śeṣeshu graheshu yathā-yathā…" line.
+    """
 
     vara_phrase = weekday_iast(weekday_dt)
     ayana = ayana_from_sun_sign(sun_lon_sidereal)
     ritu = RITU_BY_LUNAR_MONTH.get(lunar_month_iast, "— ṛtau")
+    masa = ("Adhika " if adhika_masa else "") + lunar_month_iast
 
     # Rāśis
     chandra_rashi = rashi_from_longitude(moon_lon_sidereal)
     surya_rashi = rashi_from_longitude(sun_lon_sidereal)
     deva_guru_rashi = rashi_from_longitude(jupiter_lon_sidereal)
+    if graha_rashis:
+        other_grahas = "".join(f"{graha_rashis[g]} rāśisthite {loc},\n" for g, loc in GRAHA_LOCATIVE.items()
+                               if g in graha_rashis)
+    else:
+        other_grahas = "\nŚeṣeshu graheshu yathā-yathā rāśi-sthānastheshu satsu,\n"
 
-    # Date/time
-    date_str = dev_digits(when_dt.strftime("%d-%m-%Y"))
-    time_str = dev_digits(when_dt.strftime("%I:%M %p"))
-
-    # Gendered Sanskrit phrase
-    gotra_phrase = "Gotrotpannasya" if gender.lower().startswith("m") else "Gotrotpannāyāḥ"
-
-    # Sanskritize user intent
-    purpose_san = sanskritize_free(purpose_free, PURPOSE_MAP, "hetōḥ")
-    offering_san = sanskritize_free(offering_free, OFFERING_MAP)
-
-    # Full Drik-style Sankalpa
-    sankalpa_text = f"""ॐ विष्णुर्विष्णुर्विष्णुः
+    return f"""ॐ विष्णुर्विष्णुर्विष्णुः
 Shrimadbhagavato Mahapurushasya Vishnorājñayā pravartamānasya
 Adyaitasya Brahmaṇo’ahni, Dvitīye Parārdhe,
 Śrī Śvetavarāha Kalpe, Vaivasvata Manvantare,
@@ -147,7 +218,7 @@ Bhūrloke,
 {city} nāmnī nagare,
 
 {ayana}, {ritu},
-{lunar_month_iast} māse,
+{masa} māse,
 {paksha_iast} pakṣe,
 {tithi_iast} tithau,
 {vara_phrase},
@@ -157,13 +228,69 @@ Bhūrloke,
 {chandra_rashi} rāśisthite Chandre,
 {surya_rashi} rāśisthite Śrī Sūrye,
 {deva_guru_rashi} rāśisthite Deva-gurau,
+{other_grahas}Evam graha-guṇa-viśeṣaṇa-viśiṣṭāyām śubha-puṇya-tithau,
 
-Śeṣeshu graheshu yathā-yathā rāśi-sthānastheshu satsu,
-Evam graha-guṇa-viśeṣaṇa-viśiṣṭāyām śubha-puṇya-tithau,
+"""
 
-Aham {gotra_iast} {gotra_phrase} {name_iast} nāma,
+def sankalpa_pledge(
+    *,
+    name_iast: str,
+    gotra_iast: str,
+    purpose_free: str,
+    offering_free: str,
+    gender: str,
+    purpose_vocab: PhraseMatcher = PURPOSE_MATCHER,
+    offering_vocab: PhraseMatcher = OFFERING_MATCHER,
+) -> str:
+    """Personal part of the Sankalpa: who takes it, why, and what is offered."""
+
+    # Gendered Sanskrit phrase
+    gotra_phrase = "Gotrotpannasya" if gender.lower().startswith("m") else "Gotrotpannāyāḥ"
+
+    # Sanskritize user intent
+    purpose_san = sanskritize_free(purpose_free, purpose_vocab, "hetōḥ")
+    offering_san = sanskritize_free(offering_free, offering_vocab)
+
+    return f"""Aham {gotra_iast} {gotra_phrase} {name_iast} nāma,
 {purpose_san},
 {offering_san}।
 
 Iti Sankalpah."""
-    return sankalpa_text
\ No newline at end of file
+
+# ---------- MAIN GENERATOR ----------
+def generate_sankalpa(
+    *,
+    country: str,
+    state: str,
+    city: str,
+    paksha_iast: str,
+    tithi_iast: str,
+    weekday_dt: datetime,
+    nakshatra_iast: str,
+    yoga_iast: str,
+    karana_iast: str,
+    lunar_month_iast: str,
+    adhika_masa: bool = False,
+    sun_lon_sidereal: float,
+    moon_lon_sidereal: float,
+    jupiter_lon_sidereal: float,
+    graha_rashis: dict = None,
+    name_iast: str,
+    gotra_iast: str,
+    purpose_free: str,
+    offering_free: str,
+    gender: str,
+    when_dt: datetime
+) -> str:
+    """Return full Sankalpa text (IAST-style)."""
+
+    preamble = sankalpa_preamble(
+        country=country, state=state, city=city,
+        paksha_iast=paksha_iast, tithi_iast=tithi_iast, weekday_dt=weekday_dt,
+        nakshatra_iast=nakshatra_iast, yoga_iast=yoga_iast, karana_iast=karana_iast,
+        lunar_month_iast=lunar_month_iast, adhika_masa=adhika_masa,
+        sun_lon_sidereal=sun_lon_sidereal, moon_lon_sidereal=moon_lon_sidereal,
+        jupiter_lon_sidereal=jupiter_lon_sidereal, graha_rashis=graha_rashis,
+    )
+    return preamble + sankalpa_pledge(name_iast=name_iast, gotra_iast=gotra_iast, purpose_free=purpose_free,
+                                      offering_free=offering_free, gender=gender)
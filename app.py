@@ -1,5 +1,13 @@
+import csv
+import io
+from datetime import datetime
+
+import pytz
 import streamlit as st
 
+# Shiva Vaas tables live in the Kaalachakra core package (pip install ./Kaalachakra, see requirements.txt)
+from kaalachakra.core.shiva_vaas import shiva_vaas, shiva_vaas_at, shiva_vaas_calendar
+
 # --- Page Config ---
 st.set_page_config(page_title="🕉️ Shiva Vaas Calculator", page_icon="🕉️", layout="centered")
 
@@ -59,47 +67,6 @@ st.markdown("""
 <h3>Discover where Lord Shiva resides today based on Paksha & Tithi</h3>
 """, unsafe_allow_html=True)
 
-# --- User Inputs ---
-paksha = st.selectbox("Select Paksha:", ["Shukla Paksha", "Krishna Paksha"])
-tithi = st.selectbox("Select Tithi (1 = Prathama, 15 = Purnima/Amavasya):", list(range(1, 16)))
-
-# --- Data ---
-shukla_data = {
-    1: ("शमशान", "मृत्युतुल्य"),
-    2: ("गौरी सानिध्य", "सुखप्रद"),
-    3: ("सभायां", "संताप"),
-    4: ("क्रीडायां", "कष्ट एवं दुःख"),
-    5: ("कैलाश पर", "सुखप्रद"),
-    6: ("वृषारूढ", "अभीष्टसिद्धि"),
-    7: ("भोजन", "पीड़ा"),
-    8: ("शमशान", "मृत्युतुल्य"),
-    9: ("गौरी सानिध्य", "सुखप्रद"),
-    10: ("सभायां", "संताप"),
-    11: ("क्रीडायां", "कष्ट एवं दुःख"),
-    12: ("कैलाश पर", "सुखप्रद"),
-    13: ("वृषारूढ", "अभीष्टसिद्धि"),
-    14: ("भोजन", "पीड़ा"),
-    15: ("शमशान", "मृत्युतुल्य")
-}
-
-krishna_data = {
-    1: ("गौरी सानिध्य", "सुखप्रद"),
-    2: ("सभायां", "संताप"),
-    3: ("क्रीडायां", "कष्ट एवं दुःख"),
-    4: ("कैलाश पर", "सुखप्रद"),
-    5: ("वृषारूढ", "अभीष्टसिद्धि"),
-    6: ("भोजन", "पीड़ा"),
-    7: ("शमशान", "मृत्युतुल्य"),
-    8: ("गौरी सानिध्य", "सुखप्रद"),
-    9: ("सभायां", "संताप"),
-    10: ("क्रीडायां", "कष्ट एवं दुःख"),
-    11: ("कैलाश पर", "सुखप्रद"),
-    12: ("वृषारूढ", "अभीष्टसिद्धि"),
-    13: ("भोजन", "पीड़ा"),
-    14: ("शमशान", "मृत्युतुल्य"),
-    15: ("गौरी सानिध्य", "सुखप्रद")
-}
-
 # --- Shiva Vaas → Image mapping ---
 image_map = {
     "शमशान": "images/smasan.jpg",
@@ -111,11 +78,31 @@ image_map = {
     "भोजन": "images/bhojan.jpg"
 }
 
-# --- Fetch Results ---
-if paksha == "Shukla Paksha":
-    vaas, phal = shukla_data[tithi]
+# --- User Inputs ---
+mode = st.radio("Mode:", ["Today at my location", "Pick Paksha & Tithi"], horizontal=True)
+
+if mode == "Today at my location":
+    c1, c2, c3 = st.columns(3)
+    lat = c1.number_input("Latitude", value=28.6139, format="%.4f")
+    lon = c2.number_input("Longitude", value=77.2090, format="%.4f")
+    tz_name = c3.text_input("Timezone (IANA)", value="Asia/Kolkata")
+    try:
+        tz = pytz.timezone(tz_name)
+    except pytz.UnknownTimeZoneError:
+        st.error(f"Unknown time zone: {tz_name}")
+        st.stop()
+
+    # --- Fetch Results (tithi in force right now) ---
+    now = shiva_vaas_at(datetime.now(tz), lon, lat)
+    vaas, phal = now["vaas"], now["phal"]
+    st.caption(f"Tithi #{now['ti_idx'] + 1} since {now['since']:%d %b %I:%M %p}, "
+               f"until {now['until']:%d %b %I:%M %p} ({tz_name})")
 else:
-    vaas, phal = krishna_data[tithi]
+    paksha = st.selectbox("Select Paksha:", ["Shukla Paksha", "Krishna Paksha"])
+    tithi = st.selectbox("Select Tithi (1 = Prathama, 15 = Purnima/Amavasya):", list(range(1, 16)))
+
+    # --- Fetch Results ---
+    vaas, phal = shiva_vaas(paksha, tithi)
 
 # --- Display Results ---
 st.markdown("<hr>", unsafe_allow_html=True)
@@ -128,6 +115,25 @@ if vaas in image_map:
 
 st.markdown("<hr>", unsafe_allow_html=True)
 
+# --- Bulk calendar (one batched tithi scan; days with a tithi change get several rows) ---
+if mode == "Today at my location":
+    with st.expander("📅 Shiva Vaas calendar"):
+        c1, c2 = st.columns(2)
+        cal_start = c1.date_input("From", value=datetime.now(tz).date())
+        span = c2.selectbox("Span", ["1 month", "3 months", "1 year"])
+        days = {"1 month": 31, "3 months": 92, "1 year": 366}[span]
+        rows = [{"Date": r["date"].isoformat(), "From": r["start"].strftime("%H:%M"),
+                 "To": r["until"].strftime("%H:%M" if r["until"].date() == r["date"] else "%d %b %H:%M"),
+                 "Tithi": r["tithi"], "शिववास": r["vaas"], "फल": r["phal"]}
+                for r in shiva_vaas_calendar(cal_start, days, lon, lat, tz_name)]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        st.download_button("⬇️ Download CSV", buf.getvalue().encode("utf-8"),
+                           file_name=f"shiva_vaas_{cal_start.isoformat()}_{days}d.csv", mime="text/csv")
+
 # --- Footer ---
 st.markdown("""
 <div class="footer">